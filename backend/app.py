@@ -3,18 +3,52 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from datetime import datetime
 import os
+import tempfile
 from database import db
 from auth_utils import JWTAuth
+from json_provider import ParkingJSONProvider
+from compression import compress_response
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ParkingJSONProvider(app)
 
 # Database Configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "parking_system.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{os.path.join(basedir, "parking_system.db")}')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'parking-system-secret-key-change-in-production-2024'
 app.config['PERMANENT_SESSION_LIFETIME'] = 86400  # 24 hours
+app.config['JSON_ENCODER'] = 'auto'  # orjson for responses when installed, else the stdlib; 'stdlib' forces the stdlib
+app.config['COMPRESS_ENABLED'] = True  # gzip/brotli for clients that send Accept-Encoding
+app.config['COMPRESS_MIN_SIZE'] = 1024  # Bodies smaller than this (bytes) go out uncompressed
+app.config['COMPRESS_GZIP_LEVEL'] = 6  # 1 (fastest) - 9 (smallest)
+app.config['COMPRESS_BROTLI_QUALITY'] = 4  # 0 (fastest) - 11 (smallest); brotli is used only when installed
+app.config['SPOT_ALLOCATOR_VERIFY_SECONDS'] = 300  # Rebuild in-memory free-spot heaps every 5 minutes (each pick is confirmed against the DB anyway)
+app.config['SPOT_CLAIM_MAX_ATTEMPTS'] = 5  # Compare-and-set attempts per booking before giving up
+app.config['STATS_SNAPSHOT_TTL_SECONDS'] = 5  # How long dashboard counts are shared between pollers
+app.config['PRINCIPAL_CACHE_TTL_SECONDS'] = 60  # How long authenticated accounts are served without a DB lookup (capped at TOKEN_REVOCATION_SYNC_SECONDS)
+app.config['LOT_LIST_CACHE_MAX_ENTRIES'] = 512  # Lot browsing pages kept per worker (LRU); 0 turns the cache off
+app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:600000'  # Hash cost; older hashes are upgraded on the next successful login
+app.config['PASSWORD_HASH_WORKERS'] = os.cpu_count() or 2  # Password hashes computed at once
+app.config['PASSWORD_HASH_QUEUE_SIZE'] = 32  # Hashes allowed to wait before login/register answer 503
+app.config['PASSWORD_HASH_RETRY_AFTER_SECONDS'] = 1  # Retry-After sent with those 503s
+app.config['TOKEN_REVOCATION_SYNC_SECONDS'] = 5  # How often revocations made by other processes are picked up - also how long a deactivated account stays signed in on other workers
+app.config['LOGIN_RATE_LIMIT_ENABLED'] = True
+app.config['LOGIN_RATE_LIMIT_STORE'] = os.path.join(tempfile.gettempdir(), 'parking_login_buckets.db')  # Shared by all workers on this host ('memory' = per process)
+app.config['LOGIN_RATE_LIMIT_IP_BURST'] = 30  # Login attempts a client IP may make back to back...
+app.config['LOGIN_RATE_LIMIT_IP_PER_MINUTE'] = 30  # ...and the sustained rate after that
+app.config['LOGIN_RATE_LIMIT_USERNAME_BURST'] = 5  # Same limits per username from one client IP
+app.config['LOGIN_RATE_LIMIT_USERNAME_PER_MINUTE'] = 5
+app.config['LOGIN_RATE_LIMIT_ACCOUNT_BURST'] = 20  # Looser limits per username across all IPs, so guesses from elsewhere can't lock the owner out...
+app.config['LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE'] = 10  # ...while guessing spread over many IPs stays capped
+app.config['USER_IMPORT_MAX_ROWS'] = 5000  # Rows accepted by one bulk user import request
+app.config['CURSOR_COUNT_CAP'] = 10000  # Rows counted for count=approximate in cursor mode before reporting the cap
+app.config['SEARCH_INDEX_ENABLED'] = True  # Lot/user search through the FTS5 index (word prefixes); False = LIKE substring scans
+app.config['SSE_HEARTBEAT_SECONDS'] = 15  # Keepalive comment on idle availability streams, so proxies don't drop them
+app.config['SSE_MAX_STREAM_SECONDS'] = 300  # Streams end after this; the browser reconnects (re-checking its token) and resumes
+app.config['SSE_RETRY_MS'] = 3000  # Reconnect delay suggested to browsers
+app.config['STREAM_TOKEN_SECONDS'] = 60  # Lifetime of the stream-only tokens browsers pass as ?access_token=
 
 # Initialize extensions
 db.init_app(app)
@@ -24,9 +58,12 @@ migrate = Migrate(app, db)
 CORS(app, 
      origins=['http://localhost:3000', 'http://localhost:5173', 'http://localhost:8080'],  # Vue.js dev servers
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization'],
+     allow_headers=['Content-Type', 'Authorization', 'Last-Event-ID'],
      supports_credentials=True)
 
+# Compress large JSON/text responses for clients that accept it
+app.after_request(compress_response)
+
 # Import models after db initialization to avoid circular imports
 from models import User, Admin, ParkingLot, ParkingSpot, Reservation
 
@@ -121,7 +158,8 @@ def api_info():
         'dashboard': {
             'GET /api/dashboard/admin': 'Admin dashboard (admin only)',
             'GET /api/dashboard/user': 'User dashboard (users only)',
-            'GET /api/dashboard/redirect': 'Get dashboard redirect based on role'
+            'GET /api/dashboard/redirect': 'Get dashboard redirect based on role',
+            'GET /api/dashboard/stream/availability': 'Server-Sent Events of per-lot spot counts (requires authentication; ?access_token= for EventSource)'
         },
         'admin_management': {
             'GET /api/admin/parking-lots': 'List all parking lots with filters (admin only)',
@@ -132,7 +170,9 @@ def api_info():
             'GET /api/admin/users': 'List all users with stats (admin only)',
             'GET /api/admin/users/{id}': 'Get detailed user info (admin only)',
             'POST /api/admin/users/{id}/toggle-status': 'Toggle user active status (admin only)',
-            'GET /api/admin/statistics': 'Get system statistics (admin only)'
+            'POST /api/admin/users/import': 'Bulk-create users from CSV or JSON (admin only)',
+            'GET /api/admin/statistics': 'Get system statistics (admin only)',
+            'GET /api/admin/statistics/cache': 'Lot browsing cache hit/miss counters and open availability streams for this worker (admin only)'
         }
     }
     
@@ -5,11 +5,19 @@ Provides token-based authentication with role-based access control
 
 import jwt
 import functools
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from werkzeug.security import check_password_hash
-from models import User, Admin
+from sqlalchemy import inspect, select, delete
+from sqlalchemy.orm import make_transient_to_detached
+from models import User, Admin, RevokedToken
 from database import db
+from password_hasher import password_hasher, HasherBusy
 
 class AuthError(Exception):
     """Custom authentication error"""
@@ -18,6 +26,194 @@ class AuthError(Exception):
         self.status_code = status_code
         super().__init__(self.message)
 
+class PrincipalCache:
+    """
+    Process-wide cache of authenticated users and admins keyed by (user_type, user_id)
+    Hits are attached to the request's session without a SELECT; writes to an account
+    must call invalidate() after committing so changes such as deactivation apply at once.
+    invalidate() only reaches this process - other workers drop their copy once their
+    revocation store syncs a cutoff (revoke_all) newer than it.
+    """
+    
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl  # Seconds an account is served from memory before it is re-read
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_type, user_id) -> (detached snapshot, monotonic time cached, wall time cached)
+        self._generation = 0
+    
+    def _get_ttl(self):
+        """Read the cache TTL from app config when available, capped at the revocation sync interval"""
+        try:
+            ttl = current_app.config.get('PRINCIPAL_CACHE_TTL_SECONDS', self.ttl)
+        except RuntimeError:
+            ttl = self.ttl
+        # Other workers' account changes reach this cache no later than their revocations do
+        return min(ttl, revocation_store._get_sync_interval())
+    
+    @staticmethod
+    def _snapshot(principal):
+        """Detached copy of an account's columns - the password hash is left out and loads on demand"""
+        model = type(principal)
+        values = {
+            attribute.key: getattr(principal, attribute.key)
+            for attribute in inspect(model).column_attrs
+            if attribute.key != 'password_hash'
+        }
+        snapshot = model(**values)
+        make_transient_to_detached(snapshot)
+        return snapshot
+    
+    def get(self, user_type, user_id):
+        """Return the account for a token's claims, or None if it no longer exists"""
+        key = (user_type, user_id)
+        ttl = self._get_ttl()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None and time.monotonic() - entry[1] < ttl
+                    and not revocation_store.revoked_since(user_type, user_id, entry[2])):
+                self._entries.move_to_end(key)
+                # Attach a copy to this request's session without touching the database
+                return db.session.merge(entry[0], load=False)
+            generation = self._generation
+        
+        cached_at = time.time()  # Before the read, so a cutoff written during it still drops the entry
+        model = Admin if user_type == 'admin' else User
+        principal = model.query.get(user_id)
+        if principal is None:
+            return None
+        
+        snapshot = self._snapshot(principal)
+        with self._lock:
+            # Don't cache a row that an invalidation raced past while it was being read
+            if generation == self._generation:
+                self._entries[key] = (snapshot, time.monotonic(), cached_at)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        
+        return principal
+    
+    def invalidate(self, user_type, user_id):
+        """Forget one account so the next request re-reads it from the database"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop((user_type, user_id), None)
+    
+    def clear(self):
+        """Forget every cached account"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+class RevocationStore:
+    """
+    Revoked JWTs, held in memory for constant-time checks and persisted in revoked_tokens
+    Loaded from the table on first use and re-synced every TOKEN_REVOCATION_SYNC_SECONDS
+    (picking up revocations made by other processes); each sync prunes expired entries.
+    """
+    
+    def __init__(self, sync_interval=5, max_token_age=timedelta(hours=168)):
+        self.sync_interval = sync_interval  # Seconds between reloads from the database
+        self.max_token_age = max_token_age  # Longest lifetime generate_token hands out
+        self._lock = threading.Lock()
+        self._jtis = {}     # jti -> expires_at
+        self._cutoffs = {}  # (user_type, user_id) -> (issued_before, expires_at)
+        self._synced_at = None
+    
+    def _get_sync_interval(self):
+        """Read the sync interval from app config when available"""
+        try:
+            return current_app.config.get('TOKEN_REVOCATION_SYNC_SECONDS', self.sync_interval)
+        except RuntimeError:
+            return self.sync_interval
+    
+    def _sync(self):
+        """Prune expired rows and reload the revocation list - caller holds the lock"""
+        # On a connection of its own, so the request's session is neither committed nor rolled back
+        table = RevokedToken.__table__
+        with db.engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.expires_at < datetime.utcnow()))
+            rows = connection.execute(select(
+                table.c.jti, table.c.user_type, table.c.user_id,
+                table.c.issued_before, table.c.expires_at
+            )).all()
+        
+        jtis = {}
+        cutoffs = {}
+        for jti, user_type, user_id, issued_before, expires_at in rows:
+            if jti:
+                jtis[jti] = expires_at
+                continue
+            current = cutoffs.get((user_type, user_id))
+            if current is None or issued_before > current[0]:
+                cutoffs[(user_type, user_id)] = (issued_before, expires_at)
+        
+        self._jtis = jtis
+        self._cutoffs = cutoffs
+        self._synced_at = time.monotonic()
+    
+    def _ensure_synced(self):
+        """Load on first use, and reload once the sync interval has passed"""
+        synced_at = self._synced_at
+        if synced_at is not None and time.monotonic() - synced_at <= self._get_sync_interval():
+            return
+        with self._lock:
+            if self._synced_at is synced_at:
+                self._sync()
+    
+    def is_revoked(self, payload):
+        """True if a decoded token has been revoked, by jti or by an account-wide cutoff"""
+        self._ensure_synced()
+        jti = payload.get('jti')
+        if jti is not None and jti in self._jtis:
+            return True
+        cutoff = self._cutoffs.get((payload.get('user_type'), payload.get('user_id')))
+        return cutoff is not None and payload.get('iat', 0) < cutoff[0]
+    
+    def revoked_since(self, user_type, user_id, since):
+        """True if the account was cut off (revoke_all) at or after the Unix time since"""
+        cutoff = self._cutoffs.get((user_type, user_id))
+        return cutoff is not None and since <= cutoff[0]
+    
+    def revoke_token(self, payload):
+        """Revoke a single decoded token until it expires"""
+        jti = payload.get('jti')
+        if jti is None:
+            # Tokens issued before jti existed can only be revoked by issue time (up to and including this one's)
+            issued_before = math.nextafter(payload.get('iat', 0), math.inf)
+            self.revoke_all(payload.get('user_type'), payload.get('user_id'), issued_before=issued_before)
+            return
+        
+        expires_at = datetime.utcfromtimestamp(payload['exp'])
+        db.session.add(RevokedToken(
+            jti=jti,
+            user_type=payload.get('user_type'),
+            user_id=payload.get('user_id'),
+            expires_at=expires_at
+        ))
+        db.session.commit()
+        with self._lock:
+            self._jtis[jti] = expires_at
+    
+    def revoke_all(self, user_type, user_id, issued_before=None):
+        """Revoke every token an account was issued before issued_before (default: now)"""
+        if issued_before is None:
+            issued_before = time.time()
+        
+        expires_at = datetime.utcfromtimestamp(issued_before) + self.max_token_age
+        db.session.add(RevokedToken(
+            user_type=user_type,
+            user_id=user_id,
+            issued_before=issued_before,
+            expires_at=expires_at
+        ))
+        db.session.commit()
+        with self._lock:
+            current = self._cutoffs.get((user_type, user_id))
+            if current is None or issued_before > current[0]:
+                self._cutoffs[(user_type, user_id)] = (issued_before, expires_at)
+
 class JWTAuth:
     """JWT Authentication Manager"""
     
@@ -29,7 +225,8 @@ class JWTAuth:
             'username': user.username,
             'role': user.get_role(),
             'user_type': 'admin' if user.get_role() == 'admin' else 'user',
-            'iat': datetime.utcnow(),
+            'jti': uuid.uuid4().hex,
+            'iat': time.time(),  # Sub-second, so a token issued just after a revocation cutoff survives it
             'exp': datetime.utcnow() + timedelta(hours=expires_in_hours)
         }
         
@@ -53,19 +250,42 @@ class JWTAuth:
         )
     
     @staticmethod
-    def decode_token(token):
-        """Decode and validate JWT token"""
+    def generate_scoped_token(user, scope, expires_in_seconds):
+        """Short-lived token that only the views taking this scope accept (see query_token_allowed)"""
+        now = time.time()
+        payload = {
+            'user_id': user.id,
+            'user_type': 'admin' if user.get_role() == 'admin' else 'user',
+            'scope': scope,
+            'jti': uuid.uuid4().hex,
+            'iat': now,
+            'exp': now + expires_in_seconds
+        }
+        return jwt.encode(
+            payload,
+            current_app.config['SECRET_KEY'],
+            algorithm='HS256'
+        )
+    
+    @staticmethod
+    def decode_token(token, scope=None):
+        """Decode and validate JWT token; it must carry exactly this scope (None for session tokens)"""
         try:
             payload = jwt.decode(
                 token,
                 current_app.config['SECRET_KEY'],
                 algorithms=['HS256']
             )
-            return payload
         except jwt.ExpiredSignatureError:
             raise AuthError('Token has expired', 401)
         except jwt.InvalidTokenError:
             raise AuthError('Invalid token', 401)
+        
+        if payload.get('scope') != scope:
+            raise AuthError('Invalid token for this endpoint', 401)
+        if revocation_store.is_revoked(payload):
+            raise AuthError('Token has been revoked', 401)
+        return payload
     
     @staticmethod
     def get_token_from_request():
@@ -83,24 +303,33 @@ class JWTAuth:
         except ValueError:
             return None
     
+    @staticmethod
+    def get_query_token():
+        """
+        ?access_token= for views that opt in with query_token_allowed, as (token, required scope)
+        EventSource can't send headers; the scope keeps session tokens out of URLs and logs.
+        """
+        view = current_app.view_functions.get(request.endpoint)
+        scope = getattr(view, 'query_token_scope', None)
+        if scope is None:
+            return None, None
+        return request.args.get('access_token') or None, scope
+    
     @staticmethod
     def get_current_user_from_token():
-        """Get current user from JWT token"""
-        token = JWTAuth.get_token_from_request()
-        if not token:
-            return None
-        
+        """Get current user from JWT token (None if the token is missing or invalid)"""
+        return get_auth_context().principal
+    
+    @staticmethod
+    def upgrade_password_hash(user, password):
+        """Re-hash a password made with an older method or cost; returns True if the hash changed"""
+        if not password_hasher.needs_rehash(user.password_hash):
+            return False
         try:
-            payload = JWTAuth.decode_token(token)
-            user_type = payload.get('user_type')
-            user_id = payload.get('user_id')
-            
-            if user_type == 'admin':
-                return Admin.query.get(user_id)
-            else:
-                return User.query.get(user_id)
-        except AuthError:
-            return None
+            user.password_hash = password_hasher.hash(password)
+        except HasherBusy:
+            return False  # Not worth failing a login over - try again on the next one
+        return True
     
     @staticmethod
     def authenticate_user(username, password, user_type='user'):
@@ -109,9 +338,11 @@ class JWTAuth:
             if user_type == 'admin':
                 user = Admin.query.filter_by(username=username).first()
                 if user and user.check_password(password):
-                    # Update last login
+                    # Update last login (and upgrade a legacy password hash)
+                    JWTAuth.upgrade_password_hash(user, password)
                     user.last_login = datetime.utcnow()
                     db.session.commit()
+                    principal_cache.invalidate('admin', user.id)
                     return user
             else:
                 user = User.query.filter_by(username=username).first()
@@ -119,22 +350,89 @@ class JWTAuth:
                     # Check if user is active
                     if not user.is_active:
                         raise AuthError('Account is deactivated. Please contact admin.', 403)
+                    if JWTAuth.upgrade_password_hash(user, password):
+                        db.session.commit()
                     return user
             
             return None
         except Exception as e:
             db.session.rollback()
-            if isinstance(e, AuthError):
+            if isinstance(e, (AuthError, HasherBusy)):
                 raise e
             raise AuthError('Authentication failed due to server error', 500)
 
+class AuthContext:
+    """
+    Authentication state of one request
+    The Authorization header is parsed once, and the token is verified and its principal
+    resolved on first use - none of it is repeated however many helpers ask.
+    """
+    
+    def __init__(self):
+        self.token = JWTAuth.get_token_from_request()
+        self.scope = None  # Scope the token must carry - only query-string tokens have one
+        if not self.token:
+            self.token, self.scope = JWTAuth.get_query_token()
+        self._payload = None
+        self._error = None  # AuthError raised while verifying the token, if any
+        self._verified = False
+        self._principal = None
+        self._resolved = False
+    
+    def verify(self):
+        """Return the token's verified payload; raises the same AuthError on every call if it is invalid"""
+        if not self._verified:
+            try:
+                self._payload = JWTAuth.decode_token(self.token, self.scope)
+            except AuthError as e:
+                self._error = e
+            self._verified = True
+        
+        if self._error is not None:
+            raise self._error
+        return self._payload
+    
+    @property
+    def payload(self):
+        """The verified payload, or None without a valid token"""
+        if not self.token:
+            return None
+        try:
+            return self.verify()
+        except AuthError:
+            return None
+    
+    @property
+    def principal(self):
+        """The user or admin the token belongs to; None without a valid token or account"""
+        if not self._resolved:
+            payload = self.payload
+            if payload is not None:
+                # Served from the principal cache when fresh
+                self._principal = principal_cache.get(payload.get('user_type'), payload.get('user_id'))
+            self._resolved = True
+        return self._principal
+
+def get_auth_context():
+    """Return the current request's AuthContext, building it on first use"""
+    if 'auth_context' not in g:
+        g.auth_context = AuthContext()
+    return g.auth_context
+
+def query_token_allowed(scope):
+    """Let a view also take a token carrying this scope as ?access_token= (apply below token_required)"""
+    def decorator(f):
+        f.query_token_scope = scope
+        return f
+    return decorator
+
 def token_required(f):
     """Decorator to require valid JWT token"""
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        token = JWTAuth.get_token_from_request()
+        auth = get_auth_context()
         
-        if not token:
+        if not auth.token:
             return jsonify({
                 'success': False,
                 'message': 'Token is missing',
@@ -142,16 +440,13 @@ def token_required(f):
             }), 401
         
         try:
-            payload = JWTAuth.decode_token(token)
+            payload = auth.verify()
             
-            # Get user from database to ensure they still exist
+            # Ensure the account still exists
             user_type = payload.get('user_type')
-            user_id = payload.get('user_id')
+            current_user = auth.principal
             
-            if user_type == 'admin':
-                current_user = Admin.query.get(user_id)
-            else:
-                current_user = User.query.get(user_id)
+            if user_type != 'admin':
                 # Check if user is still active
                 if current_user and not current_user.is_active:
                     return jsonify({
@@ -167,9 +462,6 @@ def token_required(f):
                     'error_code': 'USER_NOT_FOUND'
                 }), 401
             
-            # Add current_user to request context
-            request.current_user = current_user
-            
             return f(*args, **kwargs)
             
         except AuthError as e:
@@ -192,7 +484,7 @@ def admin_required(f):
     @functools.wraps(f)
     @token_required
     def decorated_function(*args, **kwargs):
-        current_user = getattr(request, 'current_user', None)
+        current_user = get_current_user()
         
         if not current_user or current_user.get_role() != 'admin':
             return jsonify({
@@ -210,7 +502,7 @@ def user_required(f):
     @functools.wraps(f)
     @token_required
     def decorated_function(*args, **kwargs):
-        current_user = getattr(request, 'current_user', None)
+        current_user = get_current_user()
         
         if not current_user or current_user.get_role() != 'user':
             return jsonify({
@@ -224,5 +516,11 @@ def user_required(f):
     return decorated_function
 
 def get_current_user():
-    """Get current user from request context"""
-    return getattr(request, 'current_user', None) 
\ No newline at end of file
+    """Get current user from the request's auth context"""
+    return get_auth_context().principal
+
+# Process-wide principal cache shared by the blueprints
+principal_cache = PrincipalCache()
+
+# Process-wide token revocation list
+revocation_store = RevocationStore() 
\ No newline at end of file
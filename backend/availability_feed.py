@@ -0,0 +1,195 @@
+"""
+Availability Feed for Vehicle Parking System
+In-process publish/subscribe of per-lot spot counts, streamed to browsers as
+Server-Sent Events so lot lists and dashboards update without re-fetching
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from flask import current_app
+from models import ParkingLot
+from database import db
+
+def _setting(key, default):
+    """Read a setting from app config when available"""
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        return default
+
+def lot_counts_query(lot_ids=None):
+    """Query of the counter columns for some lots, or for every active lot when lot_ids is None"""
+    query = db.session.query(
+        ParkingLot.id, ParkingLot.available_count, ParkingLot.occupied_count,
+        ParkingLot.number_of_spots, ParkingLot.is_active
+    )
+    return query.filter(ParkingLot.id.in_(lot_ids)) if lot_ids is not None else query.filter(ParkingLot.is_active == True)
+
+def lot_counts(lot_ids=None):
+    """Current {lot_id: counts} for some lots, or for every active lot when lot_ids is None"""
+    return {
+        lot_id: {
+            'lot_id': lot_id,
+            'available_spots': available,
+            'occupied_spots': occupied,
+            'total_spots': total,
+            'is_active': is_active
+        }
+        for lot_id, available, occupied, total, is_active in lot_counts_query(lot_ids)
+    }
+
+def format_event(event, data, event_id=None):
+    """One Server-Sent Events message"""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"), sort_keys=True)}')
+    return '\n'.join(lines) + '\n\n'
+
+class AvailabilityFeed:
+    """
+    Process-wide broadcast of lot availability changes
+    Events go into one sequence-numbered backlog rather than a queue per subscriber, so a
+    publish costs the same however many streams are open: it appends once and wakes the
+    waiters, and each stream copies out what it hasn't sent yet. Streams hold no database
+    connection while idle, and a reconnecting browser resumes from Last-Event-ID.
+    Event ids carry a per-process epoch, so an id from another worker or from before a
+    restart is never mistaken for a position in this backlog.
+    """
+    
+    def __init__(self, backlog=1000):
+        self.backlog = backlog
+        self.epoch = uuid.uuid4().hex[:8]
+        self._condition = threading.Condition()
+        self._publish_lock = threading.Lock()  # Orders publishers; streams never take it
+        self._events = deque(maxlen=backlog)  # (sequence number, formatted event)
+        self._last = {}  # lot_id -> (available, occupied, total, is_active) last published
+        self.sequence = 0
+        self.subscribers = 0
+    
+    def publish(self, lot_id):
+        """Publish a lot's counts after a committed write changed them"""
+        # Publishers take turns so concurrent writers publish in commit order, but the read
+        # happens outside the condition - waiting streams and new subscribers never wait on it
+        with self._publish_lock:
+            try:
+                counts = lot_counts([lot_id]).get(lot_id)
+            except Exception:
+                # The write already committed; streams pick the change up with the next event or snapshot
+                db.session.rollback()
+                return
+            
+            with self._condition:
+                if counts is None:
+                    self._last.pop(lot_id, None)
+                    self._append('lot_removed', {'lot_id': lot_id})
+                    return
+                
+                previous = self._last.get(lot_id)
+                current = self._state(counts)
+                if previous == current:
+                    return  # Nothing a subscriber shows has changed
+                self._last[lot_id] = current
+                counts['available_delta'] = current[0] - previous[0] if previous else None
+                counts['occupied_delta'] = current[1] - previous[1] if previous else None
+                self._append('availability', counts)
+    
+    @staticmethod
+    def _state(counts):
+        """The parts of a lot's counts that subscribers display"""
+        return (counts['available_spots'], counts['occupied_spots'], counts['total_spots'], counts['is_active'])
+    
+    def _append(self, event, data):
+        """Add an event to the backlog and wake every waiting stream; caller holds the lock"""
+        self.sequence += 1
+        self._events.append((self.sequence, format_event(event, data, self.event_id(self.sequence))))
+        self._condition.notify_all()
+    
+    def snapshot(self):
+        """
+        Opening event with every active lot's counts, as (sequence number, formatted event)
+        The counts are read after the sequence number is taken, so anything published in
+        between is replayed too rather than lost; it also seeds deltas for unpublished lots.
+        """
+        with self._condition:
+            position = self.sequence
+        counts = lot_counts()
+        with self._condition:
+            for lot_id, lot in counts.items():
+                self._last.setdefault(lot_id, self._state(lot))
+        return position, format_event('snapshot', {'lots': list(counts.values())}, self.event_id(position))
+    
+    def event_id(self, position):
+        """SSE id for a sequence number"""
+        return f'{self.epoch}-{position}'
+    
+    def resume_position(self, last_event_id):
+        """Sequence number to resume a stream after, or None if the events since are not all in the backlog"""
+        epoch, _, position = (last_event_id or '').partition('-')
+        if epoch != self.epoch or not position.isdigit():
+            return None
+        position = int(position)
+        with self._condition:
+            if position <= self.sequence and self.sequence - position <= len(self._events):
+                return position
+        return None
+    
+    def _pending(self, position):
+        """Formatted events after a sequence number, or None if some have already left the backlog"""
+        missed = self.sequence - position
+        if missed > len(self._events):
+            return None
+        # Newest events are at the right; walk back only as far as needed
+        return [text for _, text in islice(reversed(self._events), missed)][::-1]
+    
+    def stream(self, position, opening=None):
+        """
+        Generator of Server-Sent Events text, starting after sequence number position
+        Idle streams wait on a shared condition and send a keepalive comment every
+        SSE_HEARTBEAT_SECONDS; after SSE_MAX_STREAM_SECONDS the stream ends and the browser
+        reconnects, which re-checks its token and resumes from its Last-Event-ID.
+        """
+        heartbeat = _setting('SSE_HEARTBEAT_SECONDS', 15)
+        deadline = time.monotonic() + _setting('SSE_MAX_STREAM_SECONDS', 300)
+        retry_ms = _setting('SSE_RETRY_MS', 3000)
+        
+        def generate():
+            nonlocal position
+            with self._condition:
+                self.subscribers += 1
+            try:
+                yield f'retry: {retry_ms}\n\n'
+                if opening:
+                    yield opening
+                while time.monotonic() < deadline:
+                    with self._condition:
+                        self._condition.wait_for(lambda: self.sequence > position, timeout=heartbeat)
+                        events = self._pending(position)
+                        position = self.sequence
+                    if events is None:
+                        # Fell behind the backlog - no id, so the browser reconnects from its
+                        # last one, which can't resume and gets a fresh snapshot instead
+                        yield format_event('resync', {})
+                        return
+                    yield ''.join(events) if events else ': keepalive\n\n'
+            finally:
+                with self._condition:
+                    self.subscribers -= 1
+        
+        return generate()
+    
+    def stats(self):
+        """Open streams and events published, for the statistics endpoint"""
+        with self._condition:
+            return {
+                'subscribers': self.subscribers,
+                'events_published': self.sequence,
+                'backlog': len(self._events),
+                'max_backlog': self.backlog
+            }
+
+# Process-wide availability feed shared by the blueprints
+availability_feed = AvailabilityFeed()
@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+"""
+Benchmark and Load-Test Script for Vehicle Parking System
+Runs against a throwaway SQLite database - the real parking_system.db is never touched
+"""
+
+import functools
+import inspect
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from urllib.parse import unquote
+from sqlalchemy import event, insert, desc
+
+# Point the app at a scratch database before it is imported
+_scratch_dir = tempfile.mkdtemp(prefix='parking-bench-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_scratch_dir, "bench.db")}'
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app
+app.config['LOGIN_RATE_LIMIT_STORE'] = os.path.join(_scratch_dir, 'login_buckets.db')
+from database import db
+from models import User, Admin, ParkingLot, ParkingSpot, Reservation
+from auth_utils import JWTAuth, admin_required, get_current_user, principal_cache, revocation_store
+from routes.admin import create_parking_spots_for_lot
+from spot_allocator import SpotAllocator, spot_allocator
+from system_stats import system_stats
+from lot_list_cache import lot_list_cache
+import routes.auth
+import routes.dashboard
+import json_provider
+import compression
+from cursor_pagination import encode_cursor
+from availability_feed import AvailabilityFeed, availability_feed
+from werkzeug.security import generate_password_hash
+
+class PerWorkerAllocator(threading.local):
+    """Gives each client thread its own heap, as if every client hit a separate worker process"""
+    
+    def __init__(self):
+        self.allocator = SpotAllocator()
+    
+    def __getattr__(self, name):
+        return getattr(self.allocator, name)
+
+@contextmanager
+def patched(target, name, value):
+    """Replace target.name inside the block, putting the original back however the block exits"""
+    original = inspect.getattr_static(target, name)  # Keeps staticmethod wrappers intact
+    setattr(target, name, value)
+    try:
+        yield value
+    finally:
+        setattr(target, name, original)
+
+def reset_process_state():
+    """Empty every process-wide cache, as a freshly started worker would have them"""
+    spot_allocator.invalidate()
+    system_stats.invalidate()
+    lot_list_cache.invalidate()
+    principal_cache.clear()
+    revocation_store._synced_at = None
+    routes.auth.login_limiter._store = None
+    availability_feed._last.clear()
+
+def scenario(bench):
+    """Run a benchmark from empty caches and put back any app settings it changed, so benchmarks can run in any order"""
+    @functools.wraps(bench)
+    def run(*args, **kwargs):
+        config = dict(app.config)
+        reset_process_state()
+        try:
+            return bench(*args, **kwargs)
+        finally:
+            app.config.clear()
+            app.config.update(config)
+            reset_process_state()
+    return run
+
+@contextmanager
+def count_queries():
+    """Count SQL statements issued inside the block; yields a one-item list holding the count"""
+    counter = [0]
+    
+    def before_cursor_execute(*args):
+        counter[0] += 1
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+def warm_up(client, url, headers):
+    """Send one uncounted request so first-request work (revocation sync, principal load) stays out of the counts"""
+    client.get(url, headers=headers)
+
+def create_bench_admin():
+    """Create the admin account; returns its auth headers"""
+    with app.app_context():
+        admin = Admin(username='admin', email='admin@parkingsystem.com', password_hash=generate_password_hash('admin123'))
+        db.session.add(admin)
+        db.session.commit()
+        return {'Authorization': f'Bearer {JWTAuth.generate_token(admin)}'}
+
+def create_bench_lots(lot_count, spots_per_lot=20):
+    """Add extra lots with spots and a mix of completed/active reservations"""
+    with app.app_context():
+        user = User.query.first()
+        for i in range(lot_count):
+            lot = ParkingLot(
+                prime_location_name=f'Bench Lot {i}',
+                address=f'{i} Benchmark Street, Test City',
+                pin_code='560002',
+                price_per_hour=30.0,
+                number_of_spots=spots_per_lot
+            )
+            db.session.add(lot)
+            db.session.flush()
+            spots = create_parking_spots_for_lot(lot)
+            db.session.flush()
+            
+            for spot in spots[:5]:
+                db.session.add(Reservation(
+                    spot_id=spot.id, user_id=user.id, vehicle_number='KA01AB1234',
+                    status='completed', parking_cost=60.0,
+                    leaving_timestamp=datetime.utcnow()
+                ))
+        db.session.commit()
+
+def setup_bench_data(user_count=128, spot_count=100):
+    """Create one lot and a pool of users; returns auth headers for each user"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        
+        lot = ParkingLot(
+            prime_location_name='Benchmark Plaza',
+            address='1 Benchmark Road, Test City',
+            pin_code='560001',
+            price_per_hour=40.0,
+            number_of_spots=spot_count
+        )
+        db.session.add(lot)
+        db.session.flush()
+        create_parking_spots_for_lot(lot)
+        
+        # Hash once and share it - password cost is not what this measures
+        password_hash = generate_password_hash('password123')
+        users = []
+        for i in range(user_count):
+            user = User(
+                username=f'bench_user_{i}',
+                email=f'bench_user_{i}@example.com',
+                full_name=f'Bench User {i}',
+                password_hash=password_hash
+            )
+            db.session.add(user)
+            users.append(user)
+        db.session.commit()
+        
+        headers = [{'Authorization': f'Bearer {JWTAuth.generate_token(user)}'} for user in users]
+        return lot.id, headers
+
+def reset_lot(lot_id):
+    """Free every spot in the lot and clear reservations between runs"""
+    with app.app_context():
+        Reservation.query.delete()
+        ParkingSpot.query.filter_by(lot_id=lot_id).update({'status': 'A'})
+        db.session.get(ParkingLot, lot_id).recount_spots()
+        db.session.commit()
+    spot_allocator.invalidate(lot_id)
+
+def check_no_double_booking(lot_id):
+    """Verify every active reservation holds a distinct spot and the counters agree"""
+    with app.app_context():
+        active = Reservation.query.filter_by(status='active').all()
+        spot_ids = [reservation.spot_id for reservation in active]
+        occupied = ParkingSpot.query.filter_by(lot_id=lot_id, status='O').count()
+        lot = db.session.get(ParkingLot, lot_id)
+        
+        problems = []
+        if len(spot_ids) != len(set(spot_ids)):
+            problems.append(f'{len(spot_ids) - len(set(spot_ids))} spots were double-booked')
+        if occupied != len(spot_ids):
+            problems.append(f'{occupied} occupied spots but {len(spot_ids)} active reservations')
+        if lot.occupied_count != occupied:
+            problems.append(f'lot counter says {lot.occupied_count} occupied, spots say {occupied}')
+        return len(spot_ids), problems
+
+def run_booking_round(lot_id, headers, clients):
+    """Fire every user's booking from `clients` threads; returns (outcomes, elapsed seconds)"""
+    reset_lot(lot_id)
+    outcomes = {'booked': 0, 'full': 0, 'busy': 0, 'errors': 0}
+    outcome_lock = threading.Lock()
+    
+    def worker(worker_index):
+        client = app.test_client()
+        for user_headers in headers[worker_index::clients]:
+            response = client.post('/api/dashboard/user/reservations',
+                                   json={'lot_id': lot_id, 'vehicle_number': 'KA01AB1234'},
+                                   headers=user_headers)
+            if response.status_code == 201:
+                outcome = 'booked'
+            elif response.status_code == 400:
+                outcome = 'full'
+            elif response.status_code == 409:
+                outcome = 'busy'
+            else:
+                outcome = 'errors'
+            with outcome_lock:
+                outcomes[outcome] += 1
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, time.perf_counter() - started
+
+@scenario
+def bench_booking(concurrency_levels=(1, 8, 32)):
+    """Concurrent POST /api/dashboard/user/reservations until the lot is full"""
+    lot_id, headers = setup_bench_data()
+    
+    print("🚗 Booking load test (one lot, 100 spots, 128 users)")
+    print(f"{'heaps':>10} {'clients':>8} {'booked':>7} {'full':>5} {'busy':>5} {'errors':>7} {'seconds':>8} {'bookings/s':>11}  result")
+    
+    # 'shared' is one process serving every client; 'per-worker' gives each client its own
+    # stale-prone heap, so every claim races on the database compare-and-set
+    for mode, allocator in (('shared', spot_allocator), ('per-worker', PerWorkerAllocator())):
+        with patched(routes.dashboard, 'spot_allocator', allocator):
+            for clients in concurrency_levels:
+                outcomes, elapsed = run_booking_round(lot_id, headers, clients)
+                booked, problems = check_no_double_booking(lot_id)
+                if booked != outcomes['booked']:
+                    problems.append(f"{outcomes['booked']} bookings acknowledged but {booked} active reservations")
+                result = '❌ ' + '; '.join(problems) if problems else '✅ no double-booking'
+                print(f"{mode:>10} {clients:>8} {outcomes['booked']:>7} {outcomes['full']:>5} {outcomes['busy']:>5} {outcomes['errors']:>7} "
+                      f"{elapsed:>8.2f} {outcomes['booked'] / elapsed:>11.1f}  {result}")
+
+@scenario
+def bench_admin_lots(page_sizes=(1, 10, 50)):
+    """GET /api/admin/parking-lots - SQL statements per request must not grow with page size"""
+    setup_bench_data()
+    admin_headers = create_bench_admin()
+    create_bench_lots(60)
+    client = app.test_client()
+    
+    print("🏢 Admin parking-lot listing (61 lots)")
+    print(f"{'per_page':>9} {'lots':>5} {'queries':>8} {'ms':>8}")
+    
+    warm_up(client, '/api/admin/parking-lots', admin_headers)
+    query_counts = set()
+    for per_page in page_sizes:
+        with count_queries() as counter:
+            started = time.perf_counter()
+            response = client.get(f'/api/admin/parking-lots?per_page={per_page}', headers=admin_headers)
+            elapsed = time.perf_counter() - started
+        query_counts.add(counter[0])
+        print(f"{per_page:>9} {len(response.get_json()['data']['parking_lots']):>5} {counter[0]:>8} {elapsed * 1000:>8.1f}")
+    
+    print('✅ query count is constant' if len(query_counts) == 1 else '❌ query count grows with page size')
+
+@scenario
+def bench_reservation_lists(page_sizes=(1, 10, 50)):
+    """Reservation list endpoints - SQL statements per request must not grow with page size"""
+    _, headers = setup_bench_data()
+    admin_headers = create_bench_admin()
+    create_bench_lots(20)  # 100 completed reservations for one user, spread over 20 lots
+    client = app.test_client()
+    
+    endpoints = (
+        ('user history', '/api/dashboard/user/reservations?per_page={}', headers[0]),
+        ('admin list', '/api/admin/reservations?per_page={}', admin_headers),
+    )
+    
+    print("📋 Reservation lists (100 reservations across 20 lots)")
+    print(f"{'endpoint':>13} {'per_page':>9} {'rows':>5} {'queries':>8} {'ms':>8}")
+    
+    constant = True
+    for label, url, endpoint_headers in endpoints:
+        warm_up(client, url.format(1), endpoint_headers)
+        query_counts = set()
+        for per_page in page_sizes:
+            with count_queries() as counter:
+                started = time.perf_counter()
+                response = client.get(url.format(per_page), headers=endpoint_headers)
+                elapsed = time.perf_counter() - started
+            query_counts.add(counter[0])
+            print(f"{label:>13} {per_page:>9} {len(response.get_json()['data']['reservations']):>5} {counter[0]:>8} {elapsed * 1000:>8.1f}")
+        constant = constant and len(query_counts) == 1
+    
+    print('✅ query count is constant' if constant else '❌ query count grows with page size')
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0
+
+@scenario
+def bench_login(concurrency_levels=(1, 8, 32), login_count=48):
+    """Concurrent POST /api/auth/login - latency, 503s, and how /health fares meanwhile"""
+    setup_bench_data(user_count=login_count)
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = False  # Every login comes from one IP here - measure hashing, not the limiter
+    
+    print(f"🔐 Login load test ({login_count} logins per round, {app.config['PASSWORD_HASH_WORKERS']} hash workers, "
+          f"queue {app.config['PASSWORD_HASH_QUEUE_SIZE']})")
+    print(f"{'clients':>8} {'ok':>4} {'503':>4} {'p50 ms':>8} {'p99 ms':>8} {'health p99 ms':>14}")
+    
+    for clients in concurrency_levels:
+        latencies = []
+        rejected = [0]
+        health_latencies = []
+        result_lock = threading.Lock()
+        done = threading.Event()
+        
+        def worker(worker_index):
+            client = app.test_client()
+            for i in range(worker_index, login_count, clients):
+                started = time.perf_counter()
+                response = client.post('/api/auth/login', json={'username': f'bench_user_{i}', 'password': 'password123'})
+                elapsed = time.perf_counter() - started
+                with result_lock:
+                    if response.status_code == 200:
+                        latencies.append(elapsed)
+                    elif response.status_code == 503:
+                        rejected[0] += 1
+        
+        def health_poller():
+            # An ordinary request competing with the login burst
+            client = app.test_client()
+            while not done.is_set():
+                started = time.perf_counter()
+                client.get('/health')
+                health_latencies.append(time.perf_counter() - started)
+                time.sleep(0.01)
+        
+        poller = threading.Thread(target=health_poller)
+        poller.start()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        poller.join()
+        
+        print(f"{clients:>8} {len(latencies):>4} {rejected[0]:>4} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.1f} {percentile(health_latencies, 0.99) * 1000:>14.1f}")
+
+@scenario
+def bench_login_attack(duration=10, attackers=8, legit_clients=4):
+    """Credential stuffing from one IP against the accounts legitimate users sign into - with and without the login limiter"""
+    legit_accounts = 40  # Signed into in turn, so no single account nears its own limit
+    setup_bench_data(user_count=legit_accounts + 40)
+    # A smaller per-IP burst than production so the attacker exhausts it within a short run
+    app.config['LOGIN_RATE_LIMIT_IP_BURST'] = 5
+    
+    print(f"🛡️  Login under attack ({attackers} attacker threads from one IP, {legit_clients} legitimate clients, {duration}s per run)")
+    print(f"{'limiter':>8} {'legit ok':>9} {'legit p50 ms':>13} {'legit p99 ms':>13} {'legit 429/503':>14} {'attempts':>9} {'429':>6}")
+    
+    for enabled in (False, True):
+        app.config['LOGIN_RATE_LIMIT_ENABLED'] = enabled
+        app.config['LOGIN_RATE_LIMIT_STORE'] = os.path.join(_scratch_dir, f'login_buckets_{enabled}.db')
+        routes.auth.login_limiter._store = None
+        
+        legit_latencies = []
+        legit_refused = [0]
+        attack_counts = {'attempts': 0, 'limited': 0}
+        result_lock = threading.Lock()
+        stop = threading.Event()
+        
+        def attacker(index):
+            # Wrong passwords for the legitimate users' own accounts - every attempt that gets through
+            # costs a full hash, and refused ones must not lock those users out
+            client = app.test_client()
+            i = index
+            while not stop.is_set():
+                response = client.post('/api/auth/login',
+                                       json={'username': f'bench_user_{i % legit_accounts}', 'password': 'guess'},
+                                       environ_base={'REMOTE_ADDR': '203.0.113.66'})
+                with result_lock:
+                    attack_counts['attempts'] += 1
+                    attack_counts['limited'] += response.status_code == 429
+                i += attackers
+                stop.wait(0.05)  # ~20 attempts/s per attacker thread, like a client over the network
+        
+        def legit(index):
+            # Users signing in from their own addresses, one login a second per client
+            client = app.test_client()
+            i = index
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = client.post('/api/auth/login',
+                                       json={'username': f'bench_user_{i % legit_accounts}', 'password': 'password123'},
+                                       environ_base={'REMOTE_ADDR': f'198.51.100.{i % legit_accounts + 1}'})
+                elapsed = time.perf_counter() - started
+                with result_lock:
+                    if response.status_code == 200:
+                        legit_latencies.append(elapsed)
+                    else:
+                        legit_refused[0] += 1
+                i += legit_clients
+                stop.wait(1)
+        
+        threads = [threading.Thread(target=attacker, args=(i,)) for i in range(attackers)]
+        threads += [threading.Thread(target=legit, args=(i,)) for i in range(legit_clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        print(f"{'on' if enabled else 'off':>8} {len(legit_latencies):>9} {percentile(legit_latencies, 0.5) * 1000:>13.1f} "
+              f"{percentile(legit_latencies, 0.99) * 1000:>13.1f} {legit_refused[0]:>14} {attack_counts['attempts']:>9} {attack_counts['limited']:>6}")
+
+@contextmanager
+def count_token_decodes():
+    """Count JWT signature verifications inside the block; yields a one-item list holding the count"""
+    counter = [0]
+    original_decode = JWTAuth.decode_token
+    
+    def counting_decode(token, scope=None):
+        counter[0] += 1
+        return original_decode(token, scope)
+    
+    with patched(JWTAuth, 'decode_token', staticmethod(counting_decode)):
+        yield counter
+
+def per_helper_principal():
+    """How every helper used to find the caller: parse the header, verify the token, look up the account"""
+    payload = JWTAuth.decode_token(JWTAuth.get_token_from_request())
+    return principal_cache.get(payload.get('user_type'), payload.get('user_id'))
+
+@scenario
+def bench_auth_stack(iterations=2000):
+    """Decorator stack microbenchmark - token verifications and time per request"""
+    setup_bench_data(user_count=1)
+    admin_headers = create_bench_admin()
+    
+    @admin_required
+    def context_view():
+        # A view plus a helper that both want the caller, as in /health or /verify
+        get_current_user()
+        JWTAuth.get_current_user_from_token()
+        return 'ok'
+    
+    def per_helper_view():
+        # The same work with each layer re-verifying the token for itself
+        user = per_helper_principal()
+        if user.get_role() != 'admin':
+            return 'forbidden'
+        per_helper_principal()
+        per_helper_principal()
+        return 'ok'
+    
+    print(f"🔑 Auth decorator stack ({iterations} requests)")
+    print(f"{'stack':>12} {'decodes/request':>16} {'us/request':>11}")
+    
+    for label, view in (('per-helper', per_helper_view), ('context', context_view)):
+        with app.test_request_context('/', headers=admin_headers):
+            view()  # Warm the principal cache
+        with count_token_decodes() as counter:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                with app.test_request_context('/', headers=admin_headers):
+                    view()
+            elapsed = time.perf_counter() - started
+        print(f"{label:>12} {counter[0] / iterations:>16.1f} {elapsed / iterations * 1e6:>11.1f}")
+    
+    client = app.test_client()
+    print(f"{'endpoint':>20} {'decodes':>8}")
+    for url in ('/api/auth/verify', '/health', '/api/dashboard/admin'):
+        with count_token_decodes() as counter:
+            client.get(url, headers=admin_headers)
+        print(f"{url:>20} {counter[0]:>8}")
+
+@scenario
+def bench_json(iterations=200):
+    """Response serialization - stdlib json vs orjson over real payloads from each blueprint"""
+    _, headers = setup_bench_data()
+    admin_headers = create_bench_admin()
+    create_bench_lots(60)  # 300 completed reservations across 61 lots
+    client = app.test_client()
+    
+    payload_urls = (
+        ('auth profile', '/api/auth/profile', headers[0]),
+        ('user lots', '/api/dashboard/user/parking-lots?per_page=100', headers[0]),
+        ('admin dashboard', '/api/dashboard/admin', admin_headers),
+        ('admin users', '/api/admin/users?per_page=100', admin_headers),
+        ('admin reservations', '/api/admin/reservations?per_page=100', admin_headers),
+    )
+    payloads = [(label, client.get(url, headers=endpoint_headers).get_json()) for label, url, endpoint_headers in payload_urls]
+    
+    encoders = ['stdlib'] + (['auto'] if json_provider.orjson is not None else [])
+    if len(encoders) == 1:
+        print('⚠️  orjson is not installed - timing the stdlib encoder only')
+    
+    print(f"🧾 JSON response serialization ({iterations} responses each)")
+    print(f"{'payload':>19} {'KB':>7} {'stdlib us':>10} {'orjson us':>10} {'speedup':>8}")
+    
+    with app.app_context():
+        for label, payload in payloads:
+            timings = []
+            for encoder in encoders:
+                app.config['JSON_ENCODER'] = encoder
+                size = len(app.json.response(payload).get_data())
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    app.json.response(payload)
+                timings.append((time.perf_counter() - started) / iterations * 1e6)
+            fast = f"{timings[1]:>10.1f} {timings[0] / timings[1]:>7.1f}x" if len(timings) > 1 else f"{'-':>10} {'-':>8}"
+            print(f"{label:>19} {size / 1024:>7.1f} {timings[0]:>10.1f} {fast}")
+
+@scenario
+def bench_compression(iterations=50):
+    """Response compression - bytes saved and CPU spent per response at a few gzip/brotli levels"""
+    lot_id, headers = setup_bench_data(spot_count=500)
+    admin_headers = create_bench_admin()
+    create_bench_lots(60)  # 300 completed reservations across 61 lots
+    client = app.test_client()
+    
+    payload_urls = (
+        ('admin users', '/api/admin/users?per_page=100'),
+        ('admin reservations', '/api/admin/reservations?per_page=100'),
+        ('dashboard users', '/api/dashboard/admin/users'),
+        ('lot (500 spots)', f'/api/admin/parking-lots/{lot_id}'),
+    )
+    # Identity bodies as the app sends them without Accept-Encoding
+    payloads = [(label, client.get(url, headers=admin_headers).get_data()) for label, url in payload_urls]
+    
+    settings = [('gzip', level) for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        settings += [('br', quality) for quality in (1, 4, 9)]
+    else:
+        print('⚠️  brotli is not installed - gzip only')
+    
+    print(f"🗜️  Response compression ({iterations} responses each)")
+    print(f"{'payload':>19} {'coding':>7} {'raw KB':>7} {'sent KB':>8} {'saved':>6} {'us/resp':>8}")
+    
+    for label, body in payloads:
+        for coding, level in settings:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                compressed = compression.compress_body(body, coding, level)
+            elapsed = (time.perf_counter() - started) / iterations
+            saved = 1 - len(compressed) / len(body)
+            print(f"{label:>19} {coding + '-' + str(level):>7} {len(body) / 1024:>7.1f} "
+                  f"{len(compressed) / 1024:>8.1f} {saved * 100:>5.0f}% {elapsed * 1e6:>8.0f}")
+    
+    # End to end through the after_request hook at the configured levels
+    print(f"{'endpoint':>19} {'coding':>7} {'raw KB':>7} {'sent KB':>8} {'ms':>8}")
+    for label, url in payload_urls:
+        for coding in compression.available_encodings():
+            started = time.perf_counter()
+            response = client.get(url, headers={**admin_headers, 'Accept-Encoding': coding})
+            elapsed = time.perf_counter() - started
+            raw = dict(payloads)[label]
+            print(f"{label:>19} {response.headers.get('Content-Encoding', 'none'):>7} {len(raw) / 1024:>7.1f} "
+                  f"{len(response.get_data()) / 1024:>8.1f} {elapsed * 1000:>8.1f}")
+
+def seed_reservation_history(row_count, user_ids, spot_ids, batch_size=10000):
+    """Bulk-insert completed reservations one second apart, spread round-robin over user_ids and spot_ids"""
+    started_at = datetime(2020, 1, 1)
+    with app.app_context():
+        for start in range(0, row_count, batch_size):
+            db.session.execute(insert(Reservation), [{
+                'spot_id': spot_ids[i % len(spot_ids)],
+                'user_id': user_ids[i % len(user_ids)],
+                'vehicle_number': f'KA01HX{i % 10000:04d}',
+                'status': 'completed',
+                'parking_timestamp': started_at + timedelta(seconds=i),
+                'leaving_timestamp': started_at + timedelta(seconds=i + 3600),
+                'parking_cost': 40.0,
+                'created_at': started_at + timedelta(seconds=i),
+                'updated_at': started_at + timedelta(seconds=i)
+            } for i in range(start, min(start + batch_size, row_count))])
+        db.session.commit()
+
+@scenario
+def bench_cursor_pages(row_count=1000000, per_page=20, depths=(1, 100, 1000, 10000)):
+    """Reservation lists - latency of deep pages, OFFSET paging vs cursors"""
+    lot_id, headers = setup_bench_data(user_count=4)
+    admin_headers = create_bench_admin()
+    with app.app_context():
+        user_ids = [user.id for user in User.query.order_by(User.id)]
+        spot_id = ParkingSpot.query.filter_by(lot_id=lot_id).first().id
+    seed_reservation_history(row_count, user_ids, [spot_id])
+    client = app.test_client()
+    
+    endpoints = (
+        ('admin list', '/api/admin/reservations', admin_headers, None),
+        ('user history', '/api/dashboard/user/reservations', headers[0], user_ids[0]),
+    )
+    
+    print(f"📜 Reservation list depth ({row_count} reservations, {per_page} per page)")
+    print(f"{'endpoint':>13} {'page':>6} {'offset ms':>10} {'cursor ms':>10} {'+exact count ms':>16}")
+    
+    for label, url, endpoint_headers, user_id in endpoints:
+        for depth in depths:
+            # The cursor a client would hold after scrolling to this page
+            cursor = ''
+            if depth > 1:
+                with app.app_context():
+                    query = Reservation.query if user_id is None else Reservation.query.filter_by(user_id=user_id)
+                    last = query.order_by(desc(Reservation.created_at), desc(Reservation.id)).offset((depth - 1) * per_page - 1).first()
+                    cursor = encode_cursor(last.created_at, last.id)
+            
+            timings = []
+            for query_string in (f'page={depth}', f'cursor={cursor}', f'cursor={cursor}&count=exact'):
+                started = time.perf_counter()
+                response = client.get(f'{url}?per_page={per_page}&{query_string}', headers=endpoint_headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                assert len(response.get_json()['data']['reservations']) == per_page
+            print(f"{label:>13} {depth:>6} {timings[0]:>10.1f} {timings[1]:>10.1f} {timings[2]:>16.1f}")
+
+@scenario
+def bench_lot_browsing(lot_count=300, per_page=20):
+    """User lot browsing - full pages and statements per page when most lots have no free spots"""
+    lot_id, headers = setup_bench_data()
+    create_bench_lots(lot_count)
+    with app.app_context():
+        # Two lots in three are full
+        ParkingLot.query.filter(ParkingLot.id % 3 != 0).update({
+            ParkingLot.occupied_count: ParkingLot.number_of_spots,
+            ParkingLot.available_count: 0
+        }, synchronize_session=False)
+        db.session.commit()
+        open_lots = ParkingLot.query.filter(ParkingLot.available_count > 0).count()
+    app.config['LOT_LIST_CACHE_MAX_ENTRIES'] = 0  # Measure building pages, not serving them from the cache
+    client = app.test_client()
+    
+    print(f"🅿️  User lot browsing ({lot_count + 1} lots, {open_lots} with free spots, {per_page} per page)")
+    print(f"{'sort':>16} {'pages':>6} {'lots':>5} {'short pages':>12} {'queries/page':>13} {'ms/page':>8}")
+    
+    for sort in routes.dashboard.BROWSE_SORTS:
+        seen, short_pages, elapsed = [], 0, 0
+        page = 1
+        with count_queries() as counter:
+            while True:
+                started = time.perf_counter()
+                data = client.get(f'/api/dashboard/user/parking-lots?sort={sort}&page={page}&per_page={per_page}',
+                                  headers=headers[0]).get_json()['data']
+                elapsed += time.perf_counter() - started
+                seen += [lot['id'] for lot in data['lots']]
+                if not data['pagination']['has_next']:
+                    break
+                short_pages += len(data['lots']) < per_page
+                page += 1
+        assert sorted(seen) == sorted(set(seen)) and len(seen) == open_lots
+        print(f"{sort:>16} {page:>6} {len(seen):>5} {short_pages:>12} {counter[0] / page:>13.1f} {elapsed / page * 1000:>8.1f}")
+
+SEARCH_FIRST_NAMES = ('Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rohan', 'Meera')
+SEARCH_LAST_NAMES = ('Sharma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Rao', 'Patel', 'Menon', 'Singh', 'Das')
+SEARCH_AREAS = ('Koramangala', 'Indiranagar', 'Whitefield', 'Jayanagar', 'Hebbal', 'Malleshwaram', 'Yelahanka', 'Marathahalli')
+
+def seed_search_data(user_count, lot_count, batch_size=10000):
+    """Bulk-insert named users, and lots with one spot each, for search benchmarks; returns the spot ids"""
+    password_hash = generate_password_hash('password123')
+    with app.app_context():
+        for start in range(0, user_count, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, user_count)):
+                first = SEARCH_FIRST_NAMES[i % len(SEARCH_FIRST_NAMES)]
+                last = SEARCH_LAST_NAMES[i // len(SEARCH_FIRST_NAMES) % len(SEARCH_LAST_NAMES)]
+                rows.append({
+                    'username': f'{first.lower()}_{last.lower()}_{i}',
+                    'email': f'{first.lower()}.{last.lower()}{i}@example.com',
+                    'password_hash': password_hash,
+                    'full_name': f'{first} {last}',
+                    'phone_number': f'98{i:08d}',
+                    'created_at': datetime(2020, 1, 1) + timedelta(minutes=i)
+                })
+            db.session.execute(insert(User), rows)
+        db.session.execute(insert(ParkingLot), [{
+            'prime_location_name': f'{SEARCH_AREAS[i % len(SEARCH_AREAS)]} Parking {i}',
+            'address': f'{i} Main Road, {SEARCH_AREAS[(i * 3) % len(SEARCH_AREAS)]}, Bangalore',
+            'pin_code': f'560{i % 1000:03d}',
+            'price_per_hour': 20.0 + i % 40,
+            'number_of_spots': 1,
+            'available_count': 1
+        } for i in range(lot_count)])
+        lot_ids = [lot_id for (lot_id,) in db.session.query(ParkingLot.id).filter(~ParkingLot.parking_spots.any())]
+        db.session.execute(insert(ParkingSpot), [{'lot_id': lot_id, 'spot_number': 'S1'} for lot_id in lot_ids])
+        db.session.commit()
+        return [spot_id for (spot_id,) in db.session.query(ParkingSpot.id).filter(ParkingSpot.lot_id.in_(lot_ids))]
+
+@scenario
+def bench_search(user_count=100000, lot_count=2000, repeats=5):
+    """Lot and user search - full-text index vs LIKE scans, with 100k users"""
+    lot_id, headers = setup_bench_data(user_count=1)
+    admin_headers = create_bench_admin()
+    spot_ids = seed_search_data(user_count, lot_count)
+    with app.app_context():
+        user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+    seed_reservation_history(user_count, user_ids, spot_ids)  # One reservation per user, spread over the lots
+    app.config['LOT_LIST_CACHE_MAX_ENTRIES'] = 0  # Time the search, not the page cache
+    client = app.test_client()
+    
+    searches = (
+        ('admin users', '/api/admin/users?search=priya%20sharma', admin_headers),
+        ('admin users', '/api/admin/users?search=98000042', admin_headers),
+        ('admin users', '/api/admin/users?search=menon', admin_headers),
+        ('admin reservations', '/api/admin/reservations?user=kavya.rao', admin_headers),
+        ('admin reservations', '/api/admin/reservations?lot=whitefield', admin_headers),
+        ('admin lots', '/api/admin/parking-lots?search=whitefield', admin_headers),
+        ('user lot browsing', '/api/dashboard/user/parking-lots?search=560042', headers[0]),
+        ('user lot browsing', '/api/dashboard/user/parking-lots?search=koramangala%20parking%201', headers[0]),
+    )
+    
+    print(f"🔎 Search ({user_count} users, {lot_count} lots, {user_count} reservations; median of {repeats})")
+    print(f"{'endpoint':>19} {'term':>22} {'matches':>8} {'LIKE ms':>8} {'index ms':>9}")
+    
+    for label, url, endpoint_headers in searches:
+        timings, totals = [], []
+        for enabled in (False, True):
+            app.config['SEARCH_INDEX_ENABLED'] = enabled
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                data = client.get(url, headers=endpoint_headers).get_json()['data']
+                samples.append(time.perf_counter() - started)
+            timings.append(percentile(samples, 0.5) * 1000)
+            totals.append(data['pagination']['total'])
+        term = unquote(url.split('=', 1)[1])
+        matches = totals[1] if totals[0] == totals[1] else f'{totals[0]}/{totals[1]}'
+        print(f"{label:>19} {term:>22} {matches:>8} {timings[0]:>8.1f} {timings[1]:>9.1f}")
+
+@scenario
+def bench_availability_stream(subscriber_counts=(1, 100, 1000), events=50):
+    """Availability SSE - publish cost and delivery delay as the number of open streams grows"""
+    lot_id, headers = setup_bench_data()
+    
+    print(f"📡 Availability stream fan-out ({events} lot updates, one thread per waiting stream)")
+    print(f"{'streams':>8} {'publish ms':>11} {'deliver p50 ms':>15} {'deliver p99 ms':>15}")
+    
+    for subscriber_count in subscriber_counts:
+        feed = AvailabilityFeed()
+        published = {}  # sequence number -> time the write committed
+        delays = []
+        lock = threading.Lock()
+        ready = threading.Barrier(subscriber_count + 1)
+        
+        def subscribe():
+            stream = feed.stream(0)
+            next(stream)  # The retry: line - the stream is waiting from here on
+            ready.wait()
+            seen, own = 0, []
+            for chunk in stream:
+                now = time.perf_counter()
+                for line in chunk.splitlines():
+                    if line.startswith('id: '):
+                        seen = int(line.rsplit('-', 1)[1])
+                        own.append(now - published[seen])
+                if seen >= events:
+                    break
+            stream.close()
+            with lock:
+                delays.extend(own)
+        
+        threads = [threading.Thread(target=subscribe) for _ in range(subscriber_count)]
+        for thread in threads:
+            thread.start()
+        ready.wait()
+        
+        publish_times = []
+        with app.app_context():
+            for sequence in range(1, events + 1):
+                # Book and release a spot in turn so every publish has a change to send
+                step = -1 if sequence % 2 else 1
+                ParkingLot.query.filter_by(id=lot_id).update({
+                    ParkingLot.available_count: ParkingLot.available_count + step,
+                    ParkingLot.occupied_count: ParkingLot.occupied_count - step
+                })
+                db.session.commit()
+                published[sequence] = time.perf_counter()
+                feed.publish(lot_id)
+                publish_times.append(time.perf_counter() - published[sequence])
+                time.sleep(0.02)
+        
+        for thread in threads:
+            thread.join()
+        assert len(delays) == subscriber_count * events
+        print(f"{subscriber_count:>8} {percentile(publish_times, 0.5) * 1000:>11.2f} "
+              f"{percentile(delays, 0.5) * 1000:>15.2f} {percentile(delays, 0.99) * 1000:>15.2f}")
+
+if __name__ == '__main__':
+    benchmarks = {
+        'booking': bench_booking,
+        'admin-lots': bench_admin_lots,
+        'reservation-lists': bench_reservation_lists,
+        'login': bench_login,
+        'login-attack': bench_login_attack,
+        'auth-stack': bench_auth_stack,
+        'json': bench_json,
+        'compression': bench_compression,
+        'cursor-pages': bench_cursor_pages,
+        'availability-stream': bench_availability_stream,
+        'lot-browsing': bench_lot_browsing,
+        'search': bench_search,
+    }
+    
+    if len(sys.argv) > 1 and sys.argv[1] in benchmarks:
+        benchmarks[sys.argv[1]]()
+    else:
+        print(f"Usage: python benchmarks.py [{'|'.join(benchmarks)}]")
@@ -0,0 +1,119 @@
+"""
+Response Compression for Vehicle Parking System
+Negotiates brotli or gzip from Accept-Encoding and compresses large JSON and text
+responses - streamed ones chunk by chunk - while small bodies go out untouched
+"""
+
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Optional - only gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'text/csv', 'application/javascript')
+
+def available_encodings():
+    """Content codings this process can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def encoded_etag(etag, coding):
+    """ETag of a compressed representation - its bytes differ from the identity body's"""
+    return f'{etag}-{coding}'
+
+def _setting(key, default):
+    """Read a setting from app config when available"""
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        return default
+
+class StreamCompressor:
+    """One incremental gzip or brotli stream"""
+    
+    def __init__(self, coding, level):
+        self.coding = coding
+        if coding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16+ = gzip framing
+    
+    def compress(self, data):
+        """Feed data in; returns whatever compressed output is ready"""
+        if self.coding == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+    
+    def flush(self):
+        """Emit everything fed so far, so a streaming client can decode it without waiting for the end"""
+        if self.coding == 'br':
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self):
+        """End the stream"""
+        if self.coding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def compression_level(coding):
+    """Configured level for a coding - COMPRESS_GZIP_LEVEL (1-9) or COMPRESS_BROTLI_QUALITY (0-11)"""
+    if coding == 'br':
+        return _setting('COMPRESS_BROTLI_QUALITY', 4)
+    return _setting('COMPRESS_GZIP_LEVEL', 6)
+
+def compress_body(body, coding, level=None):
+    """Compress a whole body in one go"""
+    compressor = StreamCompressor(coding, compression_level(coding) if level is None else level)
+    return compressor.compress(body) + compressor.finish()
+
+def compress_stream(chunks, coding, level):
+    """Compress a streamed body chunk by chunk, flushing after each so nothing is held back"""
+    compressor = StreamCompressor(coding, level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        # Closing the response closes this generator; pass that on to the view's iterable
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def compress_response(response):
+    """after_request hook: compress the body when the client accepts it and it is big enough to be worth it"""
+    if not _setting('COMPRESS_ENABLED', True):
+        return response
+    if response.mimetype not in _setting('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    # The body depends on Accept-Encoding even when this particular one goes out uncompressed
+    response.vary.add('Accept-Encoding')
+    
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    
+    coding = request.accept_encodings.best_match(available_encodings())
+    if coding is None:
+        return response
+    
+    if response.is_streamed:
+        # Length unknown up front - compress as it is sent
+        response.response = compress_stream(response.response, coding, compression_level(coding))
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < _setting('COMPRESS_MIN_SIZE', 1024):
+            return response
+        response.set_data(compress_body(body, coding))
+    
+    response.headers['Content-Encoding'] = coding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, coding), weak)
+    return response
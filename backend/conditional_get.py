@@ -0,0 +1,51 @@
+"""
+Conditional GET for Vehicle Parking System
+Strong ETags built from cheap state fingerprints (lot versions, user write stamps) so a
+client holding the current copy gets a 304 before any of the heavy queries run
+"""
+
+import hashlib
+from flask import request, current_app
+from sqlalchemy import func
+from database import db
+from compression import available_encodings, encoded_etag
+from models import User, ParkingLot
+
+def make_etag(*parts):
+    """ETag value for a tuple of state parts"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def lot_state():
+    """
+    Fingerprint of every parking lot: (count, max id, version sum, last update)
+    Versions only ever go up, so any lot or reservation write changes the sum; the
+    count, max id and last update cover lots being created or deleted.
+    """
+    return tuple(db.session.query(
+        func.count(ParkingLot.id),
+        func.max(ParkingLot.id),
+        func.sum(ParkingLot.version),
+        func.max(ParkingLot.updated_at)
+    ).one())
+
+def user_state():
+    """Fingerprint of the users table: (count, max id, last update)"""
+    return tuple(db.session.query(
+        func.count(User.id),
+        func.max(User.id),
+        func.max(User.updated_at)
+    ).one())
+
+def not_modified(etag):
+    """A 304 response if the request's If-None-Match already holds this ETag or a compressed variant of it, else None"""
+    for candidate in (etag,) + tuple(encoded_etag(etag, coding) for coding in available_encodings()):
+        if request.if_none_match.contains_weak(candidate):
+            return with_etag(current_app.response_class(status=304), candidate)
+    return None
+
+def with_etag(response, etag):
+    """Attach a strong ETag and ask clients to revalidate before reusing their copy"""
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
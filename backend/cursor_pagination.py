@@ -0,0 +1,89 @@
+"""
+Keyset Pagination for Vehicle Parking System
+Opaque cursors over (created_at, id), newest first, so a deep page costs the same as
+the first one - no OFFSET scan, and no COUNT(*) unless the client asks for a total
+"""
+
+import base64
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, desc, tuple_
+
+COUNT_MODES = ('none', 'approximate', 'exact')
+MAX_ROW_ID = 2 ** 63 - 1  # Largest id SQLite can bind
+
+class InvalidPagination(ValueError):
+    """Raised for a cursor this API didn't issue, or an unknown count mode"""
+    pass
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past the row with this (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor made by encode_cursor()"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        created_at, row_id = datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidPagination('Invalid cursor')
+    # Issued cursors hold naive UTC timestamps and real ids; anything else was edited
+    if created_at.tzinfo is not None or not 0 < row_id <= MAX_ROW_ID:
+        raise InvalidPagination('Invalid cursor')
+    return created_at, row_id
+
+def count_rows(query, model, count_mode):
+    """
+    Total for a cursor listing, as (total, capped)
+    'none' skips counting, 'exact' runs COUNT(*), and 'approximate' counts at most
+    CURSOR_COUNT_CAP rows - past that the total is reported as the cap with capped=True.
+    """
+    if count_mode == 'none':
+        return None, False
+    
+    rows = query.order_by(None).with_entities(model.id)
+    if count_mode == 'exact':
+        return rows.count(), False
+    
+    cap = current_app.config.get('CURSOR_COUNT_CAP', 10000)
+    total = query.session.query(func.count()).select_from(rows.limit(cap + 1).subquery()).scalar()
+    return min(total, cap), total > cap
+
+def keyset_page_query(query, model, position):
+    """query reordered newest first by (created_at, id), starting after position (None = first page)"""
+    page_query = query.order_by(None).order_by(desc(model.created_at), desc(model.id))
+    if position:
+        page_query = page_query.filter(tuple_(model.created_at, model.id) < position)
+    return page_query
+
+def keyset_paginate(query, model, cursor, per_page, count_mode='none', load=None):
+    """
+    One page of query, newest first by (created_at, id), starting after cursor (empty = first page)
+    load() can add eager-loading options to the page query. Returns (items, pagination dict).
+    """
+    if count_mode not in COUNT_MODES:
+        raise InvalidPagination(f'count must be one of: {", ".join(COUNT_MODES)}')
+    position = decode_cursor(cursor) if cursor else None
+    
+    total, capped = count_rows(query, model, count_mode)
+    
+    page_query = keyset_page_query(query, model, position)
+    if load:
+        page_query = load(page_query)
+    
+    # One extra row tells us whether there is a next page without counting
+    items = page_query.limit(per_page + 1).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    
+    return items, {
+        'mode': 'cursor',
+        'per_page': per_page,
+        'next_cursor': encode_cursor(items[-1].created_at, items[-1].id) if has_next else None,
+        'has_next': has_next,
+        'total': total,
+        'total_capped': capped
+    }
@@ -5,8 +5,22 @@ Provides helper functions for database operations
 
 from app import app
 from database import db
-from models import User, Admin, ParkingLot, ParkingSpot, Reservation
-from datetime import datetime
+from models import User, Admin, ParkingLot, ParkingSpot, Reservation, LotDailyStats
+from user_import import decode_upload, parse_user_rows, import_users, ImportFormatError
+from search_index import lot_search_filter, user_search_filter, rebuild
+from spot_allocator import free_spots_query, lowest_free_spot_query
+from availability_feed import lot_counts_query
+from cursor_pagination import keyset_page_query
+from routes.admin import (
+    lot_page_query, user_page_query, user_statistics_query, user_totals_query, reservation_filters,
+    reservation_list_query, revenue_buckets_query, peak_hours_query, top_spenders_query
+)
+from routes.dashboard import (
+    recent_users_query, recent_reservations_query, browse_filters, browse_page_query, claim_spot, history_query
+)
+from datetime import datetime, date
+from sqlalchemy import inspect, text, func, cast, case, insert
+import re
 
 def reset_database():
     """Drop all tables and recreate them"""
@@ -16,6 +30,205 @@ def reset_database():
         db.create_all()
         print("✅ Database reset completed!")
 
+def upgrade_schema():
+    """Create missing tables and add missing columns to an existing database"""
+    with app.app_context():
+        print("🔧 Upgrading database schema...")
+        db.create_all()
+        
+        inspector = inspect(db.engine)
+        added = 0
+        for table in db.metadata.sorted_tables:
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=db.engine.dialect)}'
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    ddl += f" DEFAULT {default.text if hasattr(default, 'text') else repr(str(default))}"
+                    if not column.nullable:
+                        ddl += ' NOT NULL'
+                
+                db.session.execute(text(ddl))
+                print(f"   + {table.name}.{column.name}")
+                added += 1
+        
+        db.session.commit()
+        
+        # create_all() skips tables that already exist, so add their new indexes here
+        indexes_added = 0
+        for table in db.metadata.sorted_tables:
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(db.engine)
+                    print(f"   + index {index.name}")
+                    indexes_added += 1
+        
+        print(f"✅ Schema upgrade completed ({added} columns, {indexes_added} indexes added)")
+    
+    # New counter columns start at zero, so bring them in line with the spots
+    reconcile_spot_counts()
+    
+    # Backfill (or refresh) the analytics rollup from reservation history
+    rebuild_lot_stats()
+
+def reconcile_spot_counts():
+    """Recompute every lot's denormalized spot counters and fix any drift"""
+    with app.app_context():
+        print("🔍 Reconciling parking lot spot counters...")
+        
+        fixed = 0
+        for lot in ParkingLot.query.all():
+            before = (lot.available_count, lot.occupied_count)
+            if lot.recount_spots():
+                fixed += 1
+                print(f"   - {lot.prime_location_name}: {before[0]}/{before[1]} -> {lot.available_count}/{lot.occupied_count} (available/occupied)")
+        
+        db.session.commit()
+        
+        if fixed:
+            print(f"✅ Fixed spot counters on {fixed} parking lots")
+        else:
+            print("✅ All spot counters are consistent!")
+        
+        return fixed
+
+def rebuild_lot_stats():
+    """Rebuild the lot_daily_stats rollup from completed reservation history"""
+    with app.app_context():
+        print("📊 Rebuilding lot analytics rollup...")
+        
+        leaving_date = func.date(Reservation.leaving_timestamp)
+        leaving_hour = cast(func.strftime('%H', Reservation.leaving_timestamp), db.Integer)
+        history = db.session.query(
+            ParkingSpot.lot_id,
+            leaving_date,
+            leaving_hour,
+            func.coalesce(func.sum(Reservation.parking_cost), 0),
+            func.count(Reservation.id),
+            func.count(case((Reservation.parking_cost != 0, Reservation.id))),
+            func.sum(Reservation.duration_minutes)
+        ).join(Reservation, Reservation.spot_id == ParkingSpot.id)\
+        .filter(Reservation.status == 'completed',
+                Reservation.leaving_timestamp.isnot(None))\
+        .group_by(ParkingSpot.lot_id, leaving_date, leaving_hour)
+        
+        LotDailyStats.query.delete()
+        db.session.execute(insert(LotDailyStats).from_select(
+            ['lot_id', 'date', 'hour', 'revenue', 'sessions', 'costed_sessions', 'total_minutes'],
+            history
+        ))
+        db.session.commit()
+        
+        print(f"✅ Rollup rebuilt: {LotDailyStats.query.count()} lot-hour buckets")
+
+def rebuild_search_index():
+    """Re-read every lot and user into the full-text search index"""
+    with app.app_context():
+        print("🔎 Rebuilding search index...")
+        with db.engine.begin() as connection:
+            rebuild(connection)
+        print("✅ Search index rebuilt!")
+
+def hot_queries():
+    """
+    The statements behind the busiest endpoints, as (label, statement) pairs
+    Each comes from the builder its route or helper runs, so the check follows the code;
+    ids, dates and search terms are placeholders.
+    """
+    position = (datetime(2024, 1, 1), 1000)  # A cursor past the first page
+    return [
+        ('user active reservation', Reservation.active_for_user(1).statement),
+        ('spot current reservation', Reservation.active_for_spot(1).statement),
+        ('user reservation page', history_query(1).limit(20).statement),
+        ('user reservation page by status', history_query(1, 'completed').limit(20).statement),
+        ('user reservation cursor page', keyset_page_query(history_query(1), Reservation, position).limit(21).statement),
+        ('user reservation totals', user_totals_query(1).statement),
+        ('free spots in lot', free_spots_query(1).statement),
+        ('lowest free spot in lot', lowest_free_spot_query(1).statement),
+        ('lot spot counts', ParkingSpot.status_counts(1).statement),
+        ('claim spot', claim_spot(1)),
+        ('lot availability', lot_counts_query([1]).statement),
+        ('availability snapshot', lot_counts_query().statement),
+        ('lot browsing page', browse_page_query(browse_filters(''), 'available_spots').limit(20).statement),
+        ('lot browsing search', browse_page_query(browse_filters('mall kora'), 'default').limit(20).statement),
+        ('admin lot page', lot_page_query([], True, 10).statement),
+        ('admin lot search', lot_page_query([lot_search_filter('mall kora')], True, 10).statement),
+        ('admin user page', user_page_query([]).limit(20).statement),
+        ('admin user search', user_page_query([user_search_filter('priya')]).limit(20).statement),
+        ('admin user statistics', user_statistics_query([1, 2, 3]).statement),
+        ('admin reservation page', reservation_list_query(reservation_filters('active')).limit(20).statement),
+        ('admin reservation search',
+         reservation_list_query(reservation_filters(user='priya', lot='mall')).limit(20).statement),
+        ('admin reservation cursor page',
+         keyset_page_query(reservation_list_query([]), Reservation, position).limit(21).statement),
+        ('recent users', recent_users_query().statement),
+        ('recent reservations', recent_reservations_query().statement),
+        ('revenue trend', revenue_buckets_query(date(2024, 1, 1), date(2024, 12, 31), 'month').statement),
+        ('peak hours', peak_hours_query().statement),
+        ('top users by spending', top_spenders_query().statement),
+    ]
+
+def explain_query_plan(statement):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for a statement"""
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[3] for row in rows]
+
+# "SCAN <table>" without "USING ... INDEX" reads every row of the table
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+def full_scans(plan):
+    """Tables a query plan reads in full"""
+    return [match.group(1) for match in map(FULL_SCAN.match, plan) if match]
+
+def check_query_plans():
+    """Fail if any hot query falls back to a full table scan"""
+    with app.app_context():
+        print("🔍 Checking query plans for hot queries...")
+        
+        failures = []
+        for label, statement in hot_queries():
+            plan = explain_query_plan(statement)
+            scanned = full_scans(plan)
+            if scanned:
+                failures.append(label)
+                print(f"   ❌ {label}: full scan of {', '.join(scanned)}")
+            else:
+                print(f"   ✅ {label}: {'; '.join(plan)}")
+        
+        if failures:
+            print(f"⚠️  {len(failures)} hot queries scan whole tables (run: python db_utils.py upgrade)")
+        else:
+            print("✅ Every hot query is served by an index!")
+        
+        return not failures
+
+def import_users_from_file(path):
+    """Bulk-create users from a .csv or .json file"""
+    with app.app_context():
+        print(f"👥 Importing users from {path}...")
+        
+        file_format = 'json' if path.lower().endswith('.json') else 'csv'
+        with open(path, 'rb') as f:
+            content = f.read()
+        
+        try:
+            rows = parse_user_rows(decode_upload(content), file_format)
+        except ImportFormatError as e:
+            print(f"❌ {e}")
+            return False
+        
+        result = import_users(rows)
+        for error in result['errors']:
+            print(f"   - row {error['row']} ({error['username'] or 'no username'}): {error['message']}")
+        print(f"✅ Imported {result['created']} users ({result['failed']} rows rejected)")
+        return result['failed'] == 0
+
 def backup_database():
     """Create a simple backup of critical data"""
     with app.app_context():
@@ -79,6 +292,16 @@ def check_database_health():
             if reservation.parking_spot.status != 'O':
                 issues.append(f"Spot {reservation.parking_spot.id} has active reservation but status is not 'O'")
         
+        # Check denormalized spot counters against the spots themselves
+        spot_counts = dict(
+            ((lot_id, status), count) for lot_id, status, count in
+            db.session.query(ParkingSpot.lot_id, ParkingSpot.status, db.func.count(ParkingSpot.id))
+            .group_by(ParkingSpot.lot_id, ParkingSpot.status).all()
+        )
+        for lot in ParkingLot.query.all():
+            if (lot.available_count, lot.occupied_count) != (spot_counts.get((lot.id, 'A'), 0), spot_counts.get((lot.id, 'O'), 0)):
+                issues.append(f"Parking lot {lot.id} spot counters have drifted (run: python db_utils.py reconcile)")
+        
         if issues:
             print("⚠️  Database issues found:")
             for issue in issues:
@@ -104,7 +327,21 @@ if __name__ == '__main__':
             print("✅ Backup saved to db_backup.json")
         elif command == 'health':
             check_database_health()
+        elif command == 'upgrade':
+            upgrade_schema()
+        elif command == 'reconcile':
+            reconcile_spot_counts()
+        elif command == 'rebuild-stats':
+            rebuild_lot_stats()
+        elif command == 'search-index':
+            rebuild_search_index()
+        elif command == 'query-plans':
+            if not check_query_plans():
+                sys.exit(1)
+        elif command == 'import-users' and len(sys.argv) > 2:
+            if not import_users_from_file(sys.argv[2]):
+                sys.exit(1)
         else:
-            print("Available commands: reset, backup, health")
+            print("Available commands: reset, backup, health, upgrade, reconcile, rebuild-stats, search-index, query-plans, import-users <file>")
     else:
-        print("Usage: python db_utils.py [reset|backup|health]") 
\ No newline at end of file
+        print("Usage: python db_utils.py [reset|backup|health|upgrade|reconcile|rebuild-stats|search-index|query-plans|import-users <file.csv|file.json>]") 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Sparse Fieldsets for Vehicle Parking System
+List endpoints take ?fields=a,b,c and then load only the columns, and run only the
+joins and aggregates, that the requested fields need
+"""
+
+from datetime import datetime
+from flask import request
+from sqlalchemy.orm import load_only
+
+class InvalidFields(ValueError):
+    """Raised when ?fields= names a field the endpoint doesn't have"""
+    pass
+
+class Field:
+    """One output field - the columns it reads, the extra work it relies on, and how to build it"""
+    
+    def __init__(self, value, columns=(), needs=()):
+        self.value = value                # (item, extra) -> JSON value; extra holds per-row aggregates
+        self.columns = tuple(columns)     # Columns of the listed model the value reads
+        self.needs = frozenset(needs)     # Named joins/aggregates the value relies on, e.g. 'details'
+
+def column(attribute):
+    """Field that is one column of the listed model, with datetimes in .isoformat() form"""
+    key = attribute.key
+    
+    def value(item, extra):
+        data = getattr(item, key)
+        return data.isoformat() if isinstance(data, datetime) else data
+    
+    return Field(value, [attribute])
+
+class FieldSet:
+    """The fields one request asked for, out of an endpoint's table of fields"""
+    
+    def __init__(self, table, names=None):
+        self.table = table
+        # Keep the table's order so output and column lists are stable
+        self.names = [name for name in table if names is None or name in names]
+    
+    @classmethod
+    def from_request(cls, table, always=('id',)):
+        """Parse ?fields=; no parameter means every field, and the always-fields are added to any selection"""
+        raw = request.args.get('fields', '').strip()
+        if not raw:
+            return cls(table)
+        
+        names = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = sorted(names - set(table))
+        if unknown:
+            raise InvalidFields(f'Unknown fields: {", ".join(unknown)}. Available: {", ".join(table)}')
+        return cls(table, names | set(always))
+    
+    @property
+    def selects_all(self):
+        """True when no narrower selection was asked for"""
+        return len(self.names) == len(self.table)
+    
+    def needs(self, requirement):
+        """True if any selected field relies on a named join or aggregate"""
+        return any(requirement in self.table[name].needs for name in self.names)
+    
+    def load_only(self, *extra_columns):
+        """Loader option restricting the listed model to the columns the selected fields read"""
+        columns = {}  # Keyed by attribute name - column attributes don't compare with ==
+        for name in self.names:
+            for attribute in self.table[name].columns:
+                columns.setdefault(attribute.key, attribute)
+        for attribute in extra_columns:
+            columns.setdefault(attribute.key, attribute)
+        return load_only(*columns.values())
+    
+    def serialize(self, item, extra=None):
+        """The selected fields of one row"""
+        return {name: self.table[name].value(item, extra) for name in self.names}
+    
+    def project(self, data):
+        """The selected keys of a row that was already built in full (e.g. a cached page)"""
+        return {name: data[name] for name in self.names}
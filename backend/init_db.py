@@ -123,6 +123,10 @@ def create_parking_spots_for_lot(parking_lot):
             
             db.session.add(parking_spot)
             spot_count += 1
+    
+    # Fresh spots are all available
+    parking_lot.available_count = spot_count
+    parking_lot.occupied_count = 0
 
 def create_sample_users():
     """Create sample users for testing"""
@@ -0,0 +1,67 @@
+"""
+JSON Provider for Vehicle Parking System
+Serializes API responses with orjson when it is installed and with the standard library
+otherwise; both produce the same documents, with dates in .isoformat() form
+"""
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional - responses fall back to the stdlib encoder
+    orjson = None
+
+def _default(obj):
+    """Encode the types json can't handle natively - dates match the .isoformat() strings the routes build"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+class ParkingJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider with a pluggable encoder, chosen by the JSON_ENCODER setting
+    'auto' uses orjson when it is importable, 'stdlib' always uses the json module.
+    Keys stay sorted either way; orjson writes non-ASCII text as UTF-8 rather than \\u escapes.
+    """
+    
+    default = staticmethod(_default)
+    
+    @property
+    def encoder(self):
+        """Name of the encoder responses are currently written with"""
+        if orjson is not None and self._app.config.get('JSON_ENCODER', 'auto') == 'auto':
+            return 'orjson'
+        return 'stdlib'
+    
+    def _orjson_options(self):
+        """orjson flags equivalent to the stdlib settings response() would use"""
+        # Datetimes go through _default too, so both encoders format them identically
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def response(self, *args, **kwargs):
+        """Serialize the arguments into an application/json response"""
+        if self.encoder != 'orjson':
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options())
+        except orjson.JSONEncodeError:
+            # Values orjson refuses (e.g. integers past 64 bits) still encode with the stdlib
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,156 @@
+"""
+Login Rate Limiter for Vehicle Parking System
+Token buckets per client IP, per (username, client IP) and per username, checked before any
+password hashing so a credential-stuffing burst is turned away cheaply instead of pinning the CPU
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+
+class MemoryBucketStore:
+    """Token buckets in a dict - only shared by the threads of one process"""
+    
+    def __init__(self, idle_seconds=3600):
+        self.idle_seconds = idle_seconds  # Buckets untouched this long are full again and can be dropped
+        self._lock = threading.Lock()
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._next_prune = time.time() + idle_seconds
+    
+    def take(self, key, capacity, refill_per_second, now):
+        """Take one token from a bucket; returns (allowed, tokens left)"""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            
+            if now >= self._next_prune:
+                cutoff = now - self.idle_seconds
+                self._buckets = {k: v for k, v in self._buckets.items() if v[1] >= cutoff}
+                self._next_prune = now + self.idle_seconds
+            
+            return allowed, tokens
+
+class SQLiteBucketStore:
+    """Token buckets in a small SQLite file, shared by every worker process on the host"""
+    
+    def __init__(self, path, idle_seconds=3600):
+        self.path = path
+        self.idle_seconds = idle_seconds  # Buckets untouched this long are full again and can be dropped
+        self._local = threading.local()
+        self._next_prune = time.time() + idle_seconds
+    
+    def _connection(self):
+        """One connection per thread, created on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+    
+    def take(self, key, capacity, refill_per_second, now):
+        """Take one token from a bucket; returns (allowed, tokens left)"""
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front, so read-refill-write is atomic across processes
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated_at FROM login_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            connection.execute(
+                'INSERT INTO login_buckets (key, tokens, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at',
+                (key, tokens, now)
+            )
+            
+            if now >= self._next_prune:
+                connection.execute('DELETE FROM login_buckets WHERE updated_at < ?', (now - self.idle_seconds,))
+                self._next_prune = now + self.idle_seconds
+            
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        
+        return allowed, tokens
+
+class LoginRateLimiter:
+    """
+    Token buckets for login attempts
+    The strict per-username limit is kept per client IP, so guesses from elsewhere can't lock
+    the owner out; a looser per-account limit still caps guessing spread over many IPs.
+    """
+    
+    def __init__(self, store='memory', ip_burst=30, ip_per_minute=30, username_burst=5, username_per_minute=5,
+                 account_burst=20, account_per_minute=10):
+        self.store_setting = store  # 'memory' or a path to the shared SQLite bucket file
+        self.ip_burst = ip_burst
+        self.ip_per_minute = ip_per_minute
+        self.username_burst = username_burst  # Per (username, client IP)
+        self.username_per_minute = username_per_minute
+        self.account_burst = account_burst  # Per username, whatever the IP
+        self.account_per_minute = account_per_minute
+        self._lock = threading.Lock()
+        self._store = None
+    
+    def _setting(self, key, default):
+        """Read a setting from app config when available"""
+        try:
+            return current_app.config.get(key, default)
+        except RuntimeError:
+            return default
+    
+    def _get_store(self):
+        """Open the bucket store on first use, as configured by LOGIN_RATE_LIMIT_STORE"""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    setting = self._setting('LOGIN_RATE_LIMIT_STORE', self.store_setting)
+                    if setting == 'memory':
+                        self._store = MemoryBucketStore()
+                    else:
+                        os.makedirs(os.path.dirname(os.path.abspath(setting)), exist_ok=True)
+                        self._store = SQLiteBucketStore(setting)
+        return self._store
+    
+    def check(self, ip_address, username):
+        """Spend one attempt for this IP and username; returns seconds to wait, or 0 if allowed"""
+        if not self._setting('LOGIN_RATE_LIMIT_ENABLED', True):
+            return 0
+        
+        store = self._get_store()
+        now = time.time()
+        username = username.lower()
+        buckets = (
+            (f'ip:{ip_address}',
+             self._setting('LOGIN_RATE_LIMIT_IP_BURST', self.ip_burst),
+             self._setting('LOGIN_RATE_LIMIT_IP_PER_MINUTE', self.ip_per_minute) / 60),
+            (f'username:{username}@{ip_address}',
+             self._setting('LOGIN_RATE_LIMIT_USERNAME_BURST', self.username_burst),
+             self._setting('LOGIN_RATE_LIMIT_USERNAME_PER_MINUTE', self.username_per_minute) / 60),
+            (f'account:{username}',
+             self._setting('LOGIN_RATE_LIMIT_ACCOUNT_BURST', self.account_burst),
+             self._setting('LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE', self.account_per_minute) / 60),
+        )
+        
+        for key, capacity, refill_per_second in buckets:
+            allowed, tokens = store.take(key, capacity, refill_per_second, now)
+            if not allowed:
+                # Stop here - a refused attempt must not drain the account's shared bucket too
+                return (1 - tokens) / refill_per_second
+        return 0
+
+# Process-wide login limiter
+login_limiter = LoginRateLimiter()
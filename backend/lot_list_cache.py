@@ -0,0 +1,87 @@
+"""
+Lot Browsing Cache for Vehicle Parking System
+Shares built pages of the user lot list between requests with the same normalised
+search and paging, bounded by LRU eviction and dropped when the lots on a page change
+"""
+
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+class LotListCache:
+    """
+    Process-wide LRU cache of lot list pages keyed by normalised query parameters
+    Each page remembers the lot state fingerprint it was built at and only counts as a
+    hit while that still matches, so writes from other processes can't be served stale;
+    writes in this process call invalidate() after committing to free the memory at once.
+    """
+    
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries  # Pages kept before the least recently used is evicted (0 = off)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # params -> (lot state, page data, ids of the lots the page covers)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def _get_max_entries(self):
+        """Read the size bound from app config when available"""
+        try:
+            return current_app.config.get('LOT_LIST_CACHE_MAX_ENTRIES', self.max_entries)
+        except RuntimeError:
+            return self.max_entries
+    
+    def get(self, params, state, build):
+        """
+        Return the page for these params at this lot state
+        On a miss build() is called and must return (page data, ids of the lots it covers).
+        Cached data is shared between requests and must not be modified.
+        """
+        with self._lock:
+            entry = self._entries.get(params)
+            if entry is not None and entry[0] == state:
+                self._entries.move_to_end(params)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        data, lot_ids = build()
+        
+        max_entries = self._get_max_entries()
+        if max_entries > 0:
+            with self._lock:
+                self._entries[params] = (state, data, frozenset(lot_ids))
+                self._entries.move_to_end(params)
+                while len(self._entries) > max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return data
+    
+    def invalidate(self, lot_id=None):
+        """Drop the pages covering a lot after a write to it, or every page when lot_id is None"""
+        with self._lock:
+            if lot_id is None:
+                dropped = list(self._entries)
+            else:
+                dropped = [params for params, entry in self._entries.items() if lot_id in entry[2]]
+            for params in dropped:
+                del self._entries[params]
+            self.invalidations += len(dropped)
+    
+    def stats(self):
+        """Hit/miss counters and current size, for tuning the size bound"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self._get_max_entries()
+            }
+
+# Process-wide lot list cache shared by the blueprints
+lot_list_cache = LotListCache()
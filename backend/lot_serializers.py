@@ -0,0 +1,43 @@
+"""
+Parking Lot Serializers for Vehicle Parking System
+Field tables for the lot list endpoints, so ?fields= can choose both the columns
+that are loaded and the derived values that are computed
+"""
+
+from field_selection import Field, column
+from models import ParkingLot
+
+def occupancy_rate(lot):
+    """Percentage of a lot's spots that are occupied"""
+    return round((lot.occupied_spots_count / lot.number_of_spots) * 100, 1) if lot.number_of_spots > 0 else 0
+
+# Admin-facing lot fields, as listed by the admin and admin-dashboard lot endpoints
+LOT_FIELDS = {
+    'id': column(ParkingLot.id),
+    'prime_location_name': column(ParkingLot.prime_location_name),
+    'address': column(ParkingLot.address),
+    'pin_code': column(ParkingLot.pin_code),
+    'price_per_hour': column(ParkingLot.price_per_hour),
+    'number_of_spots': column(ParkingLot.number_of_spots),
+    'description': column(ParkingLot.description),
+    'is_active': column(ParkingLot.is_active),
+    'created_at': column(ParkingLot.created_at),
+    'updated_at': column(ParkingLot.updated_at),
+    'available_spots': Field(lambda lot, extra: lot.available_spots_count, [ParkingLot.available_count]),
+    'occupied_spots': Field(lambda lot, extra: lot.occupied_spots_count, [ParkingLot.occupied_count]),
+    'occupancy_rate': Field(lambda lot, extra: occupancy_rate(lot), [ParkingLot.occupied_count, ParkingLot.number_of_spots])
+}
+
+# User-facing lot fields for browsing lots with free spots; the page query computes occupancy_rate
+BROWSE_FIELDS = {
+    'id': column(ParkingLot.id),
+    'name': Field(lambda lot, extra: lot.prime_location_name, [ParkingLot.prime_location_name]),
+    'address': column(ParkingLot.address),
+    'pin_code': column(ParkingLot.pin_code),
+    'price_per_hour': column(ParkingLot.price_per_hour),
+    'available_spots': Field(lambda lot, extra: lot.available_spots_count, [ParkingLot.available_count]),
+    'total_spots': Field(lambda lot, extra: lot.number_of_spots, [ParkingLot.number_of_spots]),
+    'occupancy_rate': Field(lambda lot, extra: round(extra['occupancy_rate'], 1), needs=['occupancy_rate']),
+    'description': column(ParkingLot.description),
+    'created_at': column(ParkingLot.created_at)
+}
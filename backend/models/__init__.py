@@ -1,6 +1,9 @@
 
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import func, cast
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.hybrid import hybrid_property
+from password_hasher import password_hasher
 from database import db
 
 class User(db.Model):
@@ -18,18 +21,24 @@ class User(db.Model):
     phone_number = db.Column(db.String(15), nullable=True)
     address = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
     reservations = db.relationship('Reservation', back_populates='user', lazy='dynamic')
     
+    __table_args__ = (
+        db.Index('ix_users_created_at', 'created_at'),
+        db.Index('ix_users_updated_at', 'updated_at'),
+    )
+    
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     # Flask-Login required properties
     def get_id(self):
@@ -85,11 +94,11 @@ class Admin(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     # Flask-Login required properties
     def get_id(self):
@@ -142,18 +151,62 @@ class ParkingLot(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Denormalized spot counters - kept in step with parking_spots.status
+    available_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    occupied_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # State version - bumped by every lot and reservation write, used for ETags
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships
     parking_spots = db.relationship('ParkingSpot', back_populates='parking_lot', lazy='dynamic', cascade='all, delete-orphan')
+    daily_stats = db.relationship('LotDailyStats', back_populates='parking_lot', lazy='dynamic', cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        db.Index('ix_parking_lots_is_active', 'is_active'),
+        db.Index('ix_parking_lots_created_at', 'created_at'),
+        db.Index('ix_parking_lots_active_available', 'is_active', 'available_count'),  # Lot browsing (free spots only)
+    )
     
     @property
     def available_spots_count(self):
         """Get count of available parking spots"""
-        return self.parking_spots.filter_by(status='A').count()
+        return self.available_count or 0
     
     @property
     def occupied_spots_count(self):
         """Get count of occupied parking spots"""
-        return self.parking_spots.filter_by(status='O').count()
+        return self.occupied_count or 0
+    
+    def adjust_spot_counts(self, available_delta=0, occupied_delta=0):
+        """
+        Shift the spot counters and bump the state version in the current transaction.
+        Issued as a relative UPDATE so concurrent writers don't lose increments.
+        """
+        db.session.query(ParkingLot).filter(ParkingLot.id == self.id).update({
+            ParkingLot.available_count: ParkingLot.available_count + available_delta,
+            ParkingLot.occupied_count: ParkingLot.occupied_count + occupied_delta,
+            ParkingLot.version: ParkingLot.version + 1
+        }, synchronize_session=False)
+        db.session.expire(self, ['available_count', 'occupied_count', 'version'])
+    
+    def bump_version(self):
+        """Bump the state version for a write that doesn't move the spot counters"""
+        db.session.query(ParkingLot).filter(ParkingLot.id == self.id).update({
+            ParkingLot.version: ParkingLot.version + 1
+        }, synchronize_session=False)
+        db.session.expire(self, ['version'])
+    
+    def recount_spots(self):
+        """Recompute the spot counters from parking_spots; returns True if they drifted"""
+        counts = dict(ParkingSpot.status_counts(self.id).all())
+        available, occupied = counts.get('A', 0), counts.get('O', 0)
+        drifted = (self.available_count, self.occupied_count) != (available, occupied)
+        self.available_count = available
+        self.occupied_count = occupied
+        if drifted:
+            self.version = ParkingLot.version + 1
+        return drifted
     
     def __repr__(self):
         return f'<ParkingLot {self.prime_location_name}>'
@@ -178,12 +231,23 @@ class ParkingSpot(db.Model):
     reservations = db.relationship('Reservation', back_populates='parking_spot', lazy='dynamic')
     
     # Composite unique constraint for lot_id and spot_number
-    __table_args__ = (db.UniqueConstraint('lot_id', 'spot_number', name='_lot_spot_uc'),)
+    # (lot_id, status, spot_number) serves per-lot availability counts and first-free-spot lookups
+    __table_args__ = (
+        db.UniqueConstraint('lot_id', 'spot_number', name='_lot_spot_uc'),
+        db.Index('ix_parking_spots_lot_status', 'lot_id', 'status', 'spot_number'),
+    )
     
     @property
     def current_reservation(self):
         """Get current active reservation for this spot"""
-        return self.reservations.filter_by(status='active').first()
+        return Reservation.active_for_spot(self.id).first()
+    
+    @staticmethod
+    def status_counts(lot_id):
+        """Query of (status, count) for one lot's spots"""
+        return db.session.query(ParkingSpot.status, func.count(ParkingSpot.id))\
+            .filter(ParkingSpot.lot_id == lot_id)\
+            .group_by(ParkingSpot.status)
     
     def __repr__(self):
         return f'<ParkingSpot {self.spot_number} in Lot {self.lot_id}>'
@@ -219,7 +283,25 @@ class Reservation(db.Model):
     parking_spot = db.relationship('ParkingSpot', back_populates='reservations')
     user = db.relationship('User', back_populates='reservations')
     
-    @property
+    __table_args__ = (
+        db.Index('ix_reservations_user_status', 'user_id', 'status'),
+        db.Index('ix_reservations_user_created', 'user_id', 'created_at'),
+        db.Index('ix_reservations_spot_status', 'spot_id', 'status'),
+        db.Index('ix_reservations_status_leaving', 'status', 'leaving_timestamp'),
+        db.Index('ix_reservations_created_at', 'created_at'),
+    )
+    
+    @classmethod
+    def active_for_user(cls, user_id):
+        """Query of a user's active reservations (booking allows one at a time)"""
+        return cls.query.filter_by(user_id=user_id, status='active')
+    
+    @classmethod
+    def active_for_spot(cls, spot_id):
+        """Query of the active reservations holding a spot"""
+        return cls.query.filter_by(spot_id=spot_id, status='active')
+    
+    @hybrid_property
     def duration_minutes(self):
         """Calculate parking duration in minutes"""
         if self.leaving_timestamp:
@@ -227,6 +309,12 @@ class Reservation(db.Model):
             return int(duration.total_seconds() / 60)
         return 0
     
+    @duration_minutes.expression
+    def duration_minutes(cls):
+        """SQL form of duration_minutes - whole minutes via julianday, 0 while still parked"""
+        elapsed_ms = func.round((func.julianday(cls.leaving_timestamp) - func.julianday(cls.parking_timestamp)) * 86400000)
+        return func.coalesce(cast(elapsed_ms, db.Integer) // 60000, 0)
+    
     @property
     def duration_hours(self):
         """Calculate parking duration in hours (rounded up)"""
@@ -339,4 +427,77 @@ class Reservation(db.Model):
         }
     
     def __repr__(self):
-        return f'<Reservation {self.id} - User {self.user_id} - Spot {self.spot_id}>' 
\ No newline at end of file
+        return f'<Reservation {self.id} - User {self.user_id} - Spot {self.spot_id}>'
+
+
+class LotDailyStats(db.Model):
+    """
+    Hourly rollup of completed reservations per parking lot, keyed by when the session ended
+    Updated incrementally on release and rebuilt from history with db_utils.py rebuild-stats
+    """
+    __tablename__ = 'lot_daily_stats'
+    
+    lot_id = db.Column(db.Integer, db.ForeignKey('parking_lots.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True)  # 0-23, hour of leaving_timestamp
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    costed_sessions = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Sessions with a non-zero cost
+    total_minutes = db.Column(db.Integer, nullable=False, default=0)  # Sum of duration_minutes
+    
+    # Relationships
+    parking_lot = db.relationship('ParkingLot', back_populates='daily_stats')
+    
+    __table_args__ = (
+        db.Index('ix_lot_daily_stats_date', 'date'),
+    )
+    
+    @classmethod
+    def record_completion(cls, reservation):
+        """Add a just-completed reservation to its lot's bucket in the current transaction"""
+        leaving = reservation.leaving_timestamp
+        statement = sqlite_insert(cls).values(
+            lot_id=reservation.parking_spot.lot_id,
+            date=leaving.date(),
+            hour=leaving.hour,
+            revenue=reservation.parking_cost or 0,
+            sessions=1,
+            costed_sessions=1 if reservation.parking_cost else 0,
+            total_minutes=reservation.duration_minutes
+        )
+        # Upsert with relative increments so concurrent releases don't overwrite each other
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['lot_id', 'date', 'hour'],
+            set_={
+                'revenue': cls.revenue + statement.excluded.revenue,
+                'sessions': cls.sessions + statement.excluded.sessions,
+                'costed_sessions': cls.costed_sessions + statement.excluded.costed_sessions,
+                'total_minutes': cls.total_minutes + statement.excluded.total_minutes
+            }
+        ))
+    
+    def __repr__(self):
+        return f'<LotDailyStats Lot {self.lot_id} {self.date} {self.hour:02d}:00>'
+
+
+class RevokedToken(db.Model):
+    """
+    Server-side JWT revocation list
+    A row with a jti revokes that one token; a row without one revokes every token the
+    account was issued up to issued_before (logout everywhere, deactivation).
+    Rows are pruned once every token they could match has expired.
+    """
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True)
+    user_type = db.Column(db.String(10), nullable=False)  # 'user' or 'admin'
+    user_id = db.Column(db.Integer, nullable=False)
+    issued_before = db.Column(db.Float)  # Unix time with sub-second precision - tokens with iat < this are revoked
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        if self.jti:
+            return f'<RevokedToken {self.jti}>'
+        return f'<RevokedToken {self.user_type} {self.user_id} < {self.issued_before}>'
@@ -0,0 +1,97 @@
+"""
+Password Hashing Pool for Vehicle Parking System
+Runs password hashing and verification on a small bounded thread pool so a burst of
+logins cannot tie up every request worker; callers past the queue limit are turned away
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full - the request should be retried later"""
+    def __init__(self, retry_after):
+        self.retry_after = retry_after  # Seconds the client should wait before retrying
+        super().__init__('Password hashing queue is full')
+
+class PasswordHasher:
+    """Bounded executor for password hashing with a configurable hash method"""
+    
+    def __init__(self, method='pbkdf2:sha256:600000', workers=2, queue_size=32, retry_after=1):
+        self.method = method            # Werkzeug method string in full, as stored in hashes (e.g. 'pbkdf2:sha256:600000')
+        self.workers = workers          # Hashes computed at the same time
+        self.queue_size = queue_size    # Hashes allowed to wait for a worker before callers get HasherBusy
+        self.retry_after = retry_after  # Retry-After seconds reported with HasherBusy
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+    
+    def _setting(self, key, default):
+        """Read a setting from app config when available"""
+        try:
+            return current_app.config.get(key, default)
+        except RuntimeError:
+            return default
+    
+    def _get_method(self):
+        """Hash method new and upgraded hashes are made with"""
+        return self._setting('PASSWORD_HASH_METHOD', self.method)
+    
+    def _ensure_started(self):
+        """Create the pool on first use, sized from app config"""
+        if self._executor is not None:
+            return
+        with self._lock:
+            if self._executor is None:
+                workers = self._setting('PASSWORD_HASH_WORKERS', self.workers)
+                queue_size = self._setting('PASSWORD_HASH_QUEUE_SIZE', self.queue_size)
+                self.retry_after = self._setting('PASSWORD_HASH_RETRY_AFTER_SECONDS', self.retry_after)
+                self._slots = threading.BoundedSemaphore(workers + queue_size)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+                self.workers = workers
+    
+    def _run(self, fn, *args):
+        """Run fn on the pool and wait for it; raise HasherBusy instead of queueing past the limit"""
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy(self.retry_after)
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+    
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self._get_method())
+    
+    def hash_many(self, passwords):
+        """
+        Hash a batch of passwords in parallel across the pool's workers
+        Waits for free slots rather than failing, and holds at most one pool's width of
+        them at a time so logins can still queue while a bulk import runs.
+        """
+        self._ensure_started()
+        method = self._get_method()
+        hashes = []
+        for start in range(0, len(passwords), self.workers):
+            batch = passwords[start:start + self.workers]
+            for _ in batch:
+                self._slots.acquire()
+            try:
+                hashes.extend(self._executor.map(lambda password: generate_password_hash(password, method), batch))
+            finally:
+                for _ in batch:
+                    self._slots.release()
+        return hashes
+    
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, password_hash, password)
+    
+    def needs_rehash(self, password_hash):
+        """True if a stored hash was made with a different method or cost than the configured one"""
+        return password_hash.split('$', 1)[0] != self._get_method()
+
+# Process-wide hashing pool shared by the models and blueprints
+password_hasher = PasswordHasher()
@@ -0,0 +1,125 @@
+"""
+Reservation Serializers for Vehicle Parking System
+Shared JSON shapes for reservation lists, plus the loader options that fetch each
+reservation's spot, lot and user in the same query as the page itself
+"""
+
+from datetime import datetime
+from sqlalchemy.orm import joinedload, contains_eager
+from models import ParkingSpot, Reservation
+from field_selection import Field, FieldSet, column
+
+def with_details(query):
+    """Eager-load spot -> lot and user for every reservation the query returns"""
+    return query.options(
+        joinedload(Reservation.parking_spot).joinedload(ParkingSpot.parking_lot),
+        joinedload(Reservation.user)
+    )
+
+def with_joined_details(query):
+    """Like with_details(), for a query that already joins User, ParkingSpot and ParkingLot"""
+    return query.options(
+        contains_eager(Reservation.parking_spot).contains_eager(ParkingSpot.parking_lot),
+        contains_eager(Reservation.user)
+    )
+
+def live_duration_minutes(reservation):
+    """Minutes parked - a running total for active reservations, the final one otherwise"""
+    if reservation.status == 'active':
+        return (datetime.utcnow() - reservation.parking_timestamp).total_seconds() / 60
+    return reservation.duration_minutes
+
+def live_cost(reservation):
+    """Cost so far for active reservations, the final cost otherwise"""
+    if reservation.status == 'active':
+        return round(live_duration_minutes(reservation) / 60 * reservation.parking_spot.parking_lot.price_per_hour, 2)
+    return reservation.parking_cost or 0
+
+def live_duration_hours(reservation):
+    """Billed hours once completed, hours so far (one decimal) otherwise"""
+    if reservation.status == 'completed':
+        return reservation.duration_hours
+    return round(live_duration_minutes(reservation) / 60, 1)
+
+# Columns the live duration and cost read; 'details' marks fields that need the spot, lot or user loaded
+DURATION_COLUMNS = (Reservation.status, Reservation.parking_timestamp, Reservation.leaving_timestamp)
+COST_COLUMNS = DURATION_COLUMNS + (Reservation.parking_cost,)
+
+def serialize_activity(reservation):
+    """Admin dashboard recent-activity row"""
+    return {
+        'id': reservation.id,
+        'user_name': reservation.user.full_name,
+        'spot_number': reservation.parking_spot.spot_number,
+        'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
+        'status': reservation.status,
+        'created_at': reservation.created_at.isoformat(),
+        'vehicle_number': reservation.vehicle_number
+    }
+
+def serialize_summary(reservation):
+    """Short reservation row used in user dashboards and user details"""
+    return {
+        'id': reservation.id,
+        'spot_number': reservation.parking_spot.spot_number,
+        'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
+        'status': reservation.status,
+        'vehicle_number': reservation.vehicle_number,
+        'parking_timestamp': reservation.parking_timestamp.isoformat(),
+        'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
+        'duration_minutes': reservation.duration_minutes,
+        'parking_cost': reservation.parking_cost
+    }
+
+HISTORY_FIELDS = {
+    'id': column(Reservation.id),
+    'spot_number': Field(lambda r, extra: r.parking_spot.spot_number, needs=['details']),
+    'lot_name': Field(lambda r, extra: r.parking_spot.parking_lot.prime_location_name, needs=['details']),
+    'lot_address': Field(lambda r, extra: r.parking_spot.parking_lot.address, needs=['details']),
+    'lot_price_per_hour': Field(lambda r, extra: r.parking_spot.parking_lot.price_per_hour, needs=['details']),
+    'status': column(Reservation.status),
+    'vehicle_number': column(Reservation.vehicle_number),
+    'vehicle_model': column(Reservation.vehicle_model),
+    'parking_timestamp': column(Reservation.parking_timestamp),
+    'leaving_timestamp': column(Reservation.leaving_timestamp),
+    'duration_minutes': Field(lambda r, extra: int(live_duration_minutes(r)), DURATION_COLUMNS),
+    'duration_hours': Field(lambda r, extra: live_duration_hours(r), DURATION_COLUMNS),
+    'cost': Field(lambda r, extra: live_cost(r), COST_COLUMNS, needs=['details']),
+    'created_at': column(Reservation.created_at)
+}
+
+ADMIN_FIELDS = {
+    'id': column(Reservation.id),
+    'user': Field(lambda r, extra: {
+        'id': r.user.id,
+        'username': r.user.username,
+        'full_name': r.user.full_name,
+        'email': r.user.email,
+        'phone_number': r.user.phone_number
+    }, needs=['details']),
+    'parking_lot': Field(lambda r, extra: {
+        'id': r.parking_spot.parking_lot.id,
+        'name': r.parking_spot.parking_lot.prime_location_name,
+        'address': r.parking_spot.parking_lot.address,
+        'price_per_hour': r.parking_spot.parking_lot.price_per_hour
+    }, needs=['details']),
+    'spot_number': Field(lambda r, extra: r.parking_spot.spot_number, needs=['details']),
+    'status': column(Reservation.status),
+    'vehicle_number': column(Reservation.vehicle_number),
+    'vehicle_model': column(Reservation.vehicle_model),
+    'parking_timestamp': column(Reservation.parking_timestamp),
+    'leaving_timestamp': column(Reservation.leaving_timestamp),
+    'duration_minutes': Field(lambda r, extra: int(live_duration_minutes(r)), DURATION_COLUMNS),
+    'duration_hours': Field(lambda r, extra: live_duration_hours(r), DURATION_COLUMNS),
+    'cost': Field(lambda r, extra: live_cost(r), COST_COLUMNS, needs=['details']),
+    'created_at': column(Reservation.created_at),
+    'updated_at': column(Reservation.updated_at)
+}
+
+def serialize_history(reservation, fields=None):
+    """A user's own parking history row - every field, or those picked by a FieldSet over HISTORY_FIELDS"""
+    return (fields or FieldSet(HISTORY_FIELDS)).serialize(reservation)
+
+def serialize_admin(reservation, fields=None):
+    """Admin reservation management row - every field, or those picked by a FieldSet over ADMIN_FIELDS"""
+    return (fields or FieldSet(ADMIN_FIELDS)).serialize(reservation)
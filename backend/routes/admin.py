@@ -3,12 +3,22 @@ Admin Management API Routes with JWT Authentication
 Comprehensive admin functionalities for parking lot and user management
 """
 
-from flask import Blueprint, request, jsonify
-from auth_utils import admin_required
-from models import User, Admin, ParkingLot, ParkingSpot, Reservation
+from flask import Blueprint, request, jsonify, current_app
+from auth_utils import admin_required, principal_cache, revocation_store
+from models import User, Admin, ParkingLot, ParkingSpot, Reservation, LotDailyStats
 from database import db
+from spot_allocator import spot_allocator
+from system_stats import system_stats, count_where
+from lot_list_cache import lot_list_cache
+from availability_feed import availability_feed
+from reservation_serializers import with_details, with_joined_details, serialize_summary, serialize_admin, ADMIN_FIELDS
+from user_import import decode_upload, parse_user_rows, import_users, ImportFormatError
+from cursor_pagination import keyset_paginate, InvalidPagination
+from field_selection import Field, FieldSet, InvalidFields, column
+from lot_serializers import LOT_FIELDS
+from search_index import lot_search_filter, user_search_filter
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, case
 import re
 
 # Create admin management blueprint
@@ -94,6 +104,10 @@ def create_parking_spots_for_lot(parking_lot):
                 created_spots.append(parking_spot)
                 spot_count += 1
         
+        # Fresh spots are all available
+        parking_lot.available_count = len(created_spots)
+        parking_lot.occupied_count = 0
+        
         return created_spots
     
     except Exception as e:
@@ -101,6 +115,38 @@ def create_parking_spots_for_lot(parking_lot):
 
 # ==================== PARKING LOT MANAGEMENT ====================
 
+# Revenue and active counts come from the reservations join, which only runs when one of them is asked for
+ADMIN_LOT_FIELDS = {
+    **LOT_FIELDS,
+    'total_revenue': Field(lambda lot, extra: round(extra['total_revenue'], 2), needs=['reservation_totals']),
+    'active_reservations': Field(lambda lot, extra: extra['active_reservations'], needs=['reservation_totals'])
+}
+
+def lot_page_query(filters, totals, limit, offset=0):
+    """
+    One page of the admin lot listing, newest first
+    With totals, each row also carries total_revenue and active_reservations from a grouped
+    outer join over spots and reservations - run only for the lots on the page, which are
+    picked first through the created_at index.
+    """
+    page = ParkingLot.query.filter(*filters)\
+        .order_by(desc(ParkingLot.created_at))\
+        .limit(limit).offset(offset)
+    if not totals:
+        return page
+    
+    return db.session.query(
+        ParkingLot,
+        func.coalesce(func.sum(case(
+            (db.and_(Reservation.status == 'completed', Reservation.parking_cost.isnot(None)), Reservation.parking_cost)
+        )), 0).label('total_revenue'),
+        func.count(case((Reservation.status == 'active', Reservation.id))).label('active_reservations')
+    ).filter(ParkingLot.id.in_(page.with_entities(ParkingLot.id).scalar_subquery()))\
+    .outerjoin(ParkingSpot, ParkingSpot.lot_id == ParkingLot.id)\
+    .outerjoin(Reservation, Reservation.spot_id == ParkingSpot.id)\
+    .group_by(ParkingLot.id)\
+    .order_by(desc(ParkingLot.created_at))
+
 @admin_bp.route('/parking-lots', methods=['GET'])
 @admin_required
 def get_parking_lots():
@@ -110,81 +156,59 @@ def get_parking_lots():
         per_page = request.args.get('per_page', 10, type=int)
         search = request.args.get('search', '').strip()
         status_filter = request.args.get('status', 'all')  # all, active, inactive
+        fields = FieldSet.from_request(ADMIN_LOT_FIELDS)
         
-        # Build query
-        query = ParkingLot.query
+        # Build filters (shared by the count and the page query)
+        filters = []
         
-        # Apply search filter
+        # Apply search filter (name, address or pin code, through the search index)
         if search:
-            query = query.filter(
-                (ParkingLot.prime_location_name.contains(search)) |
-                (ParkingLot.address.contains(search)) |
-                (ParkingLot.pin_code.contains(search))
-            )
+            filters.append(lot_search_filter(search))
         
         # Apply status filter
         if status_filter == 'active':
-            query = query.filter_by(is_active=True)
+            filters.append(ParkingLot.is_active == True)
         elif status_filter == 'inactive':
-            query = query.filter_by(is_active=False)
+            filters.append(ParkingLot.is_active == False)
         
-        # Order by creation date (newest first)
-        query = query.order_by(desc(ParkingLot.created_at))
+        # Clamp paging the same way paginate() does
+        page = max(page, 1)
+        if per_page < 1:
+            per_page = 20
         
-        # Paginate
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Filtered lot count for pagination - no joins needed
+        total = ParkingLot.query.filter(*filters).count()
+        pages = (total + per_page - 1) // per_page
         
-        lots_data = []
-        for lot in pagination.items:
-            # Get revenue data
-            total_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-                Reservation.spot_id.in_([spot.id for spot in lot.parking_spots]),
-                Reservation.status == 'completed',
-                Reservation.parking_cost.isnot(None)
-            ).scalar() or 0
-            
-            # Get active reservations
-            active_reservations = db.session.query(Reservation).filter(
-                Reservation.spot_id.in_([spot.id for spot in lot.parking_spots]),
-                Reservation.status == 'active'
-            ).count()
-            
-            lot_data = {
-                'id': lot.id,
-                'prime_location_name': lot.prime_location_name,
-                'address': lot.address,
-                'pin_code': lot.pin_code,
-                'price_per_hour': lot.price_per_hour,
-                'number_of_spots': lot.number_of_spots,
-                'description': lot.description,
-                'is_active': lot.is_active,
-                'created_at': lot.created_at.isoformat(),
-                'updated_at': lot.updated_at.isoformat(),
-                'available_spots': lot.available_spots_count,
-                'occupied_spots': lot.occupied_spots_count,
-                'occupancy_rate': round((lot.occupied_spots_count / lot.number_of_spots) * 100, 1) if lot.number_of_spots > 0 else 0,
-                'total_revenue': round(total_revenue, 2),
-                'active_reservations': active_reservations
-            }
-            lots_data.append(lot_data)
+        # Only the selected lot columns; the reservation totals need one grouped query over the page's spots and reservations
+        totals = fields.needs('reservation_totals')
+        rows = lot_page_query(filters, totals, per_page, (page - 1) * per_page).options(fields.load_only()).all()
+        
+        lots_data = [
+            fields.serialize(row[0], row._asdict()) if totals else fields.serialize(row)
+            for row in rows
+        ]
         
         return jsonify({
             'success': True,
             'data': {
                 'parking_lots': lots_data,
                 'pagination': {
-                    'page': pagination.page,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'pages': pagination.pages,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total,
+                    'pages': pages,
+                    'has_next': page < pages,
+                    'has_prev': page > 1
                 }
             }
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -308,6 +332,9 @@ def create_parking_lot():
         created_spots = create_parking_spots_for_lot(parking_lot)
         
         db.session.commit()
+        system_stats.invalidate()
+        lot_list_cache.invalidate()
+        availability_feed.publish(parking_lot.id)
         
         return jsonify({
             'success': True,
@@ -373,6 +400,7 @@ def update_parking_lot(lot_id):
         lot.description = data.get('description', '').strip() or None
         lot.is_active = data.get('is_active', lot.is_active)
         lot.updated_at = datetime.utcnow()
+        lot.version = ParkingLot.version + 1
         
         # Regenerate spots if count changed
         spots_message = ""
@@ -381,6 +409,10 @@ def update_parking_lot(lot_id):
             spots_message = f" Parking spots regenerated: {len(created_spots)} spots."
         
         db.session.commit()
+        spot_allocator.invalidate(lot.id)
+        system_stats.invalidate()
+        lot_list_cache.invalidate()
+        availability_feed.publish(lot.id)
         
         return jsonify({
             'success': True,
@@ -430,6 +462,10 @@ def delete_parking_lot(lot_id):
         # Delete the parking lot (spots will be deleted via cascade)
         db.session.delete(lot)
         db.session.commit()
+        spot_allocator.invalidate(lot_id)
+        system_stats.invalidate()
+        lot_list_cache.invalidate()
+        availability_feed.publish(lot_id)
         
         return jsonify({
             'success': True,
@@ -445,6 +481,76 @@ def delete_parking_lot(lot_id):
 
 # ==================== USER MANAGEMENT ====================
 
+# 'statistics' and 'current_reservation' each cost one query per page, and only when selected
+ADMIN_USER_FIELDS = {
+    'id': column(User.id),
+    'username': column(User.username),
+    'email': column(User.email),
+    'full_name': column(User.full_name),
+    'phone_number': column(User.phone_number),
+    'address': column(User.address),
+    'is_active': column(User.is_active),
+    'created_at': column(User.created_at),
+    'statistics': Field(lambda user, extra: extra['statistics'], needs=['statistics']),
+    'current_reservation': Field(lambda user, extra: extra['current_reservation'], needs=['current_reservation'])
+}
+
+def user_statistics_query(user_ids):
+    """Query of (user_id, total, active, completed, spent) for the users that have reservations"""
+    return db.session.query(
+        Reservation.user_id,
+        func.count(Reservation.id),
+        count_where(Reservation.status == 'active'),
+        count_where(Reservation.status == 'completed'),
+        func.sum(case(
+            (db.and_(Reservation.status == 'completed', Reservation.parking_cost.isnot(None)), Reservation.parking_cost)
+        ))
+    ).filter(Reservation.user_id.in_(user_ids)).group_by(Reservation.user_id)
+
+def get_user_statistics(user_ids):
+    """Reservation counts and total spent for each of these users, in one grouped query"""
+    statistics = {
+        user_id: {
+            'total_reservations': 0,
+            'active_reservations': 0,
+            'completed_reservations': 0,
+            'total_spent': 0
+        }
+        for user_id in user_ids
+    }
+    for user_id, total, active, completed, spent in user_statistics_query(user_ids):
+        statistics[user_id] = {
+            'total_reservations': total,
+            'active_reservations': active,
+            'completed_reservations': completed,
+            'total_spent': round(spent or 0, 2)
+        }
+    return statistics
+
+def get_current_reservations(user_ids):
+    """Each of these users' active reservation (None if parked nowhere), with spot and lot in the same query"""
+    current = dict.fromkeys(user_ids)
+    active = with_details(Reservation.query.filter(
+        Reservation.user_id.in_(user_ids),
+        Reservation.status == 'active'
+    ).order_by(Reservation.id))
+    for reservation in active:
+        if current[reservation.user_id] is not None:
+            continue  # Keep the first one, as .first() did
+        duration_minutes = (datetime.utcnow() - reservation.parking_timestamp).total_seconds() / 60
+        current[reservation.user_id] = {
+            'spot_number': reservation.parking_spot.spot_number,
+            'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
+            'vehicle_number': reservation.vehicle_number,
+            'duration_minutes': int(duration_minutes),
+            'parking_timestamp': reservation.parking_timestamp.isoformat()
+        }
+    return current
+
+def user_page_query(filters):
+    """Admin user listing, newest first"""
+    return User.query.filter(*filters).order_by(desc(User.created_at))
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_users():
@@ -454,78 +560,41 @@ def get_users():
         per_page = request.args.get('per_page', 20, type=int)
         search = request.args.get('search', '').strip()
         status_filter = request.args.get('status', 'all')  # all, active, inactive
+        fields = FieldSet.from_request(ADMIN_USER_FIELDS)
         
-        # Build query
-        query = User.query
+        # Build filters
+        filters = []
         
-        # Apply search filter
+        # Apply search filter (username, name, email or phone, through the search index)
         if search:
-            query = query.filter(
-                (User.username.contains(search)) |
-                (User.full_name.contains(search)) |
-                (User.email.contains(search)) |
-                (User.phone_number.contains(search))
-            )
+            filters.append(user_search_filter(search))
         
         # Apply status filter
         if status_filter == 'active':
-            query = query.filter_by(is_active=True)
+            filters.append(User.is_active == True)
         elif status_filter == 'inactive':
-            query = query.filter_by(is_active=False)
+            filters.append(User.is_active == False)
         
-        # Order by creation date (newest first)
-        query = query.order_by(desc(User.created_at))
+        # Newest first, loading only the columns the selected fields read
+        query = user_page_query(filters).options(fields.load_only())
         
         # Paginate
         pagination = query.paginate(
             page=page, per_page=per_page, error_out=False
         )
         
-        users_data = []
-        for user in pagination.items:
-            # Get user statistics
-            total_reservations = user.reservations.count()
-            active_reservations = user.reservations.filter_by(status='active').count()
-            completed_reservations = user.reservations.filter_by(status='completed').count()
-            
-            # Get total spent
-            total_spent = db.session.query(func.sum(Reservation.parking_cost)).filter(
-                Reservation.user_id == user.id,
-                Reservation.status == 'completed',
-                Reservation.parking_cost.isnot(None)
-            ).scalar() or 0
-            
-            # Get current active reservation
-            current_reservation = None
-            active_res = user.reservations.filter_by(status='active').first()
-            if active_res:
-                duration_minutes = (datetime.utcnow() - active_res.parking_timestamp).total_seconds() / 60
-                current_reservation = {
-                    'spot_number': active_res.parking_spot.spot_number,
-                    'lot_name': active_res.parking_spot.parking_lot.prime_location_name,
-                    'vehicle_number': active_res.vehicle_number,
-                    'duration_minutes': int(duration_minutes),
-                    'parking_timestamp': active_res.parking_timestamp.isoformat()
-                }
-            
-            user_data = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'full_name': user.full_name,
-                'phone_number': user.phone_number,
-                'address': user.address,
-                'is_active': user.is_active,
-                'created_at': user.created_at.isoformat(),
-                'statistics': {
-                    'total_reservations': total_reservations,
-                    'active_reservations': active_reservations,
-                    'completed_reservations': completed_reservations,
-                    'total_spent': round(total_spent, 2)
-                },
-                'current_reservation': current_reservation
-            }
-            users_data.append(user_data)
+        # Per-page statistics and current reservations in one query each, instead of five per user
+        user_ids = [user.id for user in pagination.items]
+        statistics = get_user_statistics(user_ids) if fields.needs('statistics') else {}
+        current = get_current_reservations(user_ids) if fields.needs('current_reservation') else {}
+        
+        users_data = [
+            fields.serialize(user, {
+                'statistics': statistics.get(user.id),
+                'current_reservation': current.get(user.id)
+            })
+            for user in pagination.items
+        ]
         
         return jsonify({
             'success': True,
@@ -542,12 +611,89 @@ def get_users():
             }
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error loading users: {str(e)}'
         }), 500
 
+@admin_bp.route('/users/import', methods=['POST'])
+@admin_required
+def bulk_import_users():
+    """Create many users at once from a CSV or JSON upload; reports an error per rejected row"""
+    try:
+        upload = request.files.get('file')
+        if upload:
+            file_format = 'json' if upload.filename.lower().endswith('.json') else 'csv'
+            content = upload.read()
+        elif request.is_json:
+            file_format = 'json'
+            content = request.get_json()
+        elif request.mimetype == 'text/csv':
+            file_format = 'csv'
+            content = request.get_data(as_text=True)
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Send a JSON body, a text/csv body, or a "file" upload (.csv or .json)'
+            }), 400
+        
+        try:
+            if upload:
+                content = decode_upload(content)
+            rows = parse_user_rows(content, file_format)
+        except ImportFormatError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        max_rows = current_app.config.get('USER_IMPORT_MAX_ROWS', 5000)
+        if not rows:
+            return jsonify({
+                'success': False,
+                'message': 'No users to import'
+            }), 400
+        if len(rows) > max_rows:
+            return jsonify({
+                'success': False,
+                'message': f'Too many rows ({len(rows)}); import at most {max_rows} users per request'
+            }), 400
+        
+        result = import_users(rows)
+        if result['created']:
+            system_stats.invalidate()
+        
+        return jsonify({
+            'success': True,
+            'message': f"Imported {result['created']} users ({result['failed']} rows rejected)",
+            'data': result
+        }), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': f'Error importing users: {str(e)}'
+        }), 500
+
+def user_totals_query(user_id):
+    """One row of a user's reservation counts by status, total spent and average completed duration"""
+    is_completed = Reservation.status == 'completed'
+    return db.session.query(
+        func.count(Reservation.id),
+        count_where(Reservation.status == 'active'),
+        count_where(is_completed),
+        count_where(Reservation.status == 'cancelled'),
+        func.sum(case((is_completed, Reservation.parking_cost))),
+        func.avg(case((is_completed, Reservation.duration_minutes)), type_=db.Float)
+    ).filter(Reservation.user_id == user_id)
+
 @admin_bp.route('/users/<int:user_id>', methods=['GET'])
 @admin_required
 def get_user_details(user_id):
@@ -555,20 +701,15 @@ def get_user_details(user_id):
     try:
         user = User.query.get_or_404(user_id)
         
-        # Get user statistics
-        total_reservations = user.reservations.count()
-        active_reservations = user.reservations.filter_by(status='active').count()
-        completed_reservations = user.reservations.filter_by(status='completed').count()
-        cancelled_reservations = user.reservations.filter_by(status='cancelled').count()
-        
-        # Get total spent and average session duration
-        completed_res = user.reservations.filter_by(status='completed').all()
-        total_spent = sum([r.parking_cost for r in completed_res if r.parking_cost]) or 0
-        avg_duration = sum([r.duration_minutes for r in completed_res]) / len(completed_res) if completed_res else 0
+        # Get user statistics, total spent and average session duration in one pass
+        (total_reservations, active_reservations, completed_reservations, cancelled_reservations,
+         total_spent, avg_duration) = user_totals_query(user.id).one()
+        total_spent = total_spent or 0
+        avg_duration = avg_duration if avg_duration is not None else 0
         
         # Get current active reservation
         current_reservation = None
-        active_res = user.reservations.filter_by(status='active').first()
+        active_res = with_details(Reservation.active_for_user(user.id)).first()
         if active_res:
             duration_minutes = (datetime.utcnow() - active_res.parking_timestamp).total_seconds() / 60
             current_reservation = {
@@ -584,19 +725,10 @@ def get_user_details(user_id):
             }
         
         # Get recent reservations
-        recent_reservations = []
-        for reservation in user.reservations.order_by(desc(Reservation.created_at)).limit(20):
-            recent_reservations.append({
-                'id': reservation.id,
-                'spot_number': reservation.parking_spot.spot_number,
-                'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
-                'status': reservation.status,
-                'vehicle_number': reservation.vehicle_number,
-                'parking_timestamp': reservation.parking_timestamp.isoformat(),
-                'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
-                'duration_minutes': reservation.duration_minutes,
-                'parking_cost': reservation.parking_cost
-            })
+        recent_reservations = [
+            serialize_summary(reservation)
+            for reservation in with_details(user.reservations.order_by(desc(Reservation.created_at))).limit(20)
+        ]
         
         user_data = {
             'id': user.id,
@@ -639,7 +771,7 @@ def toggle_user_status(user_id):
         
         # Check if user has active reservations
         if user.is_active:  # About to deactivate
-            active_reservations = user.reservations.filter_by(status='active').count()
+            active_reservations = Reservation.active_for_user(user.id).count()
             if active_reservations > 0:
                 return jsonify({
                     'success': False,
@@ -649,6 +781,11 @@ def toggle_user_status(user_id):
         # Toggle status
         user.is_active = not user.is_active
         db.session.commit()
+        principal_cache.invalidate('user', user.id)
+        if not user.is_active:
+            # Sessions issued before deactivation stay dead even if the account is reactivated
+            revocation_store.revoke_all('user', user.id)
+        system_stats.invalidate()
         
         status_text = "activated" if user.is_active else "deactivated"
         
@@ -675,30 +812,8 @@ def toggle_user_status(user_id):
 def get_system_statistics():
     """Get comprehensive system statistics for admin dashboard"""
     try:
-        # Basic counts
-        stats = {
-            'users': {
-                'total': User.query.count(),
-                'active': User.query.filter_by(is_active=True).count(),
-                'inactive': User.query.filter_by(is_active=False).count()
-            },
-            'parking_lots': {
-                'total': ParkingLot.query.count(),
-                'active': ParkingLot.query.filter_by(is_active=True).count(),
-                'inactive': ParkingLot.query.filter_by(is_active=False).count()
-            },
-            'parking_spots': {
-                'total': ParkingSpot.query.count(),
-                'available': ParkingSpot.query.filter_by(status='A').count(),
-                'occupied': ParkingSpot.query.filter_by(status='O').count()
-            },
-            'reservations': {
-                'total': Reservation.query.count(),
-                'active': Reservation.query.filter_by(status='active').count(),
-                'completed': Reservation.query.filter_by(status='completed').count(),
-                'cancelled': Reservation.query.filter_by(status='cancelled').count()
-            }
-        }
+        # Basic counts (shared short-TTL snapshot)
+        stats = system_stats.get()
         
         # Calculate occupancy rate
         if stats['parking_spots']['total'] > 0:
@@ -708,42 +823,27 @@ def get_system_statistics():
         else:
             stats['parking_spots']['occupancy_rate'] = 0
         
-        # Revenue statistics
-        total_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-            Reservation.status == 'completed',
-            Reservation.parking_cost.isnot(None)
-        ).scalar() or 0
-        
-        # Today's revenue
+        # Revenue and average session data - one aggregate pass over the hourly rollup
         today = datetime.utcnow().date()
-        today_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-            Reservation.status == 'completed',
-            Reservation.parking_cost.isnot(None),
-            func.date(Reservation.leaving_timestamp) == today
-        ).scalar() or 0
-        
-        # This month's revenue
         this_month = datetime.utcnow().replace(day=1).date()
-        month_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-            Reservation.status == 'completed',
-            Reservation.parking_cost.isnot(None),
-            Reservation.leaving_timestamp >= this_month
-        ).scalar() or 0
+        total_revenue, today_revenue, month_revenue, total_sessions, costed_sessions, total_minutes = db.session.query(
+            func.sum(LotDailyStats.revenue),
+            func.sum(case((LotDailyStats.date == today, LotDailyStats.revenue))),
+            func.sum(case((LotDailyStats.date >= this_month, LotDailyStats.revenue))),
+            func.sum(LotDailyStats.sessions),
+            func.sum(LotDailyStats.costed_sessions),
+            func.sum(LotDailyStats.total_minutes)
+        ).one()
         
         stats['revenue'] = {
-            'total': round(total_revenue, 2),
-            'today': round(today_revenue, 2),
-            'this_month': round(month_revenue, 2)
+            'total': round(total_revenue or 0, 2),
+            'today': round(today_revenue or 0, 2),
+            'this_month': round(month_revenue or 0, 2)
         }
         
-        # Average session data
-        completed_reservations = Reservation.query.filter_by(status='completed').all()
-        if completed_reservations:
-            avg_duration = sum([r.duration_minutes for r in completed_reservations]) / len(completed_reservations)
-            avg_cost = sum([r.parking_cost for r in completed_reservations if r.parking_cost]) / len([r for r in completed_reservations if r.parking_cost])
-        else:
-            avg_duration = 0
-            avg_cost = 0
+        avg_duration = total_minutes / total_sessions if total_sessions else 0
+        # Average over sessions that were charged, as before the rollup - free and uncosted ones don't drag it down
+        avg_cost = total_revenue / costed_sessions if costed_sessions else 0
         
         stats['averages'] = {
             'session_duration_minutes': round(avg_duration, 1),
@@ -761,8 +861,55 @@ def get_system_statistics():
             'message': f'Error loading statistics: {str(e)}'
         }), 500
 
+@admin_bp.route('/statistics/cache', methods=['GET'])
+@admin_required
+def get_cache_statistics():
+    """Hit/miss counters for this worker's lot browsing cache, and its open availability streams"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'lot_list': lot_list_cache.stats(),
+            'availability_stream': availability_feed.stats()
+        }
+    }), 200
+
 # ==================== RESERVATION MANAGEMENT ====================
 
+def reservation_filters(status='', user='', lot='', date_from='', date_to=''):
+    """Filters for the admin reservation list; unknown statuses and malformed dates are ignored"""
+    filters = []
+    
+    if status in ['active', 'completed', 'cancelled']:
+        filters.append(Reservation.status == status)
+    
+    if user:
+        filters.append(user_search_filter(user, ('username', 'full_name', 'email')))
+    
+    if lot:
+        filters.append(lot_search_filter(lot, ('prime_location_name',)))
+    
+    if date_from:
+        try:
+            from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+            filters.append(func.date(Reservation.parking_timestamp) >= from_date)
+        except ValueError:
+            pass
+    
+    if date_to:
+        try:
+            to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+            filters.append(func.date(Reservation.parking_timestamp) <= to_date)
+        except ValueError:
+            pass
+    
+    return filters
+
+def reservation_list_query(filters):
+    """Admin reservation listing, newest first, joined to user, spot and lot for filtering and loading"""
+    return Reservation.query.join(User).join(ParkingSpot).join(ParkingLot)\
+        .filter(*filters)\
+        .order_by(desc(Reservation.created_at))
+
 @admin_bp.route('/reservations', methods=['GET'])
 @admin_required
 def get_all_reservations():
@@ -777,46 +924,34 @@ def get_all_reservations():
         lot_filter = request.args.get('lot', '').strip()
         date_from = request.args.get('date_from', '').strip()
         date_to = request.args.get('date_to', '').strip()
+        fields = FieldSet.from_request(ADMIN_FIELDS)
         
-        # Build query
-        query = Reservation.query.join(User).join(ParkingSpot).join(ParkingLot)
-        
-        # Apply filters
-        if status_filter and status_filter in ['active', 'completed', 'cancelled']:
-            query = query.filter(Reservation.status == status_filter)
+        def load(query):
+            """Only the columns the requested fields read; user, spot and lot only if a field shows them"""
+            query = query.options(fields.load_only(Reservation.created_at))
+            return with_joined_details(query) if fields.needs('details') else query
         
-        if user_filter:
-            search_filter = f"%{user_filter}%"
-            query = query.filter(
-                db.or_(
-                    User.username.ilike(search_filter),
-                    User.full_name.ilike(search_filter),
-                    User.email.ilike(search_filter)
-                )
-            )
+        # Build query (user and lot filters go through the search index)
+        query = reservation_list_query(
+            reservation_filters(status_filter, user_filter, lot_filter, date_from, date_to)
+        )
         
-        if lot_filter:
-            search_filter = f"%{lot_filter}%"
-            query = query.filter(
-                ParkingLot.prime_location_name.ilike(search_filter)
+        # Opt-in cursor mode (?cursor= for the first page) - cost stays flat however deep the client scrolls
+        if 'cursor' in request.args:
+            reservations, pagination = keyset_paginate(
+                query, Reservation, request.args.get('cursor', '').strip(), max(per_page, 1),
+                count_mode=request.args.get('count', 'none'), load=load
             )
+            return jsonify({
+                'success': True,
+                'data': {
+                    'reservations': [serialize_admin(reservation, fields) for reservation in reservations],
+                    'pagination': pagination
+                }
+            }), 200
         
-        if date_from:
-            try:
-                from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-                query = query.filter(func.date(Reservation.parking_timestamp) >= from_date)
-            except ValueError:
-                pass
-        
-        if date_to:
-            try:
-                to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-                query = query.filter(func.date(Reservation.parking_timestamp) <= to_date)
-            except ValueError:
-                pass
-        
-        # Order by latest first
-        query = query.order_by(desc(Reservation.created_at))
+        # Latest first; reuse the joins above to load each row's user, spot and lot
+        query = load(query)
         
         # Get pagination
         pagination = query.paginate(
@@ -824,46 +959,7 @@ def get_all_reservations():
             error_out=False
         )
         
-        reservations_data = []
-        for reservation in pagination.items:
-            duration_minutes = 0
-            current_cost = 0
-            
-            if reservation.status == 'active':
-                # Calculate current duration and estimated cost
-                duration_minutes = (datetime.utcnow() - reservation.parking_timestamp).total_seconds() / 60
-                current_cost = round(duration_minutes / 60 * reservation.parking_spot.parking_lot.price_per_hour, 2)
-            else:
-                duration_minutes = reservation.duration_minutes
-                current_cost = reservation.parking_cost or 0
-            
-            reservations_data.append({
-                'id': reservation.id,
-                'user': {
-                    'id': reservation.user.id,
-                    'username': reservation.user.username,
-                    'full_name': reservation.user.full_name,
-                    'email': reservation.user.email,
-                    'phone_number': reservation.user.phone_number
-                },
-                'parking_lot': {
-                    'id': reservation.parking_spot.parking_lot.id,
-                    'name': reservation.parking_spot.parking_lot.prime_location_name,
-                    'address': reservation.parking_spot.parking_lot.address,
-                    'price_per_hour': reservation.parking_spot.parking_lot.price_per_hour
-                },
-                'spot_number': reservation.parking_spot.spot_number,
-                'status': reservation.status,
-                'vehicle_number': reservation.vehicle_number,
-                'vehicle_model': reservation.vehicle_model,
-                'parking_timestamp': reservation.parking_timestamp.isoformat(),
-                'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
-                'duration_minutes': int(duration_minutes),
-                'duration_hours': reservation.duration_hours if reservation.status == 'completed' else round(duration_minutes / 60, 1),
-                'cost': current_cost,
-                'created_at': reservation.created_at.isoformat(),
-                'updated_at': reservation.updated_at.isoformat()
-            })
+        reservations_data = [serialize_admin(reservation, fields) for reservation in pagination.items]
         
         return jsonify({
             'success': True,
@@ -880,6 +976,11 @@ def get_all_reservations():
             }
         }), 200
         
+    except (InvalidPagination, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -997,12 +1098,25 @@ def force_release_reservation(reservation_id):
         # Calculate final cost
         final_cost = reservation.calculate_cost()
         
+        # Roll the finished session into the lot's analytics bucket
+        LotDailyStats.record_completion(reservation)
+        
         # Free up the parking spot
+        if reservation.parking_spot.status != 'A':
+            reservation.parking_spot.parking_lot.adjust_spot_counts(available_delta=1, occupied_delta=-1)
+        else:
+            reservation.parking_spot.parking_lot.bump_version()
         reservation.parking_spot.status = 'A'
         reservation.parking_spot.updated_at = leaving_time
         
         db.session.commit()
         
+        spot = reservation.parking_spot
+        spot_allocator.release(spot.lot_id, spot.id, spot.spot_number)
+        system_stats.invalidate()
+        lot_list_cache.invalidate(spot.lot_id)
+        availability_feed.publish(spot.lot_id)
+        
         return jsonify({
             'success': True,
             'message': 'Parking spot force-released successfully!',
@@ -1023,6 +1137,79 @@ def force_release_reservation(reservation_id):
 
 # ==================== ANALYTICS AND REPORTS ====================
 
+# strftime() bucket keys, each formatted as the ISO date the bucket starts on
+REVENUE_GRANULARITIES = {
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m-01',
+    'year': '%Y-01-01'
+}
+MAX_REVENUE_BUCKETS = 5000
+
+def shift_month(month_start, months):
+    """Move a first-of-month date by a number of months"""
+    month_index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+def bucket_starts(start, end, granularity):
+    """Start dates of every bucket overlapping [start, end]"""
+    if granularity == 'day':
+        current, step = start, lambda d: d + timedelta(days=1)
+    elif granularity == 'month':
+        current, step = start.replace(day=1), lambda d: shift_month(d, 1)
+    else:
+        current, step = start.replace(month=1, day=1), lambda d: d.replace(year=d.year + 1)
+    
+    buckets = []
+    while current <= end:
+        buckets.append(current)
+        current = step(current)
+    return buckets
+
+def revenue_buckets_query(start, end, granularity):
+    """Query of (bucket key, revenue) from the hourly rollup between two dates (inclusive)"""
+    bucket = func.strftime(REVENUE_GRANULARITIES[granularity], LotDailyStats.date)
+    return db.session.query(
+        bucket,
+        func.sum(LotDailyStats.revenue)
+    ).filter(
+        LotDailyStats.date >= start,
+        LotDailyStats.date <= end
+    ).group_by(bucket)
+
+def get_revenue_series(start, end, granularity):
+    """Completed-reservation revenue per bucket between two dates (inclusive), or None if too many buckets"""
+    buckets = bucket_starts(start, end, granularity)
+    if len(buckets) > MAX_REVENUE_BUCKETS:
+        return None
+    
+    # Read the hourly rollup - cost scales with days in range, not with reservations
+    revenue_by_bucket = dict(revenue_buckets_query(start, end, granularity).all())
+    
+    series = []
+    for bucket_start in buckets:
+        entry = {
+            'date': bucket_start.isoformat(),
+            'revenue': round(revenue_by_bucket.get(bucket_start.isoformat()) or 0, 2)
+        }
+        if granularity == 'month':
+            entry['month'] = bucket_start.strftime('%B %Y')
+        elif granularity == 'year':
+            entry['year'] = str(bucket_start.year)
+        series.append(entry)
+    return series
+
+def top_spenders_query(limit=10):
+    """Query of (full_name, username, total_spent, total_reservations) for the biggest spenders"""
+    return db.session.query(
+        User.full_name,
+        User.username,
+        func.sum(Reservation.parking_cost).label('total_spent'),
+        func.count(Reservation.id).label('total_reservations')
+    ).join(Reservation).filter(
+        Reservation.status == 'completed',
+        Reservation.parking_cost.isnot(None)
+    ).group_by(User.id).order_by(desc('total_spent')).limit(limit)
+
 @admin_bp.route('/analytics/revenue', methods=['GET'])
 @admin_required
 def get_revenue_analytics():
@@ -1030,55 +1217,56 @@ def get_revenue_analytics():
     try:
         # Time period filter
         period = request.args.get('period', 'month')  # day, week, month, year
+        granularity = request.args.get('granularity', '').strip() or period
+        date_from = request.args.get('from', '').strip()
+        date_to = request.args.get('to', '').strip()
         
-        # Revenue by time period
-        revenue_data = []
+        # Default windows: last 30 days by day, last 12 months by month
+        today = datetime.utcnow().date()
+        if granularity == 'day':
+            start, end = today - timedelta(days=29), today
+        elif granularity == 'month':
+            start, end = shift_month(today.replace(day=1), -11), today
+        else:
+            start = end = None
         
-        if period == 'day':
-            # Last 30 days
-            for i in range(29, -1, -1):
-                date = (datetime.utcnow() - timedelta(days=i)).date()
-                daily_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-                    Reservation.status == 'completed',
-                    Reservation.parking_cost.isnot(None),
-                    func.date(Reservation.leaving_timestamp) == date
-                ).scalar() or 0
-                
-                revenue_data.append({
-                    'date': date.isoformat(),
-                    'revenue': round(daily_revenue, 2)
-                })
-        
-        elif period == 'month':
-            # Last 12 months
-            for i in range(11, -1, -1):
-                date = datetime.utcnow().replace(day=1) - timedelta(days=32*i)
-                month_start = date.replace(day=1).date()
-                next_month = (date.replace(day=28) + timedelta(days=4)).replace(day=1).date()
-                
-                monthly_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
-                    Reservation.status == 'completed',
-                    Reservation.parking_cost.isnot(None),
-                    func.date(Reservation.leaving_timestamp) >= month_start,
-                    func.date(Reservation.leaving_timestamp) < next_month
-                ).scalar() or 0
-                
-                revenue_data.append({
-                    'date': month_start.isoformat(),
-                    'revenue': round(monthly_revenue, 2),
-                    'month': date.strftime('%B %Y')
-                })
+        if date_from or date_to:
+            if granularity not in REVENUE_GRANULARITIES:
+                return jsonify({
+                    'success': False,
+                    'message': f'Granularity must be one of: {", ".join(REVENUE_GRANULARITIES)}'
+                }), 400
+            try:
+                start = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else start or today
+                end = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else today
+            except ValueError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Dates must be in YYYY-MM-DD format'
+                }), 400
+            if start > end:
+                return jsonify({
+                    'success': False,
+                    'message': '"from" must not be after "to"'
+                }), 400
+        
+        # Revenue by time period - one grouped query, empty buckets filled in below
+        revenue_data = []
+        if start is not None:
+            revenue_data = get_revenue_series(start, end, granularity)
+            if revenue_data is None:
+                return jsonify({
+                    'success': False,
+                    'message': f'Too many buckets requested (max {MAX_REVENUE_BUCKETS})'
+                }), 400
         
-        # Revenue by parking lot
+        # Revenue by parking lot (from the hourly rollup)
         lot_revenue = db.session.query(
             ParkingLot.prime_location_name,
-            func.sum(Reservation.parking_cost).label('total_revenue'),
-            func.count(Reservation.id).label('total_reservations')
+            func.sum(LotDailyStats.revenue).label('total_revenue'),
+            func.sum(LotDailyStats.sessions).label('total_reservations')
         ).select_from(ParkingLot)\
-        .join(ParkingSpot, ParkingLot.id == ParkingSpot.lot_id)\
-        .join(Reservation, ParkingSpot.id == Reservation.spot_id)\
-        .filter(Reservation.status == 'completed',
-               Reservation.parking_cost.isnot(None))\
+        .join(LotDailyStats, ParkingLot.id == LotDailyStats.lot_id)\
         .group_by(ParkingLot.id)\
         .order_by(desc('total_revenue')).all()
         
@@ -1092,15 +1280,7 @@ def get_revenue_analytics():
             })
         
         # Top users by spending
-        top_users = db.session.query(
-            User.full_name,
-            User.username,
-            func.sum(Reservation.parking_cost).label('total_spent'),
-            func.count(Reservation.id).label('total_reservations')
-        ).join(Reservation).filter(
-            Reservation.status == 'completed',
-            Reservation.parking_cost.isnot(None)
-        ).group_by(User.id).order_by(desc('total_spent')).limit(10).all()
+        top_users = top_spenders_query().all()
         
         top_users_data = []
         for full_name, username, spent, reservations in top_users:
@@ -1116,7 +1296,8 @@ def get_revenue_analytics():
             'revenue_trend': revenue_data,
             'revenue_by_lot': lot_revenue_data,
             'top_users': top_users_data,
-            'period': period
+            'period': period,
+            'granularity': granularity if start is not None else None
         }
         
         return jsonify({
@@ -1130,18 +1311,22 @@ def get_revenue_analytics():
             'message': f'Error loading revenue analytics: {str(e)}'
         }), 500
 
+def peak_hours_query():
+    """Query of (hour, reservations) for active and completed reservations by hour parked"""
+    return db.session.query(
+        func.extract('hour', Reservation.parking_timestamp).label('hour'),
+        func.count(Reservation.id).label('reservations')
+    ).filter(
+        Reservation.status.in_(['active', 'completed'])
+    ).group_by('hour').order_by('hour')
+
 @admin_bp.route('/analytics/usage', methods=['GET'])
 @admin_required
 def get_usage_analytics():
     """Get parking usage analytics"""
     try:
         # Peak hours analysis
-        peak_hours = db.session.query(
-            func.extract('hour', Reservation.parking_timestamp).label('hour'),
-            func.count(Reservation.id).label('reservations')
-        ).filter(
-            Reservation.status.in_(['active', 'completed'])
-        ).group_by('hour').order_by('hour').all()
+        peak_hours = peak_hours_query().all()
         
         peak_hours_data = []
         for hour, count in peak_hours:
@@ -1151,26 +1336,18 @@ def get_usage_analytics():
                 'time_label': f"{int(hour):02d}:00"
             })
         
-        # Average session duration by lot
+        # Average session duration by lot (from the hourly rollup)
         lot_durations = db.session.query(
             ParkingLot.prime_location_name,
-            func.avg(
-                func.julianday(Reservation.leaving_timestamp) - 
-                func.julianday(Reservation.parking_timestamp)
-            ).label('avg_duration_days'),
-            func.count(Reservation.id).label('total_sessions')
+            (func.sum(LotDailyStats.total_minutes) * 1.0 / func.sum(LotDailyStats.sessions)).label('avg_duration_minutes'),
+            func.sum(LotDailyStats.sessions).label('total_sessions')
         ).select_from(ParkingLot)\
-        .join(ParkingSpot, ParkingLot.id == ParkingSpot.lot_id)\
-        .join(Reservation, ParkingSpot.id == Reservation.spot_id)\
-        .filter(Reservation.status == 'completed',
-               Reservation.leaving_timestamp.isnot(None))\
+        .join(LotDailyStats, ParkingLot.id == LotDailyStats.lot_id)\
         .group_by(ParkingLot.id)\
-        .order_by(desc('avg_duration_days')).all()
+        .order_by(desc('avg_duration_minutes')).all()
         
         lot_duration_data = []
-        for lot_name, avg_duration_days, sessions in lot_durations:
-            # Convert from days to minutes (days * 24 hours * 60 minutes)
-            avg_duration_minutes = (avg_duration_days or 0) * 24 * 60
+        for lot_name, avg_duration_minutes, sessions in lot_durations:
             lot_duration_data.append({
                 'lot_name': lot_name,
                 'avg_duration_minutes': round(avg_duration_minutes, 1),
@@ -1179,8 +1356,9 @@ def get_usage_analytics():
             })
         
         # Occupancy trends
-        total_spots = ParkingSpot.query.count()
-        current_occupied = ParkingSpot.query.filter_by(status='O').count()
+        spot_counts = system_stats.get()['parking_spots']
+        total_spots = spot_counts['total']
+        current_occupied = spot_counts['occupied']
         current_occupancy = round((current_occupied / total_spots) * 100, 1) if total_spots > 0 else 0
         
         usage_data = {
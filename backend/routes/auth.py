@@ -4,10 +4,14 @@ Provides secure token-based authentication with role-based access control
 """
 
 from flask import Blueprint, request, jsonify
-from auth_utils import JWTAuth, AuthError, token_required, get_current_user
+from auth_utils import JWTAuth, AuthError, token_required, get_current_user, get_auth_context, principal_cache, revocation_store
 from models import User, Admin
 from database import db
+from system_stats import system_stats
+from password_hasher import HasherBusy
+from login_limiter import login_limiter
 from datetime import datetime
+import math
 import re
 
 # Create authentication blueprint
@@ -29,6 +33,16 @@ def validate_username(username):
     # Only allow alphanumeric characters and underscores
     return re.match(r'^[a-zA-Z0-9_]+$', username) is not None
 
+def server_busy_response(error):
+    """503 with Retry-After for when the password hashing queue is full"""
+    response = jsonify({
+        'success': False,
+        'message': 'Server is busy. Please try again shortly.',
+        'error_code': 'SERVER_BUSY'
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Handle user and admin login via JWT authentication"""
@@ -61,6 +75,17 @@ def login():
                 'error_code': 'INVALID_USER_TYPE'
             }), 400
         
+        # Spend an attempt for this client and username before any password hashing
+        retry_after = login_limiter.check(request.remote_addr, username)
+        if retry_after:
+            response = jsonify({
+                'success': False,
+                'message': 'Too many login attempts. Please try again later.',
+                'error_code': 'TOO_MANY_ATTEMPTS'
+            })
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response, 429
+        
         # Authenticate user
         try:
             user = JWTAuth.authenticate_user(username, password, user_type)
@@ -99,6 +124,8 @@ def login():
                 'error_code': 'AUTH_ERROR'
             }), e.status_code
             
+    except HasherBusy as e:
+        return server_busy_response(e)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -200,6 +227,7 @@ def register():
         # Add to database
         db.session.add(user)
         db.session.commit()
+        system_stats.invalidate()
         
         # Generate JWT token for immediate login
         token = JWTAuth.generate_token(user)
@@ -213,6 +241,9 @@ def register():
             'expires_in': 168 * 60 * 60  # 7 days in seconds
         }), 201
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return server_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -228,9 +259,16 @@ def logout():
     current_user = get_current_user()
     user_name = current_user.username if current_user else 'User'
     
-    # Note: With JWT, we can't invalidate tokens server-side easily.
-    # In a production environment, you might want to implement a token blacklist
-    # or use short-lived tokens with refresh tokens.
+    try:
+        # Revoke this token server-side so it stops working before it expires
+        revocation_store.revoke_token(get_auth_context().payload)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'Logout failed due to server error',
+            'error_code': 'SERVER_ERROR'
+        }), 500
     
     return jsonify({
         'success': True,
@@ -305,6 +343,7 @@ def update_profile():
                 updated_fields.append(field)
         
         db.session.commit()
+        principal_cache.invalidate('user', current_user.id)
         
         return jsonify({
             'success': True,
@@ -324,9 +363,9 @@ def update_profile():
 @auth_bp.route('/verify', methods=['GET'])
 def verify_token():
     """Verify JWT token and return user info"""
-    token = JWTAuth.get_token_from_request()
+    auth = get_auth_context()
     
-    if not token:
+    if not auth.token:
         return jsonify({
             'valid': False,
             'message': 'No token provided',
@@ -334,8 +373,8 @@ def verify_token():
         }), 401
     
     try:
-        payload = JWTAuth.decode_token(token)
-        user = JWTAuth.get_current_user_from_token()
+        payload = auth.verify()
+        user = auth.principal
         
         if not user:
             return jsonify({
@@ -3,39 +3,68 @@ Dashboard API routes with JWT-based role-based access control
 Backend-focused with JSON responses
 """
 
-from flask import Blueprint, jsonify, request
-from auth_utils import token_required, admin_required, user_required, get_current_user
-from models import User, Admin, ParkingLot, ParkingSpot, Reservation
+from flask import Blueprint, jsonify, request, current_app
+from auth_utils import JWTAuth, token_required, admin_required, user_required, get_current_user, query_token_allowed
+from models import User, Admin, ParkingLot, ParkingSpot, Reservation, LotDailyStats
 from database import db
+from spot_allocator import spot_allocator, lowest_free_spot_query, SpotClaimConflict
+from system_stats import system_stats, count_where
+from reservation_serializers import with_details, serialize_activity, serialize_summary, serialize_history, HISTORY_FIELDS
+from conditional_get import make_etag, lot_state, user_state, not_modified, with_etag
+from lot_list_cache import lot_list_cache
+from availability_feed import availability_feed
+from cursor_pagination import keyset_paginate, InvalidPagination
+from field_selection import Field, FieldSet, InvalidFields, column
+from lot_serializers import LOT_FIELDS, BROWSE_FIELDS
+from search_index import lot_search_filter
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, update
 
 # Create dashboard blueprint
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 
+def recent_users_query(limit=5):
+    """Newest accounts first, for the admin overview"""
+    return User.query.order_by(User.created_at.desc()).limit(limit)
+
+def recent_reservations_query(limit=5):
+    """Newest reservations first, for the admin overview"""
+    return Reservation.query.order_by(Reservation.created_at.desc()).limit(limit)
+
 @dashboard_bp.route('/admin', methods=['GET'])
 @admin_required
 def admin_dashboard():
     """Admin dashboard with system overview"""
     try:
-        # Get system statistics
+        # Every part of the overview moves with a lot version, a user write or this admin's
+        # account - admins have no updated_at, so the admin_info sent below is tagged as a whole
+        admin = get_current_user()
+        admin_info = admin.to_dict()
+        state = (lot_state(), user_state())
+        etag = make_etag('admin-dashboard', *state, sorted(admin_info.items()))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Get system statistics (shared short-TTL snapshot, recomputed if it predates the state tagged above)
+        counts = system_stats.get(state)
         stats = {
-            'total_users': User.query.count(),
-            'active_users': User.query.filter_by(is_active=True).count(),
-            'inactive_users': User.query.filter_by(is_active=False).count(),
-            'total_parking_lots': ParkingLot.query.count(),
-            'active_parking_lots': ParkingLot.query.filter_by(is_active=True).count(),
-            'total_parking_spots': ParkingSpot.query.count(),
-            'available_spots': ParkingSpot.query.filter_by(status='A').count(),
-            'occupied_spots': ParkingSpot.query.filter_by(status='O').count(),
-            'total_reservations': Reservation.query.count(),
-            'active_reservations': Reservation.query.filter_by(status='active').count(),
-            'completed_reservations': Reservation.query.filter_by(status='completed').count(),
+            'total_users': counts['users']['total'],
+            'active_users': counts['users']['active'],
+            'inactive_users': counts['users']['inactive'],
+            'total_parking_lots': counts['parking_lots']['total'],
+            'active_parking_lots': counts['parking_lots']['active'],
+            'total_parking_spots': counts['parking_spots']['total'],
+            'available_spots': counts['parking_spots']['available'],
+            'occupied_spots': counts['parking_spots']['occupied'],
+            'total_reservations': counts['reservations']['total'],
+            'active_reservations': counts['reservations']['active'],
+            'completed_reservations': counts['reservations']['completed'],
         }
         
         # Recent activity
         recent_users = []
-        for user in User.query.order_by(User.created_at.desc()).limit(5).all():
+        for user in recent_users_query().all():
             recent_users.append({
                 'id': user.id,
                 'username': user.username,
@@ -45,17 +74,10 @@ def admin_dashboard():
                 'is_active': user.is_active
             })
         
-        recent_reservations = []
-        for reservation in Reservation.query.order_by(Reservation.created_at.desc()).limit(5).all():
-            recent_reservations.append({
-                'id': reservation.id,
-                'user_name': reservation.user.full_name,
-                'spot_number': reservation.parking_spot.spot_number,
-                'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
-                'status': reservation.status,
-                'created_at': reservation.created_at.isoformat(),
-                'vehicle_number': reservation.vehicle_number
-            })
+        recent_reservations = [
+            serialize_activity(reservation)
+            for reservation in with_details(recent_reservations_query()).all()
+        ]
         
         # Parking lot details
         parking_lots = []
@@ -72,16 +94,16 @@ def admin_dashboard():
                 'occupancy_rate': round((lot.occupied_spots_count / lot.number_of_spots) * 100, 1) if lot.number_of_spots > 0 else 0
             })
         
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
             'data': {
                 'stats': stats,
                 'recent_users': recent_users,
                 'recent_reservations': recent_reservations,
                 'parking_lots': parking_lots,
-                'admin_info': get_current_user().to_dict()
+                'admin_info': admin_info
             }
-        }), 200
+        }), etag), 200
     
     except Exception as e:
         return jsonify({
@@ -99,14 +121,14 @@ def user_dashboard():
         # User's reservation statistics
         user_stats = {
             'total_reservations': current_user.reservations.count(),
-            'active_reservations': current_user.reservations.filter_by(status='active').count(),
+            'active_reservations': Reservation.active_for_user(current_user.id).count(),
             'completed_reservations': current_user.reservations.filter_by(status='completed').count(),
             'cancelled_reservations': current_user.reservations.filter_by(status='cancelled').count(),
         }
         
         # Current active reservation
         active_reservation = None
-        active_res = current_user.reservations.filter_by(status='active').first()
+        active_res = with_details(Reservation.active_for_user(current_user.id)).first()
         if active_res:
             duration_minutes = (datetime.utcnow() - active_res.parking_timestamp).total_seconds() / 60
             active_reservation = {
@@ -121,19 +143,10 @@ def user_dashboard():
             }
         
         # Recent reservations
-        recent_reservations = []
-        for reservation in current_user.reservations.order_by(Reservation.created_at.desc()).limit(10).all():
-            recent_reservations.append({
-                'id': reservation.id,
-                'spot_number': reservation.parking_spot.spot_number,
-                'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
-                'status': reservation.status,
-                'vehicle_number': reservation.vehicle_number,
-                'parking_timestamp': reservation.parking_timestamp.isoformat(),
-                'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
-                'duration_minutes': reservation.duration_minutes,
-                'parking_cost': reservation.parking_cost
-            })
+        recent_reservations = [
+            serialize_summary(reservation)
+            for reservation in with_details(history_query(current_user.id)).limit(10).all()
+        ]
         
         # Available parking lots
         available_lots = []
@@ -185,17 +198,98 @@ def dashboard_redirect():
             'user_role': 'user'
         }), 200
 
+# Scope of the short-lived tokens the availability stream takes in its query string
+AVAILABILITY_STREAM_SCOPE = 'availability-stream'
+
+@dashboard_bp.route('/stream/token', methods=['POST'])
+@token_required
+def availability_stream_token():
+    """Issue a short-lived token that opens the availability stream and nothing else"""
+    try:
+        expires_in = current_app.config.get('STREAM_TOKEN_SECONDS', 60)
+        return jsonify({
+            'success': True,
+            'data': {
+                'token': JWTAuth.generate_scoped_token(get_current_user(), AVAILABILITY_STREAM_SCOPE, expires_in),
+                'expires_in': expires_in
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error issuing stream token'
+        }), 500
+
+@dashboard_bp.route('/stream/availability', methods=['GET'])
+@token_required
+@query_token_allowed(AVAILABILITY_STREAM_SCOPE)
+def stream_availability():
+    """
+    Server-Sent Events stream of per-lot available/occupied counts
+    Opens with a snapshot of every active lot, then sends an event with the new counts and
+    deltas whenever a booking, release or lot change commits. A reconnect carrying
+    Last-Event-ID resumes from the backlog instead of taking a new snapshot.
+    """
+    try:
+        position = availability_feed.resume_position(
+            request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        opening = None
+        if position is None:
+            position, opening = availability_feed.snapshot()
+        
+        response = current_app.response_class(
+            availability_feed.stream(position, opening),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # Keep proxies from holding events back
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error opening availability stream'
+        }), 500
+
+ADMIN_USER_LIST_FIELDS = {
+    'id': column(User.id),
+    'username': column(User.username),
+    'email': column(User.email),
+    'full_name': column(User.full_name),
+    'phone_number': column(User.phone_number),
+    'address': column(User.address),
+    'created_at': column(User.created_at),
+    'is_active': column(User.is_active),
+    'role': Field(lambda user, extra: user.get_role()),
+    'total_reservations': Field(lambda user, extra: extra['total'], needs=['reservation_counts']),
+    'active_reservations': Field(lambda user, extra: extra['active'], needs=['reservation_counts'])
+}
+
 @dashboard_bp.route('/admin/users', methods=['GET'])
 @admin_required
 def admin_users_list():
     """Get list of all users for admin"""
     try:
-        users = []
-        for user in User.query.order_by(User.created_at.desc()).all():
-            user_data = user.to_dict()
-            user_data['total_reservations'] = user.reservations.count()
-            user_data['active_reservations'] = user.reservations.filter_by(status='active').count()
-            users.append(user_data)
+        fields = FieldSet.from_request(ADMIN_USER_LIST_FIELDS)
+        
+        # Reservation counts for every user in one grouped query, and only when asked for
+        counts = {}
+        if fields.needs('reservation_counts'):
+            counts = {
+                user_id: {'total': total, 'active': active}
+                for user_id, total, active in db.session.query(
+                    Reservation.user_id,
+                    func.count(Reservation.id),
+                    count_where(Reservation.status == 'active')
+                ).group_by(Reservation.user_id)
+            }
+        
+        users = [
+            fields.serialize(user, counts.get(user.id, {'total': 0, 'active': 0}))
+            for user in User.query.options(fields.load_only()).order_by(User.created_at.desc())
+        ]
         
         return jsonify({
             'success': True,
@@ -205,34 +299,29 @@ def admin_users_list():
             }
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': 'Error loading users data'
         }), 500
 
+ADMIN_LOT_LIST_FIELDS = {name: field for name, field in LOT_FIELDS.items() if name != 'updated_at'}
+
 @dashboard_bp.route('/admin/parking-lots', methods=['GET'])
 @admin_required
 def admin_parking_lots():
     """Get detailed parking lots information for admin"""
     try:
-        lots_data = []
-        for lot in ParkingLot.query.order_by(ParkingLot.created_at.desc()).all():
-            lot_data = {
-                'id': lot.id,
-                'prime_location_name': lot.prime_location_name,
-                'address': lot.address,
-                'pin_code': lot.pin_code,
-                'price_per_hour': lot.price_per_hour,
-                'number_of_spots': lot.number_of_spots,
-                'description': lot.description,
-                'is_active': lot.is_active,
-                'created_at': lot.created_at.isoformat(),
-                'available_spots': lot.available_spots_count,
-                'occupied_spots': lot.occupied_spots_count,
-                'occupancy_rate': round((lot.occupied_spots_count / lot.number_of_spots) * 100, 1) if lot.number_of_spots > 0 else 0
-            }
-            lots_data.append(lot_data)
+        fields = FieldSet.from_request(ADMIN_LOT_LIST_FIELDS)
+        lots_data = [
+            fields.serialize(lot)
+            for lot in ParkingLot.query.options(fields.load_only()).order_by(ParkingLot.created_at.desc())
+        ]
         
         return jsonify({
             'success': True,
@@ -242,6 +331,11 @@ def admin_parking_lots():
             }
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -250,66 +344,106 @@ def admin_parking_lots():
 
 # ==================== USER PARKING LOT MANAGEMENT ====================
 
+# Orderings for ?sort= on user lot browsing; id breaks ties so pages never overlap or skip lots
+BROWSE_SORTS = {
+    'default': (ParkingLot.id,),
+    'name': (func.lower(ParkingLot.prime_location_name), ParkingLot.id),
+    'price_asc': (ParkingLot.price_per_hour, ParkingLot.id),
+    'price_desc': (desc(ParkingLot.price_per_hour), ParkingLot.id),
+    'available_spots': (desc(ParkingLot.available_count), ParkingLot.id)
+}
+
+def browse_filters(search):
+    """Filters for lots a user can book: active, with a free spot, matching the search if any"""
+    filters = [ParkingLot.is_active == True, ParkingLot.available_count > 0]
+    if search:
+        filters.append(lot_search_filter(search))
+    return filters
+
+def browse_page_query(filters, sort):
+    """Browsable lots in ?sort= order, each with its occupancy rate and the total number of matches"""
+    occupancy_rate = (ParkingLot.number_of_spots - ParkingLot.available_count) * 1.0 / ParkingLot.number_of_spots * 100
+    return db.session.query(
+        ParkingLot,
+        occupancy_rate.label('occupancy_rate'),
+        func.count().over().label('total')  # Matching lots, counted alongside the page
+    ).filter(*filters).order_by(*BROWSE_SORTS[sort])
+
+def build_lot_list_page(page, per_page, search, sort='default'):
+    """
+    One page of active lots with free spots; returns (page data, ids of every lot on the page)
+    The free-spot filter, occupancy rate and total are all part of the page query, so
+    every page but the last is full and costs a single statement.
+    """
+    filters = browse_filters(search)
+    
+    # Pages are cached whole; ?fields= is applied to the cached rows
+    fields = FieldSet(BROWSE_FIELDS)
+    rows = browse_page_query(filters, sort).options(fields.load_only())\
+        .limit(per_page).offset((page - 1) * per_page).all()
+    
+    if rows:
+        total = rows[0].total
+    elif page > 1:
+        # Past the last page there is no row to carry the total
+        total = db.session.query(func.count(ParkingLot.id)).filter(*filters).scalar()
+    else:
+        total = 0
+    pages = (total + per_page - 1) // per_page
+    
+    data = {
+        'lots': [fields.serialize(row[0], row._asdict()) for row in rows],
+        'pagination': {
+            'page': page,
+            'pages': pages,
+            'per_page': per_page,
+            'total': total,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+    }
+    return data, [row[0].id for row in rows]
+
 @dashboard_bp.route('/user/parking-lots', methods=['GET'])
 @user_required
 def get_available_parking_lots():
     """Get all available parking lots for users"""
     try:
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
+        if per_page < 1:
+            per_page = 20  # As paginate() did
         search = request.args.get('search', '').strip()
+        sort = request.args.get('sort', 'default').strip() or 'default'
+        if sort not in BROWSE_SORTS:
+            return jsonify({
+                'success': False,
+                'message': f'sort must be one of: {", ".join(BROWSE_SORTS)}'
+            }), 400
+        fields = FieldSet.from_request(BROWSE_FIELDS)
         
-        # Build query for active lots with available spots
-        query = ParkingLot.query.filter_by(is_active=True)
-        
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    ParkingLot.prime_location_name.ilike(search_filter),
-                    ParkingLot.address.ilike(search_filter),
-                    ParkingLot.pin_code.ilike(search_filter)
-                )
-            )
+        # Search is case-insensitive, so 'MG Road' and 'mg road' share a tag and a cache entry
+        params = (page, per_page, search.lower(), sort)
+        state = lot_state()
+        etag = make_etag('parking-lots', params, fields.names, state)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        # Get pagination
-        pagination = query.paginate(
-            page=page, per_page=per_page, 
-            error_out=False
-        )
+        data = lot_list_cache.get(params, state, lambda: build_lot_list_page(page, per_page, search, sort))
+        if not fields.selects_all:
+            data = dict(data, lots=[fields.project(lot) for lot in data['lots']])
         
-        lots_data = []
-        for lot in pagination.items:
-            available_spots = lot.available_spots_count
-            if available_spots > 0:  # Only include lots with available spots
-                lots_data.append({
-                    'id': lot.id,
-                    'name': lot.prime_location_name,
-                    'address': lot.address,
-                    'pin_code': lot.pin_code,
-                    'price_per_hour': lot.price_per_hour,
-                    'available_spots': available_spots,
-                    'total_spots': lot.number_of_spots,
-                    'occupancy_rate': round(((lot.number_of_spots - available_spots) / lot.number_of_spots) * 100, 1),
-                    'description': lot.description,
-                    'created_at': lot.created_at.isoformat()
-                })
-        
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
-            'data': {
-                'lots': lots_data,
-                'pagination': {
-                    'page': pagination.page,
-                    'pages': pagination.pages,
-                    'per_page': pagination.per_page,
-                    'total': pagination.total,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
-                }
-            }
-        }), 200
+            'data': data
+        }), etag), 200
         
+    except InvalidFields as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -322,6 +456,14 @@ def get_available_parking_lots():
 def get_parking_lot_details(lot_id):
     """Get detailed information about a specific parking lot for users"""
     try:
+        # Version check first - a missing or inactive lot falls through to the 404 below
+        state = db.session.query(ParkingLot.version, ParkingLot.updated_at).filter_by(id=lot_id, is_active=True).first()
+        if state:
+            etag = make_etag('parking-lot', lot_id, *state)
+            cached = not_modified(etag)
+            if cached:
+                return cached
+        
         lot = ParkingLot.query.filter_by(id=lot_id, is_active=True).first()
         if not lot:
             return jsonify({
@@ -329,6 +471,9 @@ def get_parking_lot_details(lot_id):
                 'message': 'Parking lot not found or inactive'
             }), 404
         
+        # Tag the body with the version it is built from, which may be newer than the check above
+        etag = make_etag('parking-lot', lot_id, lot.version, lot.updated_at)
+        
         # Get available spots details
         available_spots = []
         for spot in lot.parking_spots.filter_by(status='A').order_by(ParkingSpot.spot_number):
@@ -353,10 +498,10 @@ def get_parking_lot_details(lot_id):
             'created_at': lot.created_at.isoformat()
         }
         
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
             'data': lot_data
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         return jsonify({
@@ -367,6 +512,46 @@ def get_parking_lot_details(lot_id):
 
 # ==================== USER RESERVATION MANAGEMENT ====================
 
+def claim_spot(spot_id):
+    """Compare-and-set UPDATE marking a spot occupied only if it is still free"""
+    return update(ParkingSpot)\
+        .where(ParkingSpot.id == spot_id, ParkingSpot.status == 'A')\
+        .values(status='O', updated_at=datetime.utcnow())\
+        .execution_options(synchronize_session=False)
+
+def allocate_spot(lot):
+    """
+    Claim the lowest-numbered free spot in a lot; returns (spot_id, spot_number) or None
+    The allocator's heap only suggests a spot: it is taken only if no lower-numbered spot is
+    free in the database (one freed by another worker, say), and each claim is a compare-and-set
+    (UPDATE ... WHERE status='A') so a spot can never be booked twice. A stale suggestion or a
+    lost race rebuilds the heap and tries again, up to SPOT_CLAIM_MAX_ATTEMPTS.
+    """
+    max_attempts = current_app.config.get('SPOT_CLAIM_MAX_ATTEMPTS', 5)
+    
+    for _ in range(max_attempts):
+        allocated = spot_allocator.acquire(lot.id)
+        if not allocated:
+            return None
+        
+        spot_id, spot_number = allocated
+        lowest = lowest_free_spot_query(lot.id).scalar()
+        if lowest is not None and lowest < spot_number:
+            # A lower spot was freed where this worker's heap couldn't see it
+            spot_allocator.invalidate(lot.id)
+            continue
+        
+        claimed = db.session.execute(claim_spot(spot_id)).rowcount
+        
+        if claimed:
+            lot.adjust_spot_counts(available_delta=-1, occupied_delta=1)
+            return allocated
+        
+        # Another worker took this spot, so our heap is stale - rebuild it and try the next free spot
+        spot_allocator.invalidate(lot.id)
+    
+    raise SpotClaimConflict(f'Could not claim a spot in lot {lot.id} after {max_attempts} attempts')
+
 @dashboard_bp.route('/user/reservations', methods=['POST'])
 @user_required
 def create_reservation():
@@ -395,7 +580,7 @@ def create_reservation():
         vehicle_model = data.get('vehicle_model', '').strip() or None
         
         # Check if user already has an active reservation
-        existing_reservation = current_user.reservations.filter_by(status='active').first()
+        existing_reservation = Reservation.active_for_user(current_user.id).first()
         if existing_reservation:
             return jsonify({
                 'success': False,
@@ -410,17 +595,26 @@ def create_reservation():
                 'message': 'Parking lot not found or inactive'
             }), 404
         
-        # Find first available spot (auto-allocation)
-        available_spot = lot.parking_spots.filter_by(status='A').order_by(ParkingSpot.spot_number).first()
-        if not available_spot:
+        # Claim the first available spot (auto-allocation) and mark it occupied
+        allocated = allocate_spot(lot)
+        if not allocated:
+            # parking_spots was just re-read and has nothing free; if the counters still
+            # advertise room they have drifted, so bring them in line before saying no
+            if lot.available_count > 0 and lot.recount_spots():
+                db.session.commit()
+                system_stats.invalidate()
+                lot_list_cache.invalidate(lot.id)
+                availability_feed.publish(lot.id)
             return jsonify({
                 'success': False,
                 'message': 'No available spots in this parking lot'
             }), 400
         
+        spot_id, spot_number = allocated
+        
         # Create reservation
         reservation = Reservation(
-            spot_id=available_spot.id,
+            spot_id=spot_id,
             user_id=current_user.id,
             vehicle_number=vehicle_number,
             vehicle_model=vehicle_model,
@@ -428,20 +622,24 @@ def create_reservation():
             status='active'
         )
         
-        # Update spot status to occupied
-        available_spot.status = 'O'
-        available_spot.updated_at = datetime.utcnow()
-        
         # Save to database
         db.session.add(reservation)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            # The popped spot never got booked - rebuild this lot's free heap
+            spot_allocator.invalidate(lot.id)
+            raise
+        system_stats.invalidate()
+        lot_list_cache.invalidate(lot.id)
+        availability_feed.publish(lot.id)
         
         return jsonify({
             'success': True,
             'message': 'Parking spot reserved successfully!',
             'data': {
                 'reservation_id': reservation.id,
-                'spot_number': available_spot.spot_number,
+                'spot_number': spot_number,
                 'lot_name': lot.prime_location_name,
                 'lot_address': lot.address,
                 'vehicle_number': vehicle_number,
@@ -455,6 +653,12 @@ def create_reservation():
             'success': False,
             'message': 'Invalid lot ID provided'
         }), 400
+    except SpotClaimConflict:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': 'This parking lot is busy right now. Please try again.'
+        }), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -487,10 +691,18 @@ def occupy_parking_spot(reservation_id):
         reservation.updated_at = datetime.utcnow()
         
         # Ensure spot is marked as occupied
+        if reservation.parking_spot.status != 'O':
+            reservation.parking_spot.parking_lot.adjust_spot_counts(available_delta=-1, occupied_delta=1)
+            spot_allocator.invalidate(reservation.parking_spot.lot_id)
+        else:
+            reservation.parking_spot.parking_lot.bump_version()
         reservation.parking_spot.status = 'O'
         reservation.parking_spot.updated_at = datetime.utcnow()
         
         db.session.commit()
+        system_stats.invalidate()
+        lot_list_cache.invalidate(reservation.parking_spot.lot_id)
+        availability_feed.publish(reservation.parking_spot.lot_id)
         
         duration_minutes = (datetime.utcnow() - reservation.parking_timestamp).total_seconds() / 60
         
@@ -544,12 +756,25 @@ def release_parking_spot(reservation_id):
         # Calculate final cost
         final_cost = reservation.calculate_cost()
         
+        # Roll the finished session into the lot's analytics bucket
+        LotDailyStats.record_completion(reservation)
+        
         # Free up the parking spot
+        if reservation.parking_spot.status != 'A':
+            reservation.parking_spot.parking_lot.adjust_spot_counts(available_delta=1, occupied_delta=-1)
+        else:
+            reservation.parking_spot.parking_lot.bump_version()
         reservation.parking_spot.status = 'A'
         reservation.parking_spot.updated_at = leaving_time
         
         db.session.commit()
         
+        spot = reservation.parking_spot
+        spot_allocator.release(spot.lot_id, spot.id, spot.spot_number)
+        system_stats.invalidate()
+        lot_list_cache.invalidate(spot.lot_id)
+        availability_feed.publish(spot.lot_id)
+        
         return jsonify({
             'success': True,
             'message': 'Parking spot released successfully!',
@@ -575,6 +800,13 @@ def release_parking_spot(reservation_id):
         }), 500
 
 
+def history_query(user_id, status=None):
+    """A user's reservations newest first, optionally only those with one status"""
+    query = Reservation.query.filter(Reservation.user_id == user_id)
+    if status:
+        query = query.filter(Reservation.status == status)
+    return query.order_by(Reservation.created_at.desc())
+
 @dashboard_bp.route('/user/reservations', methods=['GET'])
 @user_required
 def get_user_reservations():
@@ -585,12 +817,33 @@ def get_user_reservations():
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         status_filter = request.args.get('status', '').strip()
+        fields = FieldSet.from_request(HISTORY_FIELDS)
+        
+        def load(query):
+            """Only the columns the requested fields read; spot and lot only if a field shows them"""
+            query = query.options(fields.load_only(Reservation.created_at))
+            return with_details(query) if fields.needs('details') else query
+        
+        if status_filter not in ['active', 'completed', 'cancelled']:
+            status_filter = None
+        query = history_query(current_user.id, status_filter)
+        
+        # Opt-in cursor mode (?cursor= for the first page) - cost stays flat however deep the client scrolls
+        if 'cursor' in request.args:
+            reservations, pagination = keyset_paginate(
+                query, Reservation, request.args.get('cursor', '').strip(), max(per_page, 1),
+                count_mode=request.args.get('count', 'none'), load=load
+            )
+            return jsonify({
+                'success': True,
+                'data': {
+                    'reservations': [serialize_history(reservation, fields) for reservation in reservations],
+                    'pagination': pagination
+                }
+            }), 200
         
-        # Build query
-        query = current_user.reservations.order_by(Reservation.created_at.desc())
-        
-        if status_filter and status_filter in ['active', 'completed', 'cancelled']:
-            query = query.filter_by(status=status_filter)
+        # Spot, lot and user come back in the same query as the page
+        query = load(query)
         
         # Get pagination
         pagination = query.paginate(
@@ -598,35 +851,7 @@ def get_user_reservations():
             error_out=False
         )
         
-        reservations_data = []
-        for reservation in pagination.items:
-            duration_minutes = 0
-            estimated_cost = 0
-            
-            if reservation.status == 'active':
-                # Calculate current duration and estimated cost
-                duration_minutes = (datetime.utcnow() - reservation.parking_timestamp).total_seconds() / 60
-                estimated_cost = round(duration_minutes / 60 * reservation.parking_spot.parking_lot.price_per_hour, 2)
-            else:
-                duration_minutes = reservation.duration_minutes
-                estimated_cost = reservation.parking_cost or 0
-            
-            reservations_data.append({
-                'id': reservation.id,
-                'spot_number': reservation.parking_spot.spot_number,
-                'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
-                'lot_address': reservation.parking_spot.parking_lot.address,
-                'lot_price_per_hour': reservation.parking_spot.parking_lot.price_per_hour,
-                'status': reservation.status,
-                'vehicle_number': reservation.vehicle_number,
-                'vehicle_model': reservation.vehicle_model,
-                'parking_timestamp': reservation.parking_timestamp.isoformat(),
-                'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
-                'duration_minutes': int(duration_minutes),
-                'duration_hours': reservation.duration_hours if reservation.status == 'completed' else round(duration_minutes / 60, 1),
-                'cost': estimated_cost,
-                'created_at': reservation.created_at.isoformat()
-            })
+        reservations_data = [serialize_history(reservation, fields) for reservation in pagination.items]
         
         return jsonify({
             'success': True,
@@ -643,6 +868,11 @@ def get_user_reservations():
             }
         }), 200
         
+    except (InvalidPagination, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
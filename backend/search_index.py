@@ -0,0 +1,135 @@
+"""
+Search Index for Vehicle Parking System
+SQLite FTS5 indexes over lot and user text columns, kept in step by triggers, so the
+search boxes match tokens and prefixes through an index instead of scanning with LIKE
+"""
+
+import re
+from flask import current_app
+from sqlalchemy import event, select, table, column, literal_column, text
+from database import db
+from models import ParkingLot, User
+
+# Indexed columns per table; searches may narrow to a subset (e.g. lot name only)
+LOT_COLUMNS = ('prime_location_name', 'address', 'pin_code')
+USER_COLUMNS = ('username', 'full_name', 'email', 'phone_number')
+
+SEARCH_TABLES = {
+    # index table: (content table, indexed columns)
+    'parking_lots_fts': ('parking_lots', LOT_COLUMNS),
+    'users_fts': ('users', USER_COLUMNS),
+}
+
+# Index 2-4 character prefixes too, so short "starts with" searches don't walk the whole vocabulary
+_FTS_OPTIONS = "prefix='2 3 4', tokenize='unicode61 remove_diacritics 2'"
+
+_installed = {}  # Database URL -> whether the index tables exist there
+
+def _setting(key, default):
+    """Read a setting from app config when available"""
+    try:
+        return current_app.config.get(key, default)
+    except RuntimeError:
+        return default
+
+def _ddl(index, content, columns):
+    """Statements creating one external-content FTS5 table and the triggers that keep it in sync"""
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{name}' for name in columns)
+    old_values = ', '.join(f'old.{name}' for name in columns)
+    remove = f"INSERT INTO {index}({index}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    add = f"INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5({names}, content='{content}', content_rowid='id', {_FTS_OPTIONS})",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {content} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {content} BEGIN {remove} END",
+        # Only the indexed columns - counter and timestamp updates leave the index alone
+        f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {names} ON {content} BEGIN {remove} {add} END",
+    ]
+
+def install(connection):
+    """Create missing index tables and triggers, filling new indexes from their tables; returns the tables built"""
+    if connection.dialect.name != 'sqlite':
+        return []
+    
+    existing = {row[0] for row in connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    built = []
+    for index, (content, columns) in SEARCH_TABLES.items():
+        for statement in _ddl(index, content, columns):
+            connection.execute(text(statement))
+        if index not in existing:
+            connection.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+            built.append(index)
+    _installed[str(connection.engine.url)] = True
+    return built
+
+def rebuild(connection):
+    """Re-read every indexed row from its table, e.g. after rows were changed with triggers off"""
+    for index in SEARCH_TABLES:
+        connection.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+
+def _after_create(target, connection, **kw):
+    """create_all() hook: add the index next to the tables it covers"""
+    install(connection)
+
+def _after_drop(target, connection, **kw):
+    """drop_all() hook: the triggers go with their tables, the index tables have to be dropped too"""
+    if connection.dialect.name != 'sqlite':
+        return
+    for index in SEARCH_TABLES:
+        connection.execute(text(f'DROP TABLE IF EXISTS {index}'))
+    _installed[str(connection.engine.url)] = False
+
+event.listen(db.metadata, 'after_create', _after_create)
+event.listen(db.metadata, 'after_drop', _after_drop)
+
+def index_available():
+    """True when SEARCH_INDEX_ENABLED is on and this database has the index tables"""
+    if not _setting('SEARCH_INDEX_ENABLED', True):
+        return False
+    
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return False
+    url = str(engine.url)
+    if url not in _installed:
+        tables = db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars()
+        _installed[url] = set(SEARCH_TABLES) <= set(tables)
+    return _installed[url]
+
+def match_expression(term, columns=None):
+    """
+    FTS5 query for a search-box term: every word must start a token of the row
+    Words are quoted so operators and punctuation typed by users are never parsed as
+    query syntax; returns None when the term has nothing searchable in it.
+    """
+    words = re.findall(r'\w+', term)
+    if not words:
+        return None
+    query = ' '.join(f'"{word}"*' for word in words)
+    if columns:
+        query = f"{{{' '.join(columns)}}} : ({query})"
+    return query
+
+def _like_filter(model, term, columns):
+    """Substring filter used when the index is unavailable"""
+    pattern = f'%{term}%'
+    return db.or_(*[getattr(model, name).ilike(pattern) for name in columns])
+
+def _index_filter(model, index, term, columns):
+    """model.id IN (rows of the index matching term), or a LIKE filter without the index"""
+    expression = match_expression(term, columns)
+    if expression is None or not index_available():
+        return _like_filter(model, term, columns)
+    
+    fts = table(index, column('rowid'))
+    matches = select(fts.c.rowid).where(literal_column(index).op('MATCH')(expression))
+    return model.id.in_(matches)
+
+def lot_search_filter(term, columns=LOT_COLUMNS):
+    """Filter for parking lots matching a search term in the given columns"""
+    return _index_filter(ParkingLot, 'parking_lots_fts', term, columns)
+
+def user_search_filter(term, columns=USER_COLUMNS):
+    """Filter for users matching a search term in the given columns"""
+    return _index_filter(User, 'users_fts', term, columns)
@@ -0,0 +1,116 @@
+"""
+In-memory free-spot allocator for the Vehicle Parking System
+Keeps a per-lot min-heap of available spots so bookings don't sort-and-scan parking_spots;
+the heap is only a hint - every pick is confirmed against lowest_free_spot_query()
+"""
+
+import heapq
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func
+from database import db
+from models import ParkingSpot
+
+def free_spots_query(lot_id):
+    """Query of (spot_number, spot_id) for every free spot in a lot"""
+    return db.session.query(ParkingSpot.spot_number, ParkingSpot.id).filter(
+        ParkingSpot.lot_id == lot_id,
+        ParkingSpot.status == 'A'
+    )
+
+def lowest_free_spot_query(lot_id):
+    """Query of the lowest free spot_number in a lot - answered from ix_parking_spots_lot_status alone"""
+    return db.session.query(func.min(ParkingSpot.spot_number)).filter(
+        ParkingSpot.lot_id == lot_id,
+        ParkingSpot.status == 'A'
+    )
+
+class SpotClaimConflict(Exception):
+    """Raised when a free spot could not be claimed within the retry budget"""
+    pass
+
+class SpotAllocator:
+    """
+    Per-lot min-heap of free spots ordered by spot_number
+    Each process has its own heaps, so they miss spots freed by other workers; callers confirm
+    a popped spot is still the lowest free one before claiming it (see allocate_spot).
+    """
+    
+    def __init__(self, verify_interval=300):
+        self.verify_interval = verify_interval  # Seconds before a lot's heap is re-checked against the database
+        self._lock = threading.Lock()
+        self._heaps = {}      # lot_id -> [(spot_number, spot_id), ...]
+        self._free_ids = {}   # lot_id -> {spot_id, ...} currently in the heap
+        self._loaded_at = {}  # lot_id -> monotonic load time
+    
+    def _get_verify_interval(self):
+        """Read the verification interval from app config when available"""
+        try:
+            return current_app.config.get('SPOT_ALLOCATOR_VERIFY_SECONDS', self.verify_interval)
+        except RuntimeError:
+            return self.verify_interval
+    
+    def _load(self, lot_id):
+        """
+        (Re)build the heap for a lot from the database and swap it in; returns the new heap
+        Called without the lock, so a cold lot never holds up bookings in other lots.
+        """
+        heap = [(spot_number, spot_id) for spot_number, spot_id in free_spots_query(lot_id)]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heaps[lot_id] = heap
+            self._free_ids[lot_id] = {spot_id for _, spot_id in heap}
+            self._loaded_at[lot_id] = time.monotonic()
+        return heap
+    
+    def _fresh_heap(self, lot_id):
+        """A lot's heap, or None if it is unloaded, empty or past the verification interval - caller holds the lock"""
+        loaded_at = self._loaded_at.get(lot_id)
+        if loaded_at is None or time.monotonic() - loaded_at > self._get_verify_interval():
+            return None
+        return self._heaps[lot_id] or None
+    
+    def acquire(self, lot_id):
+        """
+        Pop the lowest-numbered free spot in a lot; returns (spot_id, spot_number) or None
+        An empty heap is re-read from the database before the lot is reported full, since
+        spots freed by another worker (or outside the allocator) never reach this heap.
+        """
+        with self._lock:
+            heap = self._fresh_heap(lot_id)
+        if heap is None:
+            heap = self._load(lot_id)
+        
+        with self._lock:
+            if not heap:
+                return None
+            spot_number, spot_id = heapq.heappop(heap)
+            if self._heaps.get(lot_id) is heap:
+                self._free_ids[lot_id].discard(spot_id)
+            return spot_id, spot_number
+    
+    def release(self, lot_id, spot_id, spot_number):
+        """Return a spot to its lot's free heap"""
+        with self._lock:
+            if lot_id not in self._heaps:
+                return  # Not loaded yet - the next acquire will read it from the database
+            
+            if spot_id not in self._free_ids[lot_id]:
+                heapq.heappush(self._heaps[lot_id], (spot_number, spot_id))
+                self._free_ids[lot_id].add(spot_id)
+    
+    def invalidate(self, lot_id=None):
+        """Drop cached state for one lot (or all lots) so it is reloaded on next use"""
+        with self._lock:
+            if lot_id is None:
+                self._heaps.clear()
+                self._free_ids.clear()
+                self._loaded_at.clear()
+            else:
+                self._heaps.pop(lot_id, None)
+                self._free_ids.pop(lot_id, None)
+                self._loaded_at.pop(lot_id, None)
+
+# Process-wide allocator shared by the blueprints
+spot_allocator = SpotAllocator()
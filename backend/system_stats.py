@@ -0,0 +1,129 @@
+"""
+System Statistics Snapshot for Vehicle Parking System
+Computes dashboard counts in one conditional-aggregation pass per table and
+shares the result between requests for a short TTL
+"""
+
+import copy
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func, case
+from database import db
+from models import User, ParkingLot, ParkingSpot, Reservation
+
+def count_where(condition):
+    """COUNT of rows matching a condition, for use inside a single aggregate pass"""
+    return func.count(case((condition, 1)))
+
+def compute_system_counts():
+    """Count users, lots, spots and reservations - one query per table"""
+    users_total, users_active, users_inactive = db.session.query(
+        func.count(User.id),
+        count_where(User.is_active == True),
+        count_where(User.is_active == False)
+    ).one()
+    
+    lots_total, lots_active, lots_inactive = db.session.query(
+        func.count(ParkingLot.id),
+        count_where(ParkingLot.is_active == True),
+        count_where(ParkingLot.is_active == False)
+    ).one()
+    
+    spots_total, spots_available, spots_occupied = db.session.query(
+        func.count(ParkingSpot.id),
+        count_where(ParkingSpot.status == 'A'),
+        count_where(ParkingSpot.status == 'O')
+    ).one()
+    
+    reservations_total, reservations_active, reservations_completed, reservations_cancelled = db.session.query(
+        func.count(Reservation.id),
+        count_where(Reservation.status == 'active'),
+        count_where(Reservation.status == 'completed'),
+        count_where(Reservation.status == 'cancelled')
+    ).one()
+    
+    return {
+        'users': {
+            'total': users_total,
+            'active': users_active,
+            'inactive': users_inactive
+        },
+        'parking_lots': {
+            'total': lots_total,
+            'active': lots_active,
+            'inactive': lots_inactive
+        },
+        'parking_spots': {
+            'total': spots_total,
+            'available': spots_available,
+            'occupied': spots_occupied
+        },
+        'reservations': {
+            'total': reservations_total,
+            'active': reservations_active,
+            'completed': reservations_completed,
+            'cancelled': reservations_cancelled
+        }
+    }
+
+class StatsSnapshot:
+    """
+    Process-wide snapshot of compute_system_counts() with a TTL and explicit invalidation
+    Callers that tag their response with a state fingerprint pass it to get(), so the counts
+    they send were computed no earlier than that state - never a snapshot from before it.
+    """
+    
+    def __init__(self, ttl=5):
+        self.ttl = ttl  # Seconds a snapshot is served before it is recomputed
+        self._lock = threading.Lock()
+        self._snapshot = None  # (counts, monotonic time computed, state fingerprint) - swapped atomically
+        self._generation = 0
+    
+    def _get_ttl(self):
+        """Read the snapshot TTL from app config when available"""
+        try:
+            return current_app.config.get('STATS_SNAPSHOT_TTL_SECONDS', self.ttl)
+        except RuntimeError:
+            return self.ttl
+    
+    def _current(self, ttl, state):
+        """Return the cached counts if they are still fresh (and were computed under state, if given), else None"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[1] < ttl and (state is None or snapshot[2] == state):
+            return snapshot[0]
+        return None
+    
+    def get(self, state=None):
+        """
+        Return a copy of the current counts, recomputing at most once per TTL
+        With a state fingerprint (read before calling), a snapshot computed under any other
+        state is recomputed even inside the TTL.
+        """
+        ttl = self._get_ttl()
+        data = self._current(ttl, state)
+        if data is not None:
+            return copy.deepcopy(data)
+        
+        # Only one request recomputes; concurrent pollers wait and share its result
+        with self._lock:
+            data = self._current(ttl, state)
+            if data is not None:
+                return copy.deepcopy(data)
+            
+            generation = self._generation
+            data = compute_system_counts()
+            
+            # Don't publish a result that a write invalidated while it was being computed
+            if generation == self._generation:
+                self._snapshot = (data, time.monotonic(), state)
+            
+            return copy.deepcopy(data)
+    
+    def invalidate(self):
+        """Drop the snapshot after a write so the next reader sees fresh counts"""
+        self._generation += 1
+        self._snapshot = None
+
+# Process-wide snapshot shared by the blueprints
+system_stats = StatsSnapshot()
@@ -0,0 +1,141 @@
+"""
+Test Fixtures for Vehicle Parking System
+Every test gets a fresh throwaway SQLite database - the real parking_system.db is never touched
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Point the app at a scratch database before it is imported
+_scratch_dir = tempfile.mkdtemp(prefix='parking-tests-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_scratch_dir, "test.db")}'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app
+from database import db
+from models import User, Admin, ParkingLot
+from auth_utils import JWTAuth, principal_cache, revocation_store
+from routes.admin import create_parking_spots_for_lot
+from spot_allocator import spot_allocator
+from system_stats import system_stats
+from lot_list_cache import lot_list_cache
+from login_limiter import login_limiter
+from availability_feed import availability_feed
+from werkzeug.security import generate_password_hash
+
+flask_app.config.update(
+    TESTING=True,
+    LOGIN_RATE_LIMIT_STORE='memory',
+    PASSWORD_HASH_METHOD='pbkdf2:sha256:1000'  # Hash cost is not what these tests check
+)
+
+@pytest.fixture
+def app():
+    """The app with an empty database, every process-wide cache emptied and its settings restored afterwards"""
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    spot_allocator.invalidate()
+    system_stats.invalidate()
+    lot_list_cache.invalidate()
+    principal_cache.clear()
+    revocation_store._synced_at = None  # Reload revocations from the new, empty table
+    login_limiter._store = None  # Fresh, full login buckets
+    availability_feed._last.clear()  # Lot ids start over in the new database
+    config = dict(flask_app.config)
+    yield flask_app
+    # Settings a test changed must not leak into the next one
+    flask_app.config.clear()
+    flask_app.config.update(config)
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager counting SQL statements issued inside the block; yields a one-item list"""
+    
+    @contextmanager
+    def counting():
+        counter = [0]
+        
+        def before_cursor_execute(*args):
+            counter[0] += 1
+        
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    
+    return counting
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def auth_headers(account):
+    """Authorization header carrying a fresh token for an account"""
+    return {'Authorization': f'Bearer {JWTAuth.generate_token(account)}'}
+
+@pytest.fixture
+def make_user(app):
+    """Create a user; returns (user id, auth headers)"""
+    count = [0]
+    
+    def make(username=None, **values):
+        count[0] += 1
+        username = username or f'user_{count[0]}'
+        with app.app_context():
+            user = User(
+                username=username,
+                email=values.pop('email', f'{username}@example.com'),
+                full_name=values.pop('full_name', f'Test User {count[0]}'),
+                password_hash=values.pop('password_hash', None) or generate_password_hash('password123', method='pbkdf2:sha256:1000'),
+                **values
+            )
+            db.session.add(user)
+            db.session.commit()
+            return user.id, auth_headers(user)
+    
+    return make
+
+@pytest.fixture
+def admin_headers(app):
+    with app.app_context():
+        admin = Admin(
+            username='admin',
+            email='admin@parkingsystem.com',
+            password_hash=generate_password_hash('admin123', method='pbkdf2:sha256:1000')
+        )
+        db.session.add(admin)
+        db.session.commit()
+        return auth_headers(admin)
+
+@pytest.fixture
+def make_lot(app):
+    """Create an active lot with its spots; returns the lot id"""
+    count = [0]
+    
+    def make(spots=5, price_per_hour=40.0, **values):
+        count[0] += 1
+        with app.app_context():
+            lot = ParkingLot(
+                prime_location_name=values.pop('prime_location_name', f'Test Lot {count[0]}'),
+                address=values.pop('address', f'{count[0]} Test Road, Test City'),
+                pin_code=values.pop('pin_code', '560001'),
+                price_per_hour=price_per_hour,
+                number_of_spots=spots,
+                **values
+            )
+            db.session.add(lot)
+            db.session.flush()
+            create_parking_spots_for_lot(lot)
+            db.session.commit()
+            return lot.id
+    
+    return make
@@ -0,0 +1,112 @@
+"""
+Admin Lot Listing Tests for Vehicle Parking System
+GET /api/admin/parking-lots must return what the old per-lot queries returned, in a fixed number of statements
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from database import db
+from models import ParkingLot, ParkingSpot, Reservation
+
+def seed_lots(app, make_lot, make_user, lot_count):
+    """Lots with a mix of completed (some uncosted), active and no reservations, one of them inactive"""
+    user_id, _ = make_user()
+    lot_ids = [make_lot(spots=4 + i % 3, price_per_hour=20.0 + i) for i in range(lot_count)]
+    with app.app_context():
+        for i, lot_id in enumerate(lot_ids):
+            lot = db.session.get(ParkingLot, lot_id)
+            spots = lot.parking_spots.order_by(ParkingSpot.spot_number).all()
+            for j in range(i % 4):
+                db.session.add(Reservation(
+                    spot_id=spots[j].id, user_id=user_id, vehicle_number=f'KA01AB{i:02d}{j:02d}',
+                    parking_timestamp=datetime.utcnow() - timedelta(hours=3),
+                    leaving_timestamp=datetime.utcnow() - timedelta(hours=1),
+                    status='completed', parking_cost=None if j == 2 else 12.345 * (j + 1)
+                ))
+            if i % 2:
+                spots[-1].status = 'O'
+                db.session.add(Reservation(spot_id=spots[-1].id, user_id=user_id, vehicle_number='KA05XY0001', status='active'))
+            if i == 1:
+                lot.is_active = False
+            lot.recount_spots()
+        db.session.commit()
+    return lot_ids
+
+def expected_lot(lot):
+    """One row as the listing built it before the grouped query: a revenue and an active-count query per lot"""
+    spot_ids = [spot.id for spot in lot.parking_spots]
+    total_revenue = db.session.query(func.sum(Reservation.parking_cost)).filter(
+        Reservation.spot_id.in_(spot_ids),
+        Reservation.status == 'completed',
+        Reservation.parking_cost.isnot(None)
+    ).scalar() or 0
+    active_reservations = Reservation.query.filter(
+        Reservation.spot_id.in_(spot_ids),
+        Reservation.status == 'active'
+    ).count()
+    available = lot.parking_spots.filter_by(status='A').count()
+    occupied = lot.parking_spots.filter_by(status='O').count()
+    return {
+        'id': lot.id,
+        'prime_location_name': lot.prime_location_name,
+        'address': lot.address,
+        'pin_code': lot.pin_code,
+        'price_per_hour': lot.price_per_hour,
+        'number_of_spots': lot.number_of_spots,
+        'description': lot.description,
+        'is_active': lot.is_active,
+        'created_at': lot.created_at.isoformat(),
+        'updated_at': lot.updated_at.isoformat(),
+        'available_spots': available,
+        'occupied_spots': occupied,
+        'occupancy_rate': round((occupied / lot.number_of_spots) * 100, 1) if lot.number_of_spots > 0 else 0,
+        'total_revenue': round(total_revenue, 2),
+        'active_reservations': active_reservations
+    }
+
+def test_listing_matches_per_lot_queries(app, client, admin_headers, make_lot, make_user):
+    seed_lots(app, make_lot, make_user, 7)
+    
+    for url, lot_filter in [
+        ('/api/admin/parking-lots?per_page=5', None),
+        ('/api/admin/parking-lots?per_page=5&page=2', None),
+        ('/api/admin/parking-lots?status=active&per_page=50', ParkingLot.is_active == True),
+        ('/api/admin/parking-lots?status=inactive', ParkingLot.is_active == False),
+    ]:
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        
+        with app.app_context():
+            query = ParkingLot.query.order_by(ParkingLot.created_at.desc())
+            if lot_filter is not None:
+                query = query.filter(lot_filter)
+            pagination = query.paginate(page=data['pagination']['page'], per_page=data['pagination']['per_page'], error_out=False)
+            expected = [expected_lot(lot) for lot in pagination.items]
+            expected_pagination = {
+                'page': pagination.page,
+                'per_page': pagination.per_page,
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev
+            }
+        
+        assert data['parking_lots'] == expected
+        assert data['pagination'] == expected_pagination
+
+def test_listing_statement_count_does_not_grow_with_page_size(app, client, admin_headers, make_lot, make_user, count_queries):
+    seed_lots(app, make_lot, make_user, 12)
+    client.get('/api/admin/parking-lots', headers=admin_headers)  # Warm the principal cache and revocation list
+    
+    counts = {}
+    for per_page in (1, 5, 12):
+        with count_queries() as counter:
+            response = client.get(f'/api/admin/parking-lots?per_page={per_page}', headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['data']['parking_lots']) == per_page
+        counts[per_page] = counter[0]
+    
+    # One count and one grouped page query, however many lots are on the page
+    assert counts[1] == counts[5] == counts[12]
+    assert counts[12] <= 2
@@ -0,0 +1,62 @@
+"""
+Authentication Tests for Vehicle Parking System
+Revocations and account changes made by one worker must reach every other worker's caches
+"""
+
+import time
+from datetime import datetime, timedelta
+from database import db
+from models import User, Admin, RevokedToken
+from auth_utils import principal_cache, revocation_store
+
+def deactivate_elsewhere(user_id):
+    """Deactivate a user the way another worker would - nothing in this process is told"""
+    user = db.session.get(User, user_id)
+    user.is_active = False
+    db.session.add(RevokedToken(
+        user_type='user',
+        user_id=user_id,
+        issued_before=time.time(),
+        expires_at=datetime.utcnow() + timedelta(days=7)
+    ))
+    db.session.commit()
+
+def test_cached_account_dropped_once_another_workers_cutoff_syncs(app, client, make_user):
+    user_id, headers = make_user()
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+    
+    with app.app_context():
+        deactivate_elsewhere(user_id)
+        assert principal_cache.get('user', user_id).is_active  # Still the cached copy
+        
+        revocation_store._synced_at = None  # As if the sync interval had passed
+        revocation_store._ensure_synced()
+        assert not principal_cache.get('user', user_id).is_active
+    
+    assert client.get('/api/auth/profile', headers=headers).status_code == 401
+
+def test_principal_cache_ttl_never_outlasts_revocation_sync(app):
+    with app.app_context():
+        assert principal_cache._get_ttl() <= app.config['TOKEN_REVOCATION_SYNC_SECONDS']
+
+def test_login_right_after_reactivation_is_not_revoked(client, make_user, admin_headers):
+    user_id, old_headers = make_user(username='returning')
+    toggle = f'/api/admin/users/{user_id}/toggle-status'
+    
+    # Deactivate, reactivate and log in again, all well within one second
+    assert client.post(toggle, headers=admin_headers).get_json()['data']['is_active'] is False
+    assert client.post(toggle, headers=admin_headers).get_json()['data']['is_active'] is True
+    response = client.post('/api/auth/login', json={'username': 'returning', 'password': 'password123'})
+    new_headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+    
+    assert client.get('/api/auth/profile', headers=old_headers).status_code == 401
+    assert client.get('/api/auth/profile', headers=new_headers).status_code == 200
+
+def test_revocation_sync_leaves_the_request_session_alone(app):
+    with app.app_context():
+        db.session.add(Admin(username='pending', email='pending@example.com', password_hash='x'))
+        revocation_store._synced_at = None
+        revocation_store._ensure_synced()
+        db.session.rollback()
+        
+        assert Admin.query.filter_by(username='pending').count() == 0
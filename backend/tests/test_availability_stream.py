@@ -0,0 +1,86 @@
+"""
+Availability Stream Tests for Vehicle Parking System
+The stream takes only its own short-lived token in the query string, and publishing never
+holds up open streams with a database read
+"""
+
+import threading
+import availability_feed as feed_module
+from database import db
+from models import ParkingLot, Reservation
+from availability_feed import availability_feed
+
+STREAM_URL = '/api/dashboard/stream/availability'
+
+def stream_token(client, headers):
+    response = client.post('/api/dashboard/stream/token', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['data']['token']
+
+def test_stream_opens_with_a_stream_token(client, make_user):
+    _, headers = make_user()
+    
+    response = client.get(f'{STREAM_URL}?access_token={stream_token(client, headers)}')
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    response.close()
+
+def test_session_token_refused_in_the_query_string(client, make_user):
+    _, headers = make_user()
+    session_token = headers['Authorization'].split(' ', 1)[1]
+    
+    assert client.get(f'{STREAM_URL}?access_token={session_token}').status_code == 401
+
+def test_stream_token_refused_everywhere_else(client, make_user):
+    _, headers = make_user()
+    token = stream_token(client, headers)
+    
+    assert client.get('/api/auth/profile', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+    assert client.get(f'/api/auth/profile?access_token={token}').status_code == 401
+
+def test_publish_reads_counts_outside_the_stream_condition(app, make_lot, monkeypatch):
+    lot_id = make_lot()
+    condition_free = []
+    real_lot_counts = feed_module.lot_counts
+    
+    def checking_lot_counts(lot_ids=None):
+        # Another thread - a waiting stream - must be able to take the condition meanwhile
+        def probe():
+            acquired = availability_feed._condition.acquire(timeout=1)
+            if acquired:
+                availability_feed._condition.release()
+            condition_free.append(acquired)
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return real_lot_counts(lot_ids)
+    
+    monkeypatch.setattr(feed_module, 'lot_counts', checking_lot_counts)
+    sequence = availability_feed.sequence
+    with app.app_context():
+        availability_feed.publish(lot_id)
+    
+    assert condition_free == [True]
+    assert availability_feed.sequence == sequence + 1
+
+def test_occupying_a_freed_spot_publishes_new_counts(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=2)
+    _, headers = make_user()
+    reservation_id = client.post('/api/dashboard/user/reservations', headers=headers, json={
+        'lot_id': lot_id, 'vehicle_number': 'KA01AB1234'
+    }).get_json()['data']['reservation_id']
+    
+    # The spot went back to free; occupying it again must tell open streams
+    with app.app_context():
+        reservation = db.session.get(Reservation, reservation_id)
+        reservation.parking_spot.status = 'A'
+        db.session.get(ParkingLot, lot_id).adjust_spot_counts(available_delta=1, occupied_delta=-1)
+        db.session.commit()
+        availability_feed.publish(lot_id)
+    sequence = availability_feed.sequence
+    
+    assert client.post(f'/api/dashboard/user/reservations/{reservation_id}/occupy', headers=headers).status_code == 200
+    
+    assert availability_feed.sequence == sequence + 1
+    assert '"available_spots":1' in availability_feed._events[-1][1]
@@ -0,0 +1,127 @@
+"""
+Booking Tests for Vehicle Parking System
+Spot allocation must agree with parking_spots and the lot counters, however a spot was freed
+"""
+
+import threading
+import spot_allocator as allocator_module
+from database import db
+from models import ParkingLot, ParkingSpot, Reservation
+from spot_allocator import spot_allocator
+
+def book(client, headers, lot_id):
+    return client.post('/api/dashboard/user/reservations', headers=headers, json={
+        'lot_id': lot_id,
+        'vehicle_number': 'KA01AB1234'
+    })
+
+def spot_counts(app, lot_id):
+    with app.app_context():
+        lot = db.session.get(ParkingLot, lot_id)
+        return lot.available_count, lot.occupied_count
+
+def test_books_lowest_numbered_free_spot(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=3)
+    _, headers = make_user()
+    
+    response = book(client, headers, lot_id)
+    
+    assert response.status_code == 201
+    assert response.get_json()['data']['spot_number'] == 'A01'
+    assert spot_counts(app, lot_id) == (2, 1)
+
+def test_books_spot_freed_outside_the_allocator(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=2)
+    for _ in range(2):
+        _, headers = make_user()
+        assert book(client, headers, lot_id).status_code == 201
+    _, headers = make_user()
+    assert book(client, headers, lot_id).status_code == 400
+    
+    # The heap is now empty; free a spot the way another worker would, without telling it
+    with app.app_context():
+        reservation = Reservation.query.filter_by(status='active').order_by(Reservation.id).first()
+        reservation.status = 'completed'
+        reservation.parking_spot.status = 'A'
+        freed = reservation.parking_spot.spot_number
+        db.session.get(ParkingLot, lot_id).adjust_spot_counts(available_delta=1, occupied_delta=-1)
+        db.session.commit()
+    
+    response = book(client, headers, lot_id)
+    
+    assert response.status_code == 201
+    assert response.get_json()['data']['spot_number'] == freed
+    assert spot_counts(app, lot_id) == (0, 2)
+
+def test_lower_spot_freed_by_another_worker_is_booked_first(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=3)
+    for _ in range(2):
+        _, headers = make_user()
+        assert book(client, headers, lot_id).status_code == 201
+    
+    # A01 is freed by another worker; this worker's heap still holds only A03
+    with app.app_context():
+        spot = ParkingSpot.query.filter_by(lot_id=lot_id, spot_number='A01').one()
+        reservation = Reservation.active_for_spot(spot.id).one()
+        reservation.status = 'completed'
+        spot.status = 'A'
+        db.session.get(ParkingLot, lot_id).adjust_spot_counts(available_delta=1, occupied_delta=-1)
+        db.session.commit()
+    _, headers = make_user()
+    
+    response = book(client, headers, lot_id)
+    
+    assert response.status_code == 201
+    assert response.get_json()['data']['spot_number'] == 'A01'
+    assert spot_counts(app, lot_id) == (1, 2)
+
+def test_full_lot_with_drifted_counter_is_recounted(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=2)
+    with app.app_context():
+        ParkingSpot.query.filter_by(lot_id=lot_id).update({'status': 'O'})
+        db.session.commit()
+    _, headers = make_user()
+    
+    response = book(client, headers, lot_id)
+    
+    assert response.status_code == 400
+    assert spot_counts(app, lot_id) == (0, 2)
+
+def test_stale_heap_never_double_books(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=3)
+    _, headers = make_user()
+    assert book(client, headers, lot_id).status_code == 201
+    
+    # As if another worker's heap still listed A01 as free
+    with app.app_context():
+        spot = ParkingSpot.query.filter_by(lot_id=lot_id, spot_number='A01').one()
+        spot_allocator.release(lot_id, spot.id, spot.spot_number)
+    _, headers = make_user()
+    response = book(client, headers, lot_id)
+    
+    assert response.status_code == 201
+    assert response.get_json()['data']['spot_number'] == 'A02'
+    assert spot_counts(app, lot_id) == (1, 2)
+
+def test_cold_load_leaves_the_allocator_lock_free(app, make_lot, monkeypatch):
+    lot_id = make_lot(spots=3)
+    lock_free = []
+    real_free_spots_query = allocator_module.free_spots_query
+    
+    def checking_free_spots_query(lot_id):
+        # A booking in another lot, on another thread, must not wait for this read
+        def probe():
+            acquired = spot_allocator._lock.acquire(timeout=1)
+            if acquired:
+                spot_allocator._lock.release()
+            lock_free.append(acquired)
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return real_free_spots_query(lot_id)
+    
+    monkeypatch.setattr(allocator_module, 'free_spots_query', checking_free_spots_query)
+    with app.app_context():
+        assert spot_allocator.acquire(lot_id)[1] == 'A01'
+    
+    assert lock_free == [True]
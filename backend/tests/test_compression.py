@@ -0,0 +1,102 @@
+"""
+Compression Tests for Vehicle Parking System
+Large bodies are compressed as Accept-Encoding allows, streams and small bodies are left alone, and ETags still revalidate
+"""
+
+import gzip
+import zlib
+import pytest
+from compression import compress_stream, available_encodings
+
+LOTS_URL = '/api/dashboard/user/parking-lots'
+
+@pytest.fixture
+def browsing(client, make_user, make_lot):
+    """Headers of a user whose lot list is well past the compression threshold"""
+    for _ in range(12):
+        make_lot(description='Covered parking with CCTV, EV charging and a security guard on duty all day')
+    return make_user()[1]
+
+def get(client, headers, accept_encoding=None, **extra):
+    if accept_encoding is not None:
+        headers = dict(headers, **{'Accept-Encoding': accept_encoding})
+    return client.get(LOTS_URL, headers=dict(headers, **extra))
+
+def test_gzip_when_accepted(client, browsing):
+    plain = get(client, browsing)
+    
+    response = get(client, browsing, 'gzip')
+    
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data())
+
+def test_brotli_preferred_when_accepted(client, browsing):
+    brotli = pytest.importorskip('brotli')
+    plain = get(client, browsing)
+    
+    response = get(client, browsing, 'gzip, deflate, br')
+    
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == plain.get_data()
+
+def test_client_weights_pick_the_coding(client, browsing):
+    assert get(client, browsing, 'br;q=0.5, gzip;q=1.0').headers['Content-Encoding'] == 'gzip'
+
+@pytest.mark.parametrize('accept_encoding', [None, 'identity', 'deflate', 'gzip;q=0, br;q=0'])
+def test_identity_when_no_offered_coding_is_accepted(client, browsing, accept_encoding):
+    response = get(client, browsing, accept_encoding)
+    
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['success'] is True
+    assert 'Accept-Encoding' in response.vary
+
+def test_small_bodies_go_out_uncompressed(app, client, make_user):
+    _, headers = make_user()
+    
+    response = client.get('/api/auth/profile', headers=dict(headers, **{'Accept-Encoding': 'gzip'}))
+    
+    assert len(response.get_data()) < app.config['COMPRESS_MIN_SIZE']
+    assert 'Content-Encoding' not in response.headers
+
+def test_threshold_and_switch_are_configurable(app, client, browsing):
+    app.config['COMPRESS_MIN_SIZE'] = 10 ** 6
+    assert 'Content-Encoding' not in get(client, browsing, 'gzip').headers
+    
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    app.config['COMPRESS_ENABLED'] = False
+    assert 'Content-Encoding' not in get(client, browsing, 'gzip').headers
+
+def test_event_stream_is_not_compressed(client, make_user):
+    _, headers = make_user()
+    token = client.post('/api/dashboard/stream/token', headers=headers).get_json()['data']['token']
+    
+    response = client.get(f'/api/dashboard/stream/availability?access_token={token}', headers={'Accept-Encoding': 'gzip, br'})
+    
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+    response.close()
+
+@pytest.mark.parametrize('coding', available_encodings())
+def test_compressed_etag_revalidates_to_304(client, browsing, coding):
+    response = get(client, browsing, coding)
+    etag = response.headers['ETag']
+    assert etag.endswith(f'-{coding}"')
+    
+    revalidated = get(client, browsing, coding, **{'If-None-Match': etag})
+    
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert get(client, browsing, **{'If-None-Match': etag}).status_code == 304
+
+def test_streamed_bodies_are_flushed_chunk_by_chunk():
+    chunks = ['data: first\n\n', b'data: second\n\n']
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    
+    stream = compress_stream(iter(chunks), 'gzip', 6)
+    
+    assert decompressor.decompress(next(stream)) == b'data: first\n\n'
+    assert decompressor.decompress(next(stream)) == b'data: second\n\n'
+    decompressor.decompress(b''.join(stream))
+    assert decompressor.eof
@@ -0,0 +1,143 @@
+"""
+Cursor Pagination Tests for Vehicle Parking System
+Cursor pages must walk every reservation once, refuse cursors the API didn't issue, and count only on request
+"""
+
+import base64
+import pytest
+from datetime import datetime, timedelta
+from database import db
+from models import ParkingLot, Reservation
+from cursor_pagination import encode_cursor, decode_cursor, InvalidPagination
+
+HISTORY_URL = '/api/dashboard/user/reservations'
+ADMIN_URL = '/api/admin/reservations'
+START = datetime(2026, 3, 14, 9, 0, 0)
+
+def seed_history(app, lot_id, user_id, count):
+    """Completed reservations, every two sharing a created_at so pages must break ties on id"""
+    with app.app_context():
+        spot = db.session.get(ParkingLot, lot_id).parking_spots.first()
+        for i in range(count):
+            created_at = START + timedelta(minutes=i // 2)
+            db.session.add(Reservation(
+                spot_id=spot.id, user_id=user_id, vehicle_number=f'KA01AB{i:04d}',
+                parking_timestamp=created_at, leaving_timestamp=created_at + timedelta(hours=1),
+                parking_cost=40.0, status='completed', created_at=created_at
+            ))
+        db.session.commit()
+
+def walk(client, url, headers, per_page, **params):
+    """Ids from every cursor page in order, and how many pages it took"""
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get(url, headers=headers, query_string=dict(params, cursor=cursor, per_page=per_page))
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        ids.extend(reservation['id'] for reservation in data['reservations'])
+        cursor = data['pagination']['next_cursor']
+        pages += 1
+    return ids, pages
+
+def test_cursor_round_trips():
+    created_at = datetime(2026, 3, 14, 9, 30, 15, 123456)
+    
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert '=' not in encode_cursor(created_at, 42)
+
+def test_pages_cover_every_reservation_once_newest_first(app, client, make_user, make_lot):
+    user_id, headers = make_user()
+    seed_history(app, make_lot(), user_id, 11)
+    with app.app_context():
+        expected = [reservation.id for reservation in Reservation.query.order_by(
+            Reservation.created_at.desc(), Reservation.id.desc())]
+    
+    ids, pages = walk(client, HISTORY_URL, headers, 3)
+    
+    assert ids == expected
+    assert pages == 4
+
+def test_rows_added_while_paging_neither_repeat_nor_shift_later_pages(app, client, make_user, make_lot):
+    user_id, headers = make_user()
+    lot_id = make_lot()
+    seed_history(app, lot_id, user_id, 6)
+    first = client.get(HISTORY_URL, headers=headers, query_string={'cursor': '', 'per_page': 3}).get_json()['data']
+    
+    seed_history(app, lot_id, user_id, 2)  # Same created_at as rows on later pages, with newer ids
+    second = client.get(HISTORY_URL, headers=headers, query_string={
+        'cursor': first['pagination']['next_cursor'], 'per_page': 3
+    }).get_json()['data']
+    
+    first_ids = {reservation['id'] for reservation in first['reservations']}
+    assert not first_ids & {reservation['id'] for reservation in second['reservations']}
+    assert len(second['reservations']) == 3
+
+def test_admin_pages_cover_every_reservation_once(app, client, make_user, make_lot, admin_headers):
+    lot_id = make_lot()
+    for _ in range(2):
+        seed_history(app, lot_id, make_user()[0], 4)
+    
+    ids, _ = walk(client, ADMIN_URL, admin_headers, 3)
+    
+    assert len(ids) == len(set(ids)) == 8
+
+def b64(raw):
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    '!!!!',
+    b64(b'\xff\xfe'),
+    b64(b'{"created_at": 1}'),
+    b64(b'[]'),
+    b64(b'["2026-03-14T09:00:00", 1, 2]'),
+    b64(b'["yesterday", 1]'),
+    b64(b'[null, 1]'),
+    b64(b'["2026-03-14T09:00:00", "one"]'),
+    b64(b'["2026-03-14T09:00:00", 99999999999999999999999999]'),
+    b64(b'["2026-03-14T09:00:00+05:30", 1]'),
+    b64(b'["2026-03-14T09:00:00", -1]'),
+])
+def test_tampered_or_malformed_cursor_is_a_400(client, make_user, admin_headers, cursor):
+    _, headers = make_user()
+    
+    for url, request_headers in ((HISTORY_URL, headers), (ADMIN_URL, admin_headers)):
+        response = client.get(url, headers=request_headers, query_string={'cursor': cursor})
+        assert response.status_code == 400
+        assert response.get_json()['message'] == 'Invalid cursor'
+
+def test_decode_cursor_raises_invalid_pagination():
+    with pytest.raises(InvalidPagination):
+        decode_cursor(b64(b'[1, 2]'))
+
+def pagination(client, headers, **params):
+    response = client.get(HISTORY_URL, headers=headers, query_string=dict(params, cursor='', per_page=2))
+    assert response.status_code == 200
+    return response.get_json()['data']['pagination']
+
+def test_count_modes(app, client, make_user, make_lot):
+    user_id, headers = make_user()
+    seed_history(app, make_lot(), user_id, 5)
+    app.config['CURSOR_COUNT_CAP'] = 3
+    
+    none = pagination(client, headers)
+    assert (none['total'], none['total_capped']) == (None, False)
+    assert pagination(client, headers, count='none') == none
+    
+    exact = pagination(client, headers, count='exact')
+    assert (exact['total'], exact['total_capped']) == (5, False)
+    
+    approximate = pagination(client, headers, count='approximate')
+    assert (approximate['total'], approximate['total_capped']) == (3, True)
+    
+    app.config['CURSOR_COUNT_CAP'] = 10
+    approximate = pagination(client, headers, count='approximate')
+    assert (approximate['total'], approximate['total_capped']) == (5, False)
+
+def test_unknown_count_mode_is_a_400(client, make_user):
+    _, headers = make_user()
+    
+    response = client.get(HISTORY_URL, headers=headers, query_string={'cursor': '', 'count': 'all'})
+    
+    assert response.status_code == 400
+    assert 'count must be one of' in response.get_json()['message']
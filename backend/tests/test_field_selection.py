@@ -0,0 +1,87 @@
+"""
+Field Selection Tests for Vehicle Parking System
+?fields= trims list rows to the named fields plus id, unknown names are a 400, and no parameter keeps the full row
+"""
+
+import pytest
+
+# Every list endpoint taking ?fields=: (url, key of the row list, who asks, a narrower selection, the full row)
+ENDPOINTS = [
+    ('/api/dashboard/user/reservations', 'reservations', 'user', 'status,lot_name,vehicle_number', [
+        'id', 'spot_number', 'lot_name', 'lot_address', 'lot_price_per_hour', 'status', 'vehicle_number',
+        'vehicle_model', 'parking_timestamp', 'leaving_timestamp', 'duration_minutes', 'duration_hours',
+        'cost', 'created_at'
+    ]),
+    ('/api/dashboard/user/parking-lots', 'lots', 'user', 'name,price_per_hour', [
+        'id', 'name', 'address', 'pin_code', 'price_per_hour', 'available_spots', 'total_spots',
+        'occupancy_rate', 'description', 'created_at'
+    ]),
+    ('/api/admin/reservations', 'reservations', 'admin', 'user,parking_lot,status', [
+        'id', 'user', 'parking_lot', 'spot_number', 'status', 'vehicle_number', 'vehicle_model',
+        'parking_timestamp', 'leaving_timestamp', 'duration_minutes', 'duration_hours', 'cost',
+        'created_at', 'updated_at'
+    ]),
+    ('/api/admin/parking-lots', 'parking_lots', 'admin', 'prime_location_name,active_reservations', [
+        'id', 'prime_location_name', 'address', 'pin_code', 'price_per_hour', 'number_of_spots',
+        'description', 'is_active', 'created_at', 'updated_at', 'available_spots', 'occupied_spots',
+        'occupancy_rate', 'total_revenue', 'active_reservations'
+    ]),
+    ('/api/admin/users', 'users', 'admin', 'username,is_active', [
+        'id', 'username', 'email', 'full_name', 'phone_number', 'address', 'is_active', 'created_at',
+        'statistics', 'current_reservation'
+    ]),
+    ('/api/dashboard/admin/users', 'users', 'admin', 'username,total_reservations', [
+        'id', 'username', 'email', 'full_name', 'phone_number', 'address', 'created_at', 'is_active',
+        'role', 'total_reservations', 'active_reservations'
+    ]),
+    ('/api/dashboard/admin/parking-lots', 'parking_lots', 'admin', 'prime_location_name,occupied_spots', [
+        'id', 'prime_location_name', 'address', 'pin_code', 'price_per_hour', 'number_of_spots',
+        'description', 'is_active', 'created_at', 'available_spots', 'occupied_spots', 'occupancy_rate'
+    ]),
+]
+
+@pytest.fixture
+def requesters(client, make_user, make_lot, admin_headers):
+    """Headers for a user with a booking in a lot that still has free spots, and for the admin"""
+    _, headers = make_user()
+    lot_id = make_lot(spots=3)
+    assert client.post('/api/dashboard/user/reservations', headers=headers, json={
+        'lot_id': lot_id, 'vehicle_number': 'KA01AB1234'
+    }).status_code == 201
+    return {'user': headers, 'admin': admin_headers}
+
+def rows(client, url, key, headers, **params):
+    response = client.get(url, headers=headers, query_string=params)
+    assert response.status_code == 200
+    items = response.get_json()['data'][key]
+    assert items
+    return items
+
+@pytest.mark.parametrize('url, key, who, selection, full_row', ENDPOINTS)
+def test_no_fields_parameter_keeps_the_full_row(client, requesters, url, key, who, selection, full_row):
+    for params in ({}, {'fields': ''}):
+        assert all(set(row) == set(full_row) for row in rows(client, url, key, requesters[who], **params))
+
+@pytest.mark.parametrize('url, key, who, selection, full_row', ENDPOINTS)
+def test_fields_trims_rows_to_the_selection_and_id(client, requesters, url, key, who, selection, full_row):
+    full = {row['id']: row for row in rows(client, url, key, requesters[who])}
+    
+    trimmed = rows(client, url, key, requesters[who], fields=f' {selection}, ')
+    
+    names = {'id'} | set(selection.split(','))
+    for row in trimmed:
+        assert set(row) == names
+        assert row == {name: full[row['id']][name] for name in names}
+
+@pytest.mark.parametrize('url, key, who, selection, full_row', ENDPOINTS)
+def test_unknown_field_is_a_400(client, requesters, url, key, who, selection, full_row):
+    response = client.get(url, headers=requesters[who], query_string={'fields': f'{selection},password_hash'})
+    
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Unknown fields: password_hash')
+
+def test_trimmed_request_leaves_the_cached_lot_page_whole(client, requesters):
+    url, key, who, selection, full_row = ENDPOINTS[1]
+    rows(client, url, key, requesters[who], fields=selection)  # Builds and caches the page
+    
+    assert all(set(row) == set(full_row) for row in rows(client, url, key, requesters[who]))
@@ -0,0 +1,99 @@
+"""
+JSON Provider Tests for Vehicle Parking System
+orjson and the stdlib fallback must write the same documents as Flask's own provider did
+"""
+
+import json
+import pytest
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+import json_provider
+
+ENCODERS = ['orjson', 'stdlib']
+
+PAYLOAD = {
+    'success': True,
+    'data': {
+        'lot': {'name': 'Koramangala Parking', 'price_per_hour': 40.0, 'description': None},
+        'created_at': datetime(2026, 3, 14, 9, 30, 15, 123456).isoformat(),
+        'revenue': Decimal('1234.50'),
+        'rates': [Decimal('0.1'), Decimal('35')],
+        'zebra': 1,
+        'alpha': [1, 2.5, 'três', {'b': 2, 'a': 1}]
+    }
+}
+
+@pytest.fixture(params=ENCODERS)
+def encoder(request, app):
+    """Run the test with responses written by each encoder"""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+        app.config['JSON_ENCODER'] = 'auto'
+    else:
+        app.config['JSON_ENCODER'] = 'stdlib'
+    assert app.json.encoder == request.param
+    return request.param
+
+def body(app, payload):
+    with app.test_request_context():
+        return app.json.response(payload).get_data()
+
+def test_documents_match_the_flask_provider(app, encoder):
+    with app.test_request_context():
+        expected = DefaultJSONProvider(app).response(PAYLOAD).get_data()
+    
+    written = body(app, PAYLOAD)
+    
+    assert json.loads(written) == json.loads(expected)
+    assert json.loads(written)['data']['revenue'] == '1234.50'
+    assert list(json.loads(written)['data']) == sorted(PAYLOAD['data'])
+
+def test_dates_are_written_in_isoformat(app, encoder):
+    moments = {
+        'datetime': datetime(2026, 3, 14, 9, 30, 15, 123456),
+        'whole_seconds': datetime(2026, 3, 14, 9, 30),
+        'date': date(2026, 3, 14),
+        'time': time(9, 30, 15)
+    }
+    
+    written = json.loads(body(app, moments))
+    
+    assert written == {name: value.isoformat() for name, value in moments.items()}
+
+def test_both_encoders_write_the_same_document(app):
+    pytest.importorskip('orjson')
+    app.config['JSON_ENCODER'] = 'stdlib'
+    stdlib = body(app, PAYLOAD)
+    app.config['JSON_ENCODER'] = 'auto'
+    fast = body(app, PAYLOAD)
+    
+    assert json.loads(fast) == json.loads(stdlib)
+    assert fast.endswith(b'\n') and stdlib.endswith(b'\n')
+
+def test_integers_orjson_refuses_fall_back_to_the_stdlib(app, encoder):
+    assert json.loads(body(app, {'big': 2 ** 70})) == {'big': 2 ** 70}
+
+def test_unserializable_values_still_raise(app, encoder):
+    with pytest.raises(TypeError):
+        body(app, {'value': object()})
+
+def test_stdlib_used_when_orjson_is_missing(app, monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    
+    assert app.json.encoder == 'stdlib'
+    assert json.loads(body(app, PAYLOAD)) == json.loads(json.dumps(PAYLOAD, default=str))
+
+def test_api_responses_match_across_encoders(app, client, make_user, make_lot, admin_headers):
+    pytest.importorskip('orjson')
+    _, headers = make_user()
+    lot_id = make_lot(spots=3)
+    client.post('/api/dashboard/user/reservations', headers=headers, json={'lot_id': lot_id, 'vehicle_number': 'KA01AB1234'})
+    documents = {}
+    for encoder in ENCODERS:
+        app.config['JSON_ENCODER'] = 'auto' if encoder == 'orjson' else 'stdlib'
+        response = client.get('/api/admin/users', headers=admin_headers)
+        assert response.mimetype == 'application/json'
+        documents[encoder] = response.get_json()
+    
+    assert documents['orjson'] == documents['stdlib']
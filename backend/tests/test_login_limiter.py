@@ -0,0 +1,27 @@
+"""
+Login Rate Limiter Tests for Vehicle Parking System
+Guesses against an account must not lock its owner out, while guessing from many IPs stays capped
+"""
+
+def login(client, username, password, ip_address):
+    return client.post('/api/auth/login', json={'username': username, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip_address})
+
+def test_guesses_from_another_ip_dont_lock_the_owner_out(client, make_user):
+    make_user(username='victim')
+    for _ in range(10):
+        login(client, 'victim', 'guess', '203.0.113.66')
+    assert login(client, 'victim', 'guess', '203.0.113.66').status_code == 429
+    
+    assert login(client, 'victim', 'password123', '198.51.100.7').status_code == 200
+
+def test_guesses_spread_over_many_ips_hit_the_account_limit(app, client, make_user):
+    make_user(username='victim')
+    burst = app.config['LOGIN_RATE_LIMIT_ACCOUNT_BURST']
+    for i in range(burst):
+        assert login(client, 'victim', 'guess', f'203.0.113.{i + 1}').status_code == 401
+    
+    response = login(client, 'victim', 'guess', '203.0.113.200')
+    
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
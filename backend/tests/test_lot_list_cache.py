@@ -0,0 +1,109 @@
+"""
+Lot List Cache Tests for Vehicle Parking System
+Pages are bounded by LRU eviction, only served at the lot state they were built at, and dropped by writes
+"""
+
+from database import db
+from models import ParkingLot
+from lot_list_cache import LotListCache, lot_list_cache
+
+LOTS_URL = '/api/dashboard/user/parking-lots'
+
+def builder(data, lot_ids, calls):
+    """A build() that records each call"""
+    def build():
+        calls.append(data)
+        return data, lot_ids
+    return build
+
+def test_least_recently_used_page_is_evicted_first():
+    cache = LotListCache(max_entries=2)
+    calls = []
+    cache.get('a', 1, builder('page a', [1], calls))
+    cache.get('b', 1, builder('page b', [2], calls))
+    cache.get('a', 1, builder('page a', [1], calls))  # 'b' is now the least recently used
+    
+    cache.get('c', 1, builder('page c', [3], calls))
+    
+    assert cache.get('a', 1, builder('page a', [1], calls)) == 'page a'
+    assert cache.get('b', 1, builder('page b again', [2], calls)) == 'page b again'
+    assert calls == ['page a', 'page b', 'page c', 'page b again']
+    assert cache.stats()['evictions'] == 2
+    assert cache.stats()['entries'] == 2
+
+def test_page_only_hits_at_the_state_it_was_built_at():
+    cache = LotListCache()
+    calls = []
+    
+    assert cache.get('a', (1, 1), builder('old', [1], calls)) == 'old'
+    assert cache.get('a', (1, 1), builder('unused', [1], calls)) == 'old'
+    assert cache.get('a', (1, 2), builder('new', [1], calls)) == 'new'
+    
+    assert calls == ['old', 'new']
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_invalidate_drops_only_the_pages_covering_the_lot():
+    cache = LotListCache()
+    calls = []
+    cache.get('first', 1, builder('lots 1-2', [1, 2], calls))
+    cache.get('second', 1, builder('lots 3-4', [3, 4], calls))
+    
+    cache.invalidate(2)
+    cache.get('first', 1, builder('lots 1-2 rebuilt', [1, 2], calls))
+    cache.get('second', 1, builder('unused', [3, 4], calls))
+    
+    assert calls == ['lots 1-2', 'lots 3-4', 'lots 1-2 rebuilt']
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+
+def test_zero_max_entries_turns_caching_off():
+    cache = LotListCache(max_entries=0)
+    calls = []
+    cache.get('a', 1, builder('first', [1], calls))
+    cache.get('a', 1, builder('second', [1], calls))
+    
+    assert calls == ['first', 'second']
+
+def listed_lot(client, headers, lot_id):
+    response = client.get(LOTS_URL, headers=headers)
+    assert response.status_code == 200
+    return next(lot for lot in response.get_json()['data']['lots'] if lot['id'] == lot_id)
+
+def test_booking_stops_the_cached_page_being_served(client, make_user, make_lot):
+    lot_id = make_lot(spots=3)
+    _, headers = make_user()
+    assert listed_lot(client, headers, lot_id)['available_spots'] == 3
+    
+    assert client.post('/api/dashboard/user/reservations', headers=headers, json={
+        'lot_id': lot_id, 'vehicle_number': 'KA01AB1234'
+    }).status_code == 201
+    
+    assert listed_lot(client, headers, lot_id)['available_spots'] == 2
+
+def test_lot_edit_stops_the_cached_page_being_served(client, make_user, make_lot, admin_headers):
+    lot_id = make_lot(spots=3, price_per_hour=40.0)
+    _, headers = make_user()
+    assert listed_lot(client, headers, lot_id)['price_per_hour'] == 40.0
+    
+    lot = client.get(f'/api/admin/parking-lots/{lot_id}', headers=admin_headers).get_json()['data']
+    assert client.put(f'/api/admin/parking-lots/{lot_id}', headers=admin_headers, json={
+        'prime_location_name': lot['prime_location_name'], 'address': lot['address'],
+        'pin_code': lot['pin_code'], 'price_per_hour': 55.0, 'number_of_spots': 3
+    }).status_code == 200
+    
+    assert listed_lot(client, headers, lot_id)['price_per_hour'] == 55.0
+
+def test_write_from_another_process_misses_on_the_lot_state(app, client, make_user, make_lot):
+    lot_id = make_lot(spots=3, price_per_hour=40.0)
+    _, headers = make_user()
+    assert listed_lot(client, headers, lot_id)['price_per_hour'] == 40.0
+    
+    # Nothing in this process calls invalidate(); the bumped version alone must cause the miss
+    with app.app_context():
+        lot = db.session.get(ParkingLot, lot_id)
+        lot.price_per_hour = 60.0
+        lot.bump_version()
+        db.session.commit()
+    assert lot_list_cache.stats()['entries'] == 1
+    
+    assert listed_lot(client, headers, lot_id)['price_per_hour'] == 60.0
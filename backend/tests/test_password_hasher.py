@@ -0,0 +1,77 @@
+"""
+Password Hashing Tests for Vehicle Parking System
+A full hashing queue turns callers away with a 503, and logins upgrade hashes made with an older method
+"""
+
+from contextlib import contextmanager
+from werkzeug.security import generate_password_hash, check_password_hash
+from database import db
+from models import User
+from password_hasher import password_hasher
+
+@contextmanager
+def saturated_hasher():
+    """Hold every worker and queue slot of the hashing pool, as a burst of slow hashes would"""
+    password_hasher._ensure_started()
+    held = 0
+    while password_hasher._slots.acquire(blocking=False):
+        held += 1
+    try:
+        yield
+    finally:
+        for _ in range(held):
+            password_hasher._slots.release()
+
+def test_login_and_register_get_503_with_retry_after_when_the_queue_is_full(client, make_user):
+    make_user(username='waiting')
+    
+    with saturated_hasher():
+        login = client.post('/api/auth/login', json={'username': 'waiting', 'password': 'password123'})
+        register = client.post('/api/auth/register', json={
+            'username': 'newcomer', 'email': 'newcomer@example.com',
+            'full_name': 'New Comer', 'password': 'password123'
+        })
+    
+    for response in (login, register):
+        assert response.status_code == 503
+        assert response.get_json()['error_code'] == 'SERVER_BUSY'
+        assert response.headers['Retry-After'] == str(password_hasher.retry_after)
+    
+    assert client.post('/api/auth/login', json={'username': 'waiting', 'password': 'password123'}).status_code == 200
+
+def test_login_rehashes_a_password_made_with_another_method(app, client, make_user):
+    legacy_hash = generate_password_hash('password123', method='pbkdf2:sha256:500')
+    user_id, _ = make_user(username='legacy', password_hash=legacy_hash)
+    
+    assert client.post('/api/auth/login', json={'username': 'legacy', 'password': 'password123'}).status_code == 200
+    
+    with app.app_context():
+        upgraded = db.session.get(User, user_id).password_hash
+    assert upgraded.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert check_password_hash(upgraded, 'password123')
+
+def test_login_keeps_a_hash_made_with_the_current_method(app, client, make_user):
+    user_id, _ = make_user(username='current')
+    with app.app_context():
+        original = db.session.get(User, user_id).password_hash
+    
+    assert client.post('/api/auth/login', json={'username': 'current', 'password': 'password123'}).status_code == 200
+    
+    with app.app_context():
+        assert db.session.get(User, user_id).password_hash == original
+
+def test_needs_rehash_compares_the_whole_method_prefix(app):
+    with app.app_context():
+        method = app.config['PASSWORD_HASH_METHOD']
+        assert not password_hasher.needs_rehash(generate_password_hash('secret', method=method))
+        assert password_hasher.needs_rehash(generate_password_hash('secret', method='pbkdf2:sha256:999'))
+        assert password_hasher.needs_rehash(generate_password_hash('secret', method='scrypt'))
+
+def test_hash_many_returns_one_hash_per_password_in_order(app):
+    passwords = [f'password-{i}' for i in range(password_hasher.workers * 2 + 1)]
+    
+    with app.app_context():
+        hashes = password_hasher.hash_many(passwords)
+    
+    assert len(hashes) == len(passwords)
+    assert all(check_password_hash(password_hash, password) for password_hash, password in zip(hashes, passwords))
@@ -0,0 +1,53 @@
+"""
+Query Plan Tests for Vehicle Parking System
+The hot queries, built by the same helpers the routes call, must be served by the indexes meant for them
+"""
+
+import pytest
+from db_utils import hot_queries, explain_query_plan, full_scans
+
+# Index (or FTS table) each hot query's plan must use; a new hot query needs an entry here
+EXPECTED_INDEXES = {
+    'user active reservation': ['ix_reservations_user_status'],
+    'spot current reservation': ['ix_reservations_spot_status'],
+    'user reservation page': ['ix_reservations_user_created'],
+    'user reservation page by status': ['ix_reservations_user_created'],
+    'user reservation cursor page': ['ix_reservations_user_created (user_id=? AND created_at<?)'],
+    'user reservation totals': ['ix_reservations_user_created'],
+    'free spots in lot': ['COVERING INDEX ix_parking_spots_lot_status (lot_id=? AND status=?)'],
+    'lowest free spot in lot': ['COVERING INDEX ix_parking_spots_lot_status (lot_id=? AND status=?)'],
+    'lot spot counts': ['COVERING INDEX ix_parking_spots_lot_status'],
+    'claim spot': ['parking_spots USING INTEGER PRIMARY KEY'],
+    'lot availability': ['parking_lots USING INTEGER PRIMARY KEY'],
+    'availability snapshot': ['ix_parking_lots_is_active'],
+    'lot browsing page': ['ix_parking_lots_active_available'],
+    'lot browsing search': ['ix_parking_lots_active_available', 'parking_lots_fts'],
+    'admin lot page': ['ix_parking_lots_created_at', 'ix_parking_spots_lot_status', 'ix_reservations_spot_status'],
+    'admin lot search': ['parking_lots_fts', 'ix_parking_spots_lot_status', 'ix_reservations_spot_status'],
+    'admin user page': ['ix_users_created_at'],
+    'admin user search': ['users_fts'],
+    'admin user statistics': ['ix_reservations_user_created'],
+    'admin reservation page': ['ix_reservations_status_leaving'],
+    'admin reservation search': ['users_fts', 'ix_reservations_user_created', 'parking_lots_fts'],
+    'admin reservation cursor page': ['ix_reservations_created_at (created_at<?)'],
+    'recent users': ['ix_users_created_at'],
+    'recent reservations': ['ix_reservations_created_at'],
+    'revenue trend': ['ix_lot_daily_stats_date'],
+    'peak hours': ['ix_reservations_status_leaving'],
+    'top users by spending': ['ix_reservations_status_leaving'],
+}
+
+def plans(app):
+    with app.app_context():
+        return {label: explain_query_plan(statement) for label, statement in hot_queries()}
+
+def test_every_hot_query_has_expected_indexes(app):
+    assert sorted(plans(app)) == sorted(EXPECTED_INDEXES)
+
+@pytest.mark.parametrize('label', list(EXPECTED_INDEXES))
+def test_hot_query_uses_its_indexes(app, label):
+    plan = plans(app)[label]
+    
+    assert full_scans(plan) == []
+    missing = [index for index in EXPECTED_INDEXES[label] if not any(index in line for line in plan)]
+    assert missing == [], plan
@@ -0,0 +1,137 @@
+"""
+Reservation Serializer Tests for Vehicle Parking System
+Eager-loaded history and admin rows must serialize exactly as the old per-row code did, in one statement
+"""
+
+from datetime import datetime, timedelta
+from database import db
+from models import ParkingLot, ParkingSpot, Reservation
+from reservation_serializers import with_details, with_joined_details, serialize_history, serialize_admin
+from routes.admin import reservation_list_query
+from routes.dashboard import history_query
+import reservation_serializers
+
+NOW = datetime(2026, 3, 14, 12, 0, 0)
+
+class FrozenDatetime(datetime):
+    """datetime whose utcnow() is NOW, so live durations and costs are the same on every read"""
+    
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+def seed_reservations(app, make_lot, make_user):
+    """Completed (costed and uncosted), cancelled and active reservations for two users over two lots"""
+    users = [make_user(phone_number='9876543210')[0], make_user()[0]]
+    lot_ids = [make_lot(spots=4, price_per_hour=35.5), make_lot(spots=3, price_per_hour=20.0)]
+    with app.app_context():
+        for i, lot_id in enumerate(lot_ids):
+            spots = db.session.get(ParkingLot, lot_id).parking_spots.order_by(ParkingSpot.spot_number).all()
+            for j, (status, cost) in enumerate([('completed', 71.0), ('completed', None), ('cancelled', None), ('active', None)][:len(spots)]):
+                start = NOW - timedelta(hours=2 + i, minutes=17 * j)
+                db.session.add(Reservation(
+                    spot_id=spots[j].id, user_id=users[(i + j) % 2],
+                    vehicle_number=f'KA01AB{i}{j:03d}', vehicle_model='Swift' if j % 2 else None,
+                    parking_timestamp=start,
+                    leaving_timestamp=start + timedelta(minutes=95) if status == 'completed' else None,
+                    parking_cost=cost, status=status,
+                    created_at=start, updated_at=start + timedelta(minutes=1)
+                ))
+        db.session.commit()
+    return users
+
+def live_figures(reservation):
+    """Duration and cost as the old list endpoints computed them inline"""
+    if reservation.status == 'active':
+        duration_minutes = (NOW - reservation.parking_timestamp).total_seconds() / 60
+        cost = round(duration_minutes / 60 * reservation.parking_spot.parking_lot.price_per_hour, 2)
+    else:
+        duration_minutes = reservation.duration_minutes
+        cost = reservation.parking_cost or 0
+    duration_hours = reservation.duration_hours if reservation.status == 'completed' else round(duration_minutes / 60, 1)
+    return int(duration_minutes), duration_hours, cost
+
+def expected_history(reservation):
+    """One row as GET /api/dashboard/user/reservations built it before the shared serializers"""
+    duration_minutes, duration_hours, cost = live_figures(reservation)
+    return {
+        'id': reservation.id,
+        'spot_number': reservation.parking_spot.spot_number,
+        'lot_name': reservation.parking_spot.parking_lot.prime_location_name,
+        'lot_address': reservation.parking_spot.parking_lot.address,
+        'lot_price_per_hour': reservation.parking_spot.parking_lot.price_per_hour,
+        'status': reservation.status,
+        'vehicle_number': reservation.vehicle_number,
+        'vehicle_model': reservation.vehicle_model,
+        'parking_timestamp': reservation.parking_timestamp.isoformat(),
+        'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
+        'duration_minutes': duration_minutes,
+        'duration_hours': duration_hours,
+        'cost': cost,
+        'created_at': reservation.created_at.isoformat()
+    }
+
+def expected_admin(reservation):
+    """One row as GET /api/admin/reservations built it before the shared serializers"""
+    duration_minutes, duration_hours, cost = live_figures(reservation)
+    return {
+        'id': reservation.id,
+        'user': {
+            'id': reservation.user.id,
+            'username': reservation.user.username,
+            'full_name': reservation.user.full_name,
+            'email': reservation.user.email,
+            'phone_number': reservation.user.phone_number
+        },
+        'parking_lot': {
+            'id': reservation.parking_spot.parking_lot.id,
+            'name': reservation.parking_spot.parking_lot.prime_location_name,
+            'address': reservation.parking_spot.parking_lot.address,
+            'price_per_hour': reservation.parking_spot.parking_lot.price_per_hour
+        },
+        'spot_number': reservation.parking_spot.spot_number,
+        'status': reservation.status,
+        'vehicle_number': reservation.vehicle_number,
+        'vehicle_model': reservation.vehicle_model,
+        'parking_timestamp': reservation.parking_timestamp.isoformat(),
+        'leaving_timestamp': reservation.leaving_timestamp.isoformat() if reservation.leaving_timestamp else None,
+        'duration_minutes': duration_minutes,
+        'duration_hours': duration_hours,
+        'cost': cost,
+        'created_at': reservation.created_at.isoformat(),
+        'updated_at': reservation.updated_at.isoformat()
+    }
+
+def serialized_once(app, count_queries, query, serialize):
+    """Rows from a fresh session, with the number of statements loading and serializing them took"""
+    with app.app_context():
+        with count_queries() as counter:
+            rows = [serialize(reservation) for reservation in query().all()]
+        return rows, counter[0]
+
+def per_row_baseline(app, query, expected):
+    """Rows built the old way: plain query, relationships lazy-loaded one reservation at a time"""
+    with app.app_context():
+        return [expected(reservation) for reservation in query().all()]
+
+def test_history_rows_match_the_per_row_serializer(app, make_lot, make_user, count_queries, monkeypatch):
+    monkeypatch.setattr(reservation_serializers, 'datetime', FrozenDatetime)
+    user_id = seed_reservations(app, make_lot, make_user)[0]
+    
+    rows, statements = serialized_once(app, count_queries, lambda: with_details(history_query(user_id)), serialize_history)
+    expected = per_row_baseline(app, lambda: history_query(user_id), expected_history)
+    
+    assert len(rows) == 3
+    assert app.json.dumps(rows) == app.json.dumps(expected)
+    assert statements == 1
+
+def test_admin_rows_match_the_per_row_serializer(app, make_lot, make_user, count_queries, monkeypatch):
+    monkeypatch.setattr(reservation_serializers, 'datetime', FrozenDatetime)
+    seed_reservations(app, make_lot, make_user)
+    
+    rows, statements = serialized_once(app, count_queries, lambda: with_joined_details(reservation_list_query([])), serialize_admin)
+    expected = per_row_baseline(app, lambda: reservation_list_query([]), expected_admin)
+    
+    assert len(rows) == 7
+    assert app.json.dumps(rows) == app.json.dumps(expected)
+    assert statements == 1
@@ -0,0 +1,98 @@
+"""
+Search Index Tests for Vehicle Parking System
+Search words match token prefixes through FTS5, triggers keep the index in step, and typed query syntax stays literal
+"""
+
+import pytest
+from database import db
+from models import ParkingLot, User
+from search_index import match_expression, lot_search_filter, user_search_filter
+
+LOTS_URL = '/api/dashboard/user/parking-lots'
+
+def lot_names(app, term, *columns):
+    with app.app_context():
+        filters = lot_search_filter(term, *columns) if columns else lot_search_filter(term)
+        return sorted(lot.prime_location_name for lot in ParkingLot.query.filter(filters))
+
+def usernames(app, term):
+    with app.app_context():
+        return sorted(user.username for user in User.query.filter(user_search_filter(term)))
+
+@pytest.fixture
+def lots(make_lot):
+    make_lot(prime_location_name='Koramangala Parking', address='80 Feet Road, Koramangala', pin_code='560034')
+    make_lot(prime_location_name='Near Station Plaza', address='12 Station Road, Majestic', pin_code='560009')
+
+def test_each_word_matches_the_start_of_a_token(app, lots):
+    assert lot_names(app, 'kor par') == ['Koramangala Parking']
+    assert lot_names(app, 'KORAMANGALA') == ['Koramangala Parking']
+    assert lot_names(app, 'st') == ['Near Station Plaza']
+    assert lot_names(app, 'road') == ['Koramangala Parking', 'Near Station Plaza']
+    assert lot_names(app, 'kor plaza') == []
+
+def test_mid_word_and_partial_pin_substrings_no_longer_match(app, lots):
+    assert lot_names(app, 'mangala') == []
+    assert lot_names(app, '5600') == ['Koramangala Parking', 'Near Station Plaza']
+    assert lot_names(app, '0034') == []
+
+def test_search_narrowed_to_some_columns(app, lots):
+    assert lot_names(app, 'koramangala', ('address',)) == ['Koramangala Parking']
+    assert lot_names(app, 'majestic', ('prime_location_name',)) == []
+
+def test_triggers_keep_the_index_in_step(app, make_lot, make_user):
+    lot_id = make_lot(prime_location_name='Indiranagar Hub')
+    user_id, _ = make_user(username='priya_s', full_name='Priya Sharma')
+    assert lot_names(app, 'indira') == ['Indiranagar Hub']
+    assert usernames(app, 'sharma') == ['priya_s']
+    
+    with app.app_context():
+        db.session.get(ParkingLot, lot_id).prime_location_name = 'Whitefield Hub'
+        db.session.get(User, user_id).full_name = 'Priya Rao'
+        db.session.commit()
+    assert lot_names(app, 'indira') == []
+    assert lot_names(app, 'white hub') == ['Whitefield Hub']
+    assert usernames(app, 'sharma') == []
+    assert usernames(app, 'rao') == ['priya_s']
+    
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.execute(db.delete(ParkingLot).where(ParkingLot.id == lot_id))
+        db.session.commit()
+    assert lot_names(app, 'white') == []
+    assert usernames(app, 'priya') == []
+
+@pytest.mark.parametrize('term, found', [
+    ('"kor', ['Koramangala Parking']),
+    ('kor"par', ['Koramangala Parking']),
+    ('kor*', ['Koramangala Parking']),
+    ('*', []),
+    ('kor -par', ['Koramangala Parking']),
+    ('-kor', ['Koramangala Parking']),
+    ('near', ['Near Station Plaza']),
+    ('NEAR(kor par)', []),
+    ('kor OR station', []),
+    ('kor AND', []),
+    ('NOT kor', []),
+    ('prime_location_name:kor', []),
+    ('{address} : kor', []),
+    ('^kor', ['Koramangala Parking']),
+])
+def test_query_syntax_in_the_search_is_taken_literally(app, client, make_user, lots, term, found):
+    _, headers = make_user()
+    
+    response = client.get(LOTS_URL, headers=headers, query_string={'search': term})
+    
+    assert response.status_code == 200
+    assert sorted(lot['name'] for lot in response.get_json()['data']['lots']) == found
+
+def test_match_expression_quotes_every_word():
+    assert match_expression('kor "par') == '"kor"* "par"*'
+    assert match_expression('kor', ('address', 'pin_code')) == '{address pin_code} : ("kor"*)'
+    assert match_expression('" * - ()') is None
+
+def test_like_fallback_when_the_index_is_off(app, lots):
+    app.config['SEARCH_INDEX_ENABLED'] = False
+    
+    assert lot_names(app, 'mangala') == ['Koramangala Parking']
+    assert lot_names(app, '0034') == ['Koramangala Parking']
@@ -0,0 +1,82 @@
+"""
+System Statistics Tests for Vehicle Parking System
+Averages read from the lot_daily_stats rollup must mean what they meant when computed from reservations,
+and cached dashboard counts must never be older than the ETag they are sent with
+"""
+
+from datetime import datetime, timedelta
+from database import db
+from models import Admin, ParkingLot, Reservation, LotDailyStats
+from auth_utils import principal_cache
+import db_utils
+
+def add_completed(lot_id, user_id, costs):
+    """Completed two-hour reservations with the given costs, recorded in the rollup as a release would"""
+    lot = db.session.get(ParkingLot, lot_id)
+    for spot, cost in zip(lot.parking_spots, costs):
+        reservation = Reservation(
+            spot_id=spot.id, user_id=user_id, vehicle_number='KA01AB1234', status='completed',
+            parking_timestamp=datetime.utcnow() - timedelta(hours=2),
+            leaving_timestamp=datetime.utcnow(),
+            parking_cost=cost
+        )
+        db.session.add(reservation)
+        db.session.flush()
+        LotDailyStats.record_completion(reservation)
+    db.session.commit()
+
+def session_averages(client, admin_headers):
+    response = client.get('/api/admin/statistics', headers=admin_headers)
+    assert response.status_code == 200
+    return response.get_json()['data']['averages']
+
+def test_average_cost_counts_only_charged_sessions(app, client, admin_headers, make_lot, make_user):
+    lot_id = make_lot(spots=4)
+    user_id, _ = make_user()
+    with app.app_context():
+        add_completed(lot_id, user_id, [100.0, 50.0, 0.0, None])
+    
+    averages = session_averages(client, admin_headers)
+    
+    assert averages['session_cost'] == 75.0
+    assert averages['session_duration_minutes'] == 120.0
+
+def test_rebuilt_rollup_gives_same_averages(app, client, admin_headers, make_lot, make_user):
+    lot_id = make_lot(spots=4)
+    user_id, _ = make_user()
+    with app.app_context():
+        add_completed(lot_id, user_id, [100.0, 50.0, 0.0, None])
+    incremental = session_averages(client, admin_headers)
+    
+    db_utils.rebuild_lot_stats()
+    
+    assert session_averages(client, admin_headers) == incremental
+
+def test_admin_dashboard_counts_match_their_etag(client, admin_headers, make_user):
+    make_user()
+    first = client.get('/api/dashboard/admin', headers=admin_headers)
+    assert first.get_json()['data']['stats']['total_users'] == 1
+    
+    # Written without invalidating this process's snapshot, as another worker would
+    make_user()
+    response = client.get('/api/dashboard/admin', headers={**admin_headers, 'If-None-Match': first.headers['ETag']})
+    
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    assert response.get_json()['data']['stats']['total_users'] == 2
+
+def test_admin_dashboard_etag_moves_with_the_admins_profile(app, client, admin_headers):
+    first = client.get('/api/dashboard/admin', headers=admin_headers)
+    assert first.get_json()['data']['admin_info']['email'] == 'admin@parkingsystem.com'
+    
+    # No lot or user changes - only the admin's own details
+    with app.app_context():
+        admin = Admin.query.filter_by(username='admin').one()
+        admin.email = 'ops@parkingsystem.com'
+        db.session.commit()
+    principal_cache.clear()  # As once the cached account expires
+    response = client.get('/api/dashboard/admin', headers={**admin_headers, 'If-None-Match': first.headers['ETag']})
+    
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    assert response.get_json()['data']['admin_info']['email'] == 'ops@parkingsystem.com'
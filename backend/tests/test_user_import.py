@@ -0,0 +1,97 @@
+"""
+User Import Tests for Vehicle Parking System
+Bulk imports create the valid rows and report every rejected one by row number
+"""
+
+import io
+from database import db
+from models import User
+
+IMPORT_URL = '/api/admin/users/import'
+
+def user_row(username, **values):
+    row = {
+        'username': username,
+        'email': f'{username}@example.com',
+        'full_name': f'Imported {username}',
+        'password': 'secret123'
+    }
+    row.update(values)
+    return row
+
+def upload(client, admin_headers, data, filename):
+    return client.post(IMPORT_URL, headers=admin_headers, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(data), filename)})
+
+def test_valid_rows_are_created(app, client, admin_headers):
+    response = client.post(IMPORT_URL, headers=admin_headers, json={'users': [
+        user_row('alice', phone_number='9876543210'),
+        user_row('bob', email='BOB@Example.com')
+    ]})
+    
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'created': 2, 'failed': 0, 'errors': []}
+    with app.app_context():
+        bob = User.query.filter_by(username='bob').one()
+        assert bob.email == 'bob@example.com'
+        assert bob.check_password('secret123')
+        assert User.query.filter_by(username='alice').one().phone_number == '9876543210'
+
+def test_csv_upload_with_byte_order_mark(app, client, admin_headers):
+    csv_text = 'username,email,full_name,password\ncarol,carol@example.com,Carol Import,secret123\n'
+    
+    response = upload(client, admin_headers, csv_text.encode('utf-8-sig'), 'users.csv')
+    
+    assert response.status_code == 200
+    assert response.get_json()['data']['created'] == 1
+
+def test_duplicates_in_the_file_and_against_existing_accounts_are_rejected(app, client, admin_headers, make_user):
+    make_user(username='taken')
+    response = client.post(IMPORT_URL, headers=admin_headers, json=[
+        user_row('fresh'),
+        user_row('fresh', email='other@example.com'),
+        user_row('another', email='fresh@example.com'),
+        user_row('taken', email='new@example.com'),
+        user_row('newname', email='taken@example.com'),
+        user_row('admin', email='admin2@example.com')
+    ])
+    
+    data = response.get_json()['data']
+    assert data['created'] == 1
+    assert [(error['row'], error['message']) for error in data['errors']] == [
+        (2, 'Username appears more than once in this import'),
+        (3, 'Email appears more than once in this import'),
+        (4, 'Username already exists'),
+        (5, 'Email already registered'),
+        (6, 'Username already exists')
+    ]
+    with app.app_context():
+        assert User.query.filter_by(username='fresh').one().email == 'fresh@example.com'
+
+def test_rows_failing_validation_are_reported(app, client, admin_headers):
+    response = client.post(IMPORT_URL, headers=admin_headers, json=[
+        user_row('ok_user'),
+        user_row('shortpw', password='abc'),
+        user_row('bad_email', email='not-an-email'),
+        user_row('no name', full_name=''),
+        user_row('x')
+    ])
+    
+    data = response.get_json()['data']
+    assert data['created'] == 1
+    assert [error['row'] for error in data['errors']] == [2, 3, 4, 5]
+    assert data['errors'][0]['message'] == 'Password must be at least 6 characters long'
+    assert data['errors'][1]['message'] == 'Invalid email format'
+    assert data['errors'][2]['message'] == 'Full Name is required'
+    with app.app_context():
+        assert User.query.count() == 1
+
+def test_file_that_is_not_utf8_is_a_400(app, client, admin_headers):
+    csv_text = 'username,email,full_name,password\njose,jose@example.com,José Núñez,secret123\n'
+    
+    response = upload(client, admin_headers, csv_text.encode('latin-1'), 'users.csv')
+    
+    assert response.status_code == 400
+    assert 'UTF-8' in response.get_json()['message']
+    with app.app_context():
+        assert User.query.count() == 0
@@ -0,0 +1,149 @@
+"""
+Bulk User Import for Vehicle Parking System
+Validates a CSV or JSON batch of users up front, checks uniqueness for the whole batch in
+one query, hashes passwords in parallel and inserts in batches
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import or_, union_all, select, insert
+from database import db
+from models import User, Admin
+from password_hasher import password_hasher
+from routes.auth import validate_username, validate_email, validate_password
+
+REQUIRED_FIELDS = ['username', 'email', 'full_name', 'password']
+OPTIONAL_FIELDS = ['phone_number', 'address']
+INSERT_BATCH_SIZE = 500
+
+class ImportFormatError(Exception):
+    """Raised when an import file can't be parsed at all"""
+    pass
+
+def decode_upload(data):
+    """Text of an uploaded import file, which must be UTF-8 (a byte-order mark is allowed)"""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f'File is not UTF-8 encoded (invalid byte at position {e.start}); save it as UTF-8 and try again')
+
+def parse_user_rows(content, file_format):
+    """Parse CSV text or JSON (a list, or {"users": [...]}) into a list of row dicts"""
+    if file_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        if not reader.fieldnames:
+            raise ImportFormatError('CSV file is empty')
+        missing = [field for field in REQUIRED_FIELDS if field not in reader.fieldnames]
+        if missing:
+            raise ImportFormatError(f'CSV is missing columns: {", ".join(missing)}')
+        return list(reader)
+    
+    if file_format == 'json':
+        try:
+            data = json.loads(content) if isinstance(content, str) else content
+        except ValueError:
+            raise ImportFormatError('Invalid JSON')
+        if isinstance(data, dict):
+            data = data.get('users')
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ImportFormatError('JSON must be a list of user objects or {"users": [...]}')
+        return data
+    
+    raise ImportFormatError(f'Unsupported format: {file_format}')
+
+def clean_row(row):
+    """Strip and normalise one row the same way register does; returns (values, error message)"""
+    values = {field: str(row.get(field) or '').strip() for field in REQUIRED_FIELDS + OPTIONAL_FIELDS}
+    values['password'] = str(row.get('password') or '')
+    values['email'] = values['email'].lower()
+    
+    for field in REQUIRED_FIELDS:
+        if not values[field].strip():
+            return values, f'{field.replace("_", " ").title()} is required'
+    if not validate_username(values['username']):
+        return values, 'Username must be 3-80 characters and contain only letters, numbers, and underscores'
+    if not validate_email(values['email']):
+        return values, 'Invalid email format'
+    if not validate_password(values['password']):
+        return values, 'Password must be at least 6 characters long'
+    if len(values['full_name']) < 2 or len(values['full_name']) > 100:
+        return values, 'Full name must be between 2 and 100 characters'
+    
+    for field in OPTIONAL_FIELDS:
+        values[field] = values[field] or None
+    return values, None
+
+def find_taken(usernames, emails):
+    """Usernames and emails already used by any user or admin - one query for the whole batch"""
+    taken = db.session.execute(union_all(
+        select(User.username, User.email).where(or_(User.username.in_(usernames), User.email.in_(emails))),
+        select(Admin.username, Admin.email).where(or_(Admin.username.in_(usernames), Admin.email.in_(emails)))
+    )).all()
+    return {username for username, _ in taken}, {email.lower() for _, email in taken}
+
+def import_users(rows):
+    """
+    Create users from parsed rows; invalid rows are skipped and reported, valid ones are
+    committed together. Returns {'created': n, 'failed': n, 'errors': [...]} with 1-based row numbers.
+    """
+    errors = []
+    candidates = []  # (row number, cleaned values)
+    
+    def reject(row_number, values, message):
+        errors.append({'row': row_number, 'username': values.get('username') or None, 'message': message})
+    
+    # Per-row validation, including duplicates within the file itself
+    seen_usernames = set()
+    seen_emails = set()
+    for row_number, row in enumerate(rows, start=1):
+        values, error = clean_row(row)
+        if error:
+            reject(row_number, values, error)
+        elif values['username'] in seen_usernames:
+            reject(row_number, values, 'Username appears more than once in this import')
+        elif values['email'] in seen_emails:
+            reject(row_number, values, 'Email appears more than once in this import')
+        else:
+            seen_usernames.add(values['username'])
+            seen_emails.add(values['email'])
+            candidates.append((row_number, values))
+    
+    # Uniqueness against existing accounts, set-based
+    accepted = []
+    if candidates:
+        taken_usernames, taken_emails = find_taken(seen_usernames, seen_emails)
+        for row_number, values in candidates:
+            if values['username'] in taken_usernames:
+                reject(row_number, values, 'Username already exists')
+            elif values['email'] in taken_emails:
+                reject(row_number, values, 'Email already registered')
+            else:
+                accepted.append(values)
+    
+    # Hash only the rows that will actually be inserted
+    password_hashes = password_hasher.hash_many([values['password'] for values in accepted])
+    
+    now = datetime.utcnow()
+    records = [{
+        'username': values['username'],
+        'email': values['email'],
+        'full_name': values['full_name'],
+        'phone_number': values['phone_number'],
+        'address': values['address'],
+        'password_hash': password_hash,
+        'is_active': True,
+        'created_at': now
+    } for values, password_hash in zip(accepted, password_hashes)]
+    
+    for start in range(0, len(records), INSERT_BATCH_SIZE):
+        db.session.execute(insert(User), records[start:start + INSERT_BATCH_SIZE])
+    db.session.commit()
+    
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'created': len(records),
+        'failed': len(errors),
+        'errors': errors
+    }
@@ -244,6 +244,59 @@ export const dashboardAPI = {
   getRedirect: () => api.get('/dashboard/redirect')
 }
 
+// Live lot availability (Server-Sent Events)
+export const streamAPI = {
+  // Short-lived token that opens the availability stream and nothing else
+  getStreamToken: () => api.post('/dashboard/stream/token'),
+  
+  // onSnapshot(lots) on every (re)connect that can't resume, onUpdate(lot) per change, onRemove(lotId) for deleted lots.
+  // Returns a function that closes the stream.
+  subscribeAvailability({ onSnapshot, onUpdate, onRemove } = {}) {
+    let source = null
+    let closed = false
+    let lastEventId = null
+    
+    const listen = (event, handler) => {
+      source.addEventListener(event, (message) => {
+        lastEventId = message.lastEventId || lastEventId
+        handler(JSON.parse(message.data))
+      })
+    }
+    
+    const open = async () => {
+      if (closed || !TokenManager.getToken()) return
+      
+      // EventSource can't send an Authorization header, so it gets a stream-only token in the query string -
+      // a fresh one on every (re)connect, since they expire within a minute
+      let token
+      try {
+        token = (await streamAPI.getStreamToken()).data.data.token
+      } catch (error) {
+        setTimeout(open, 5000)
+        return
+      }
+      if (closed) return
+      
+      const resume = lastEventId ? `&last_event_id=${encodeURIComponent(lastEventId)}` : ''
+      source = new EventSource(`${api.defaults.baseURL}/dashboard/stream/availability?access_token=${encodeURIComponent(token)}${resume}`)
+      listen('snapshot', (data) => onSnapshot?.(data.lots))
+      listen('availability', (data) => onUpdate?.(data))
+      listen('lot_removed', (data) => onRemove?.(data.lot_id))
+      source.onerror = () => {
+        // The browser would retry with the same, by then expired, token - reconnect with a new one instead
+        source.close()
+        setTimeout(open, 3000)
+      }
+    }
+    
+    open()
+    return () => {
+      closed = true
+      source?.close()
+    }
+  }
+}
+
 // Enhanced Auth helper functions
 export const authHelpers = {
   isAuthenticated() {